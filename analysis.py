@@ -0,0 +1,595 @@
+import os
+import socket
+import ipaddress
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+from github_scraper import (MANIFEST_DIR, archive_kind, get_github_repo_info, manifest_path, scrape_repo_archive,
+                            scrape_repo_files)
+from similarity_checker import DEFAULT_HASH_MODE, fingerprint_file, align_blocks
+from parallel_engine import fingerprint_paths, compare_corpus_by_language
+from fingerprint_index import self_join_by_language, similarity_clusters
+from languages import compatible_pair_count, partition_by_family
+from fingerprint_filter import FingerprintFilter
+import metrics
+
+
+class AnalysisError(Exception):
+    """
+    Kesalahan yang pesannya aman ditampilkan ke pengguna (mis. URL tidak valid, repo kosong).
+    """
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def clear_directory(dir_path, label):
+    """
+    Menghapus semua file (kecuali .gitkeep) di dir_path. Mengembalikan jumlah file yang dihapus.
+    """
+    print(f"Membersihkan folder: {dir_path}")
+    count = 0
+    for filename in os.listdir(dir_path):
+        file_path = os.path.join(dir_path, filename)
+        try:
+            if os.path.isfile(file_path) and not file_path.endswith('.gitkeep'):
+                os.unlink(file_path)
+                count += 1
+        except Exception as e:
+            print(f"Error deleting file {file_path}: {e}")
+    print(f"Berhasil menghapus {count} file {label}.")
+    return count
+
+def prune_directory(dir_path, repo_urls, keep, label):
+    """
+    Pengganti clear_directory untuk mode inkremental: menghapus file (kecuali .gitkeep) di dir_path
+    yang tidak ada di `keep` (nama file hasil scrape_repos untuk analisis ini), beserta manifest
+    repo yang tidak ada di `repo_urls`. File dari repo yang sudah dikeluarkan dari permintaan
+    tidak tertinggal di disk. Mengembalikan jumlah file kode yang dihapus.
+    """
+    keep = set(keep)
+    count = 0
+    for filename in os.listdir(dir_path):
+        file_path = os.path.join(dir_path, filename)
+        if filename in keep or filename.endswith('.gitkeep') or not os.path.isfile(file_path):
+            continue
+        try:
+            os.unlink(file_path)
+            count += 1
+        except OSError as e:
+            print(f"Error deleting file {file_path}: {e}")
+
+    manifests = {os.path.basename(manifest_path(dir_path, *get_github_repo_info(url))) for url in repo_urls}
+    manifest_dir = os.path.join(dir_path, MANIFEST_DIR)
+    if os.path.isdir(manifest_dir):
+        for filename in os.listdir(manifest_dir):
+            if filename not in manifests:
+                try:
+                    os.unlink(os.path.join(manifest_dir, filename))
+                except OSError as e:
+                    print(f"Error deleting manifest {filename}: {e}")
+    if count:
+        print(f"Menghapus {count} file {label} yang tidak termasuk analisis ini.")
+    return count
+
+
+class DataDirLock:
+    """
+    Kunci eksklusif atas folder data yang dipakai bersama (mahasiswa, github, boilerplate).
+    Berlaku antar thread dan antar proses (lock pada file `path`), sehingga analisis dari
+    worker server yang berbeda dijalankan satu per satu dan tidak saling menimpa input.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            f = open(self.path, 'a+b')
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                else:
+                    f.seek(0)
+                    while True:
+                        try:
+                            # LK_LOCK hanya mencoba ulang ~10 detik, jadi diulang sampai berhasil
+                            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:
+                            pass
+            except BaseException:
+                f.close()
+                raise
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._file = f
+        return self
+
+    def __exit__(self, *exc):
+        f, self._file = self._file, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            f.close()
+        finally:
+            self._thread_lock.release()
+        return False
+
+
+def _no_progress(**fields):
+    pass
+
+
+# 'files': daftar file lewat tree API lalu satu request per file
+# 'archive': satu tarball/zip per repo (atau arsip/direktori lokal), di-fingerprint saat dibaca
+INGEST_MODES = ('files', 'archive')
+
+
+# Host yang boleh dipakai sebagai URL arsip langsung (termasuk tujuan redirect-nya)
+DEFAULT_ARCHIVE_HOSTS = ('github.com', 'codeload.github.com', 'objects.githubusercontent.com')
+
+
+class ArchiveUrlPolicy:
+    """
+    Pembatas URL arsip langsung yang dikirim pengguna web, agar server tidak bisa dipakai untuk
+    mengambil URL sembarang (SSRF): hanya http(s) ke host di `hosts`, dan alamat hasil resolve
+    harus alamat publik (bukan private, loopback, link-local, dsb.) kecuali `allow_private`.
+    check() juga dipanggil untuk setiap tujuan redirect.
+    """
+    def __init__(self, hosts=DEFAULT_ARCHIVE_HOSTS, allow_private=False):
+        self.hosts = frozenset(h.lower() for h in hosts)
+        self.allow_private = allow_private
+
+    def check(self, url):
+        parsed = urlparse(url)
+        host = (parsed.hostname or '').lower()
+        if parsed.scheme not in ('http', 'https') or not host:
+            raise AnalysisError(f"URL arsip tidak valid: {url}")
+        if host not in self.hosts:
+            raise AnalysisError(f"Host arsip tidak diizinkan: {host}")
+        if self.allow_private:
+            return url
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or 443, proto=socket.IPPROTO_TCP)}
+        except (socket.gaierror, UnicodeError, ValueError):
+            raise AnalysisError(f"Host arsip tidak dapat di-resolve: {host}")
+        for address in addresses:
+            if not ipaddress.ip_address(address.split('%')[0]).is_global:
+                raise AnalysisError(f"Host arsip mengarah ke alamat non-publik: {host}")
+        return url
+
+
+def resolve_archive_source(source, local_root, url_policy=None):
+    """
+    URL http(s) harus lolos `url_policy` (ArchiveUrlPolicy; default hanya host GitHub publik).
+    URL repo GitHub (tanpa ekstensi arsip) selalu diambil lewat API, jadi tidak diperiksa di sini.
+    Path lokal hanya diizinkan di bawah `local_root` (relatif terhadapnya), agar pengguna web
+    tidak bisa membaca direktori lain di server.
+    """
+    if source.startswith(('http://', 'https://')):
+        if archive_kind(urlparse(source).path) is not None:
+            (url_policy or ArchiveUrlPolicy()).check(source)
+        return source
+    if not local_root:
+        raise AnalysisError(f"Sumber lokal tidak diizinkan: {source}")
+    root = os.path.realpath(local_root)
+    path = os.path.realpath(os.path.join(root, source))
+    if not path.startswith(root + os.sep) or not os.path.exists(path):
+        raise AnalysisError(f"Sumber lokal tidak ditemukan di {local_root}: {source}")
+    return path
+
+
+# Repo diunduh bersamaan; batas koneksi per host tetap dijaga oleh github_scraper
+REPO_SCRAPE_WORKERS = 4
+
+def scrape_repos(repo_urls, save_dir, label, incremental=True, groups=None, ingest_filter=None):
+    """
+    Scraping beberapa repo secara bersamaan. Mengembalikan list nama file lokal sesuai urutan repo.
+    Jika `groups` (dict) diberikan, diisi dengan nama file lokal -> URL repo asalnya.
+    `ingest_filter` (IngestFilter) dipakai bersama oleh semua repo.
+    """
+    def scrape(repo_url):
+        print(f"Mulai scraping repositori {label}: {repo_url}")
+        downloaded = scrape_repo_files(repo_url, save_dir, incremental=incremental, ingest_filter=ingest_filter)
+        print(f"Selesai scraping {repo_url}. Total file dari repo ini: {len(downloaded)}")
+        return downloaded
+
+    files = []
+    if not repo_urls:
+        return files
+    with metrics.stage('scrape'), ThreadPoolExecutor(max_workers=min(REPO_SCRAPE_WORKERS, len(repo_urls))) as executor:
+        for repo_url, downloaded in zip(repo_urls, executor.map(scrape, repo_urls)):
+            files.extend(downloaded)
+            if groups is not None:
+                groups.update((name, repo_url) for name in downloaded)
+    return files
+
+
+def ingest_archives(sources, save_dir, label, fingerprint, local_root=None, groups=None, ingest_filter=None,
+                    url_policy=None):
+    """
+    Mengambil setiap sumber sebagai satu arsip. Setiap file langsung di-fingerprint dari
+    isinya di memori lewat `fingerprint(path, data)`.
+    Mengembalikan list FileFingerprint sesuai urutan sumber dan urutan file di arsip.
+    Jika `groups` (dict) diberikan, diisi dengan nama file lokal -> sumber asalnya.
+    URL arsip langsung dan tujuan redirect-nya diperiksa dengan `url_policy` (ArchiveUrlPolicy).
+    """
+    url_policy = url_policy or ArchiveUrlPolicy()
+    resolved = [resolve_archive_source(source, local_root, url_policy) for source in sources]
+
+    def ingest(source):
+        print(f"Mulai mengambil arsip {label}: {source}")
+        fingerprints = []
+        scrape_repo_archive(
+            source, save_dir,
+            on_file=lambda name, data: fingerprints.append(fingerprint(os.path.join(save_dir, name), data)),
+            ingest_filter=ingest_filter, check_url=url_policy.check
+        )
+        print(f"Selesai mengambil {source}. Total file dari arsip ini: {len(fingerprints)}")
+        return fingerprints
+
+    results = []
+    if not resolved:
+        return results
+    with metrics.stage('ingest_archive'), ThreadPoolExecutor(max_workers=min(REPO_SCRAPE_WORKERS, len(resolved))) as executor:
+        for source, fingerprints in zip(sources, executor.map(ingest, resolved)):
+            results.extend(fingerprints)
+            if groups is not None:
+                groups.update((os.path.basename(fp.path), source) for fp in fingerprints)
+    return results
+
+
+def run_analysis(student_repo_urls, github_repo_urls, student_dir, github_dir, store=None,
+                 k=5, w=10, hash_mode=DEFAULT_HASH_MODE, workers=1, progress=None,
+                 ingest_mode='files', local_root=None, incremental=True,
+                 min_score=0.0, top_k=None, on_result=None, compare_students=True,
+                 base_repo_urls=None, base_dir=None, fingerprint_filter=None, ingest_filter=None,
+                 archive_url_policy=None):
+    """
+    Pipeline analisis lengkap: scraping repo mahasiswa dan pembanding, fingerprinting,
+    lalu perbandingan lewat indeks fingerprint.
+    `progress(**fields)` dipanggil dengan phase, files_done/files_total dan pairs_done/pairs_total.
+    `ingest_mode` memilih cara mengambil repo (lihat INGEST_MODES); pada mode 'archive'
+    sumber juga boleh berupa path di bawah `local_root`, atau URL arsip langsung yang lolos
+    `archive_url_policy` (ArchiveUrlPolicy, default hanya host GitHub publik).
+    Dengan `incremental` (mode 'files'), folder tidak dikosongkan dulu: hanya file yang berubah
+    yang diunduh ulang, dan fingerprint file yang tidak berubah diambil dari store. Setelah scraping,
+    file dari repo yang tidak diminta lagi dihapus (prune_directory).
+    Hanya pasangan dengan skor >= `min_score` (persen) dan, jika `top_k` diberikan, K pasangan
+    teratas per file mahasiswa yang dilaporkan. `on_result(row)` dipanggil untuk setiap pasangan
+    segera setelah dihitung, sehingga hasil bisa di-stream sebelum analisis selesai.
+    Dengan `compare_students`, file mahasiswa juga dibandingkan satu sama lain (kecuali file dari
+    repo yang sama) dan dikelompokkan menjadi klaster kemiripan.
+    `fingerprint_filter` (FingerprintFilter) membuang fingerprint boilerplate sebelum perbandingan:
+    fingerprint repo di `base_repo_urls` (diunduh ke `base_dir`) didaftarkan sebagai korpus dasar,
+    lalu filter di-fit pada seluruh file mahasiswa dan pembanding.
+    `ingest_filter` (IngestFilter) melewati file vendor/build, terlalu besar, minified atau hasil
+    generator saat ingest; daftar file yang dilewati dikembalikan sebagai `skipped_files`.
+    Melempar AnalysisError untuk input yang tidak bisa diproses.
+    """
+    progress = progress or _no_progress
+    print("\n--- Memulai Analisis ---")
+
+    if not student_repo_urls:
+        raise AnalysisError("Mohon tambahkan setidaknya satu URL repositori mahasiswa.")
+    if ingest_mode not in INGEST_MODES:
+        raise AnalysisError(f"ingest_mode tidak dikenal: {ingest_mode}")
+
+    fingerprint_cache = {}
+    report = _ResultFilter(min_score, top_k, on_result)
+    student_groups = {} if compare_students else None
+    if base_repo_urls and fingerprint_filter is None:
+        fingerprint_filter = FingerprintFilter()
+    if ingest_mode == 'archive':
+        return _run_archive_analysis(
+            student_repo_urls, github_repo_urls, student_dir, github_dir, store,
+            k, w, hash_mode, workers, progress, fingerprint_cache, local_root, report, student_groups,
+            base_repo_urls, base_dir, fingerprint_filter, ingest_filter, archive_url_policy
+        )
+
+    if not incremental:
+        clear_directory(student_dir, 'mahasiswa')
+    print(f"URL Repositori Mahasiswa diterima: {student_repo_urls}")
+    progress(phase='scraping_mahasiswa')
+
+    uploaded_student_files = scrape_repos(student_repo_urls, student_dir, 'mahasiswa', incremental, student_groups,
+                                          ingest_filter)
+
+    if not uploaded_student_files:
+        raise AnalysisError(
+            "Gagal mengunduh file kode dari repositori mahasiswa yang diberikan. "
+            "Pastikan URL repositori benar dan mengandung file kode yang didukung (mis. .js, .py, .java, dll.)."
+        )
+
+    print(f"URL Repositori GitHub diterima: {github_repo_urls}")
+    if not incremental:
+        clear_directory(github_dir, 'GitHub')
+    progress(phase='scraping_github')
+
+    scraped_github_files = []
+    if github_repo_urls:
+        scraped_github_files = scrape_repos(github_repo_urls, github_dir, 'pembanding', incremental,
+                                            ingest_filter=ingest_filter)
+
+        if not scraped_github_files:
+            raise AnalysisError(
+                "Gagal mengunduh file kode dari repositori GitHub pembanding yang diberikan. "
+                "Pastikan URL repositori benar dan mengandung file kode yang didukung (mis. .js, .py, .java, dll.)."
+            )
+    else:
+        print("Tidak ada URL GitHub pembanding yang diberikan.")
+
+    if incremental:
+        # Folder tidak dikosongkan di awal; sisa repo dari analisis sebelumnya dibuang di sini
+        prune_directory(student_dir, student_repo_urls, uploaded_student_files, 'mahasiswa')
+        prune_directory(github_dir, github_repo_urls or [], scraped_github_files, 'GitHub')
+
+    if base_repo_urls:
+        progress(phase='scraping_base')
+        base_files = scrape_repos(base_repo_urls, base_dir, 'dasar', incremental, ingest_filter=ingest_filter)
+        base_fps = fingerprint_paths([os.path.join(base_dir, f) for f in base_files], k, w, hash_mode=hash_mode,
+                                     workers=workers, cache=fingerprint_cache, store=store)
+        for fp in base_fps:
+            fingerprint_filter.add_base(fp)
+        print(f"Korpus dasar: {len(base_fps)} file, {len(fingerprint_filter.base_hashes)} fingerprint diabaikan.")
+
+    mahasiswa_file_paths = [os.path.join(student_dir, f) for f in uploaded_student_files if os.path.isfile(os.path.join(student_dir, f))]
+    github_file_paths = [os.path.join(github_dir, f) for f in scraped_github_files if os.path.isfile(os.path.join(github_dir, f))]
+
+    print("\nMemulai perbandingan menggunakan MOSS-like...")
+
+    mahasiswa_fps, github_fps = [], []
+    if github_file_paths or compare_students:
+        # Fingerprint tiap file dihitung sekali, lalu dipakai ulang untuk semua pasangan
+        files_total = len(mahasiswa_file_paths) + len(github_file_paths)
+        progress(phase='fingerprinting', files_done=0, files_total=files_total)
+        with metrics.stage('fingerprint'):
+            mahasiswa_fps = fingerprint_paths(
+                mahasiswa_file_paths, k, w, hash_mode=hash_mode, workers=workers, cache=fingerprint_cache, store=store,
+                progress=lambda done: progress(files_done=done)
+            )
+            github_fps = fingerprint_paths(
+                github_file_paths, k, w, hash_mode=hash_mode, workers=workers, cache=fingerprint_cache, store=store,
+                progress=lambda done: progress(files_done=len(mahasiswa_file_paths) + done)
+            )
+
+    return _compare_and_finish(mahasiswa_fps, github_fps, workers, progress, report, student_groups, fingerprint_filter,
+                               ingest_filter)
+
+
+def _run_archive_analysis(student_sources, github_sources, student_dir, github_dir, store,
+                          k, w, hash_mode, workers, progress, fingerprint_cache, local_root, report,
+                          student_groups, base_sources, base_dir, fingerprint_filter, ingest_filter, url_policy):
+    lock = threading.Lock()
+    done = [0]
+
+    def fingerprint(path, data):
+        fp = fingerprint_file(path, k, w, cache=fingerprint_cache, store=store, hash_mode=hash_mode, data=data)
+        with lock:
+            done[0] += 1
+            progress(files_done=done[0])
+        return fp
+
+    clear_directory(student_dir, 'mahasiswa')
+    print(f"Sumber arsip mahasiswa diterima: {student_sources}")
+    progress(phase='scraping_mahasiswa')
+    mahasiswa_fps = ingest_archives(student_sources, student_dir, 'mahasiswa', fingerprint, local_root, student_groups,
+                                    ingest_filter, url_policy)
+    if not mahasiswa_fps:
+        raise AnalysisError(
+            "Gagal mengambil file kode dari arsip repositori mahasiswa yang diberikan. "
+            "Pastikan sumber benar dan mengandung file kode yang didukung (mis. .js, .py, .java, dll.)."
+        )
+
+    print(f"Sumber arsip pembanding diterima: {github_sources}")
+    clear_directory(github_dir, 'GitHub')
+    progress(phase='scraping_github')
+    github_fps = []
+    if github_sources:
+        github_fps = ingest_archives(github_sources, github_dir, 'pembanding', fingerprint, local_root,
+                                     ingest_filter=ingest_filter, url_policy=url_policy)
+        if not github_fps:
+            raise AnalysisError(
+                "Gagal mengambil file kode dari arsip repositori pembanding yang diberikan. "
+                "Pastikan sumber benar dan mengandung file kode yang didukung (mis. .js, .py, .java, dll.)."
+            )
+    else:
+        print("Tidak ada sumber pembanding yang diberikan.")
+
+    if base_sources:
+        progress(phase='scraping_base')
+        base_fps = ingest_archives(base_sources, base_dir, 'dasar', fingerprint, local_root, ingest_filter=ingest_filter,
+                                   url_policy=url_policy)
+        for fp in base_fps:
+            fingerprint_filter.add_base(fp)
+        print(f"Korpus dasar: {len(base_fps)} file, {len(fingerprint_filter.base_hashes)} fingerprint diabaikan.")
+
+    # Fingerprint sudah dihitung saat arsip dibaca
+    files_total = len(mahasiswa_fps) + len(github_fps)
+    progress(phase='fingerprinting', files_done=files_total, files_total=files_total)
+    print("\nMemulai perbandingan menggunakan MOSS-like...")
+    return _compare_and_finish(mahasiswa_fps, github_fps, workers, progress, report, student_groups, fingerprint_filter,
+                               ingest_filter)
+
+
+def aligned_block_fields(fp_source, fp_compared):
+    """
+    Pasangan blok A <-> B (align_blocks) untuk satu baris hasil, dengan cakupan dalam persen.
+    coverage_source = persentase token file sumber yang ditemukan di file pembanding, dan sebaliknya.
+    """
+    if fp_source is None or fp_compared is None:
+        return {}
+    with metrics.stage('align'):
+        aligned = align_blocks(fp_source, fp_compared)
+    return {
+        "block_pairs": [{
+            "source": pair['a'],
+            "compared": pair['b'],
+            "tokens": pair['tokens'],
+            "coverage_source": round(pair['coverage_a'] * 100, 2),
+            "coverage_compared": round(pair['coverage_b'] * 100, 2),
+        } for pair in aligned['pairs']],
+        "coverage_source": round(aligned['coverage_a'] * 100, 2),
+        "coverage_compared": round(aligned['coverage_b'] * 100, 2),
+    }
+
+
+class _ResultFilter:
+    """
+    Menerapkan min_score dan top_k pada hasil query satu file mahasiswa (sudah terurut dari
+    skor tertinggi), lalu meneruskan setiap baris yang lolos ke on_result.
+    """
+    def __init__(self, min_score=0.0, top_k=None, on_result=None):
+        self.min_score = min_score or 0.0
+        self.top_k = top_k or None
+        self.on_result = on_result
+
+    @property
+    def index_min_score(self):
+        # Skor mentah (0..1) terkecil yang setelah dibulatkan ke 2 desimal persen masih >= min_score
+        return max(0.0, self.min_score - 0.005) / 100 if self.min_score else 0.0
+
+    def rows(self, source_file, matches, source_fp=None, references=None):
+        """
+        `source_fp` dan `references` (dict nama file -> FileFingerprint) dipakai untuk menyusun pasangan blok.
+        """
+        references = references or {}
+        rows = []
+        for match in matches:
+            score = round(match['score'] * 100, 2)
+            if score < self.min_score or (self.top_k is not None and len(rows) >= self.top_k):
+                break
+            row = {
+                "comparison": "mh_vs_gh",
+                "source_file": source_file,
+                "compared_file": match['file_id'],
+                "score": score,
+                "similar_blocks_mhs": match['blocks_query'],
+                "similar_blocks_gh": match['blocks_match']
+            }
+            row.update(aligned_block_fields(source_fp, references.get(match['file_id'])))
+            rows.append(row)
+            self.emit(row)
+        return rows
+
+    def emit(self, row):
+        if self.on_result is not None:
+            self.on_result(row)
+
+
+# Pasangan mahasiswa dengan skor (persen) minimal ini dikelompokkan menjadi satu klaster
+COLLUSION_MIN_SCORE = 50.0
+
+def compare_student_files(mahasiswa_fps, groups, report, progress=_no_progress):
+    """
+    Deteksi kolusi antar mahasiswa: satu indeks per keluarga bahasa atas file mahasiswa lalu
+    self-join, sehingga hanya pasangan sebahasa yang berbagi fingerprint yang dihitung. Pasangan
+    dari repo yang sama dilewati. Mengembalikan (baris mh_vs_mh, klaster).
+    """
+    progress(phase='comparing_mahasiswa')
+    with metrics.stage('compare_students'):
+        items = [(os.path.basename(fp.path), fp) for fp in mahasiswa_fps]
+        by_name = dict(items)
+        pairs = self_join_by_language(items, report.index_min_score, group_of=groups.get)
+    families = partition_by_family(mahasiswa_fps, lambda fp: fp.path)
+    metrics.PAIRS_COMPARED.inc(sum(len(fps) * (len(fps) - 1) // 2 for fps in families.values()),
+                               comparison='mh_vs_mh')
+
+    rows = []
+    for pair in pairs:
+        score = round(pair['score'] * 100, 2)
+        if score < report.min_score:
+            continue
+        row = {
+            "comparison": "mh_vs_mh",
+            "source_file": pair['file_a'],
+            "compared_file": pair['file_b'],
+            "score": score,
+            "similar_blocks_source": pair['blocks_a'],
+            "similar_blocks_compared": pair['blocks_b'],
+        }
+        row.update(aligned_block_fields(by_name.get(pair['file_a']), by_name.get(pair['file_b'])))
+        rows.append(row)
+        report.emit(row)
+
+    clusters = []
+    for cluster in similarity_clusters(pairs, COLLUSION_MIN_SCORE / 100):
+        clusters.append({
+            "files": cluster['files'],
+            "repos": sorted({groups.get(f) for f in cluster['files']} - {None}),
+            "max_score": round(cluster['max_score'] * 100, 2),
+            "pairs": cluster['pairs'],
+        })
+    print(f"Perbandingan Mahasiswa vs Mahasiswa selesai. Total: {len(rows)} pasangan, {len(clusters)} klaster.")
+    return rows, clusters
+
+
+def _compare_and_finish(mahasiswa_fps, github_fps, workers, progress, report, student_groups=None,
+                        fingerprint_filter=None, ingest_filter=None):
+    if fingerprint_filter is not None:
+        # Boilerplate dibuang sebelum indeks dibangun, jadi postings dan pasangan kandidat ikut menyusut
+        with metrics.stage('filter'):
+            fingerprint_filter.fit(mahasiswa_fps + github_fps)
+            mahasiswa_fps = fingerprint_filter.apply_all(mahasiswa_fps)
+            github_fps = fingerprint_filter.apply_all(github_fps)
+        print(f"Filter boilerplate: {fingerprint_filter.stats()}")
+
+    results_mh_vs_gh = []
+    if github_fps:
+        # Hanya pasangan yang berbagi fingerprint yang dihitung skornya (lewat indeks terbalik)
+        github_items = [(os.path.basename(fp.path), fp) for fp in github_fps]
+        mahasiswa_items = [(os.path.basename(fp.path), fp) for fp in mahasiswa_fps]
+        # Pasangan lintas bahasa (mis. .py vs .java) tidak pernah masuk indeks yang sama
+        pairs_total = compatible_pair_count([fp.path for fp in mahasiswa_fps], [fp.path for fp in github_fps])
+        skipped_pairs = len(mahasiswa_items) * len(github_items) - pairs_total
+        if skipped_pairs:
+            print(f"Melewati {skipped_pairs} pasangan lintas bahasa.")
+        pairs_done = 0
+        progress(phase='comparing', pairs_done=0, pairs_total=pairs_total)
+        # Dengan top_k/min_score, indeks hanya menghitung skor dan blok untuk pasangan yang bisa lolos
+        ranked = compare_corpus_by_language(mahasiswa_items, github_items, workers,
+                                            top_k=report.top_k, min_score=report.index_min_score)
+        sources, references = dict(mahasiswa_items), dict(github_items)
+        # Durasi 'compare' termasuk penyusunan pasangan blok ('align') untuk baris yang dilaporkan
+        with metrics.stage('compare'):
+            for m_filename, matches, compared in ranked:
+                results_mh_vs_gh.extend(report.rows(m_filename, matches, sources.get(m_filename), references))
+                pairs_done += compared
+                metrics.PAIRS_COMPARED.inc(compared, comparison='mh_vs_gh')
+                progress(pairs_done=pairs_done)
+        print(f"Perbandingan Mahasiswa vs GitHub selesai. Total: {len(results_mh_vs_gh)} pasangan dilaporkan.")
+    else:
+        print("Tidak ada file GitHub untuk dibandingkan.")
+
+    result = {
+        "mh_vs_gh_results": results_mh_vs_gh,
+    }
+    if fingerprint_filter is not None:
+        result["fingerprint_filter"] = fingerprint_filter.stats()
+    if ingest_filter is not None:
+        result["skipped_files"] = ingest_filter.report()
+        print(f"File yang dilewati saat ingest: {result['skipped_files']['by_reason']}")
+    if student_groups is not None:
+        result["mh_vs_mh_results"], result["collusion_clusters"] = compare_student_files(
+            mahasiswa_fps, student_groups, report, progress
+        )
+
+    print("Analisis selesai.")
+    progress(phase='done')
+    return result
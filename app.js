@@ -7,18 +7,33 @@ document.addEventListener('DOMContentLoaded', () => {
   const githubAddBtn = document.getElementById('addGithubUrl');
   const githubList = document.getElementById('githubUrlList');
 
+  const baseInput = document.getElementById('baseUrlInput');
+  const baseAddBtn = document.getElementById('addBaseUrl');
+  const baseList = document.getElementById('baseUrlList');
+
+  const minScoreInput = document.getElementById('minScoreInput');
+  const topKInput = document.getElementById('topKInput');
+
   const runBtn = document.getElementById('runAnalysisButton');
   const loading = document.getElementById('loadingIndicator');
   const resultSection = document.getElementById('results-section');
   const tableBody = document.getElementById('mhVsGhResults');
   const noResult = document.getElementById('noResults');
+  const mhVsMhSection = document.getElementById('mhVsMhSection');
+  const mhVsMhBody = document.getElementById('mhVsMhResults');
+  const clusterList = document.getElementById('collusionClusters');
+  const skippedFiles = document.getElementById('skippedFiles');
+  const skippedFilesSummary = document.getElementById('skippedFilesSummary');
+  const skippedFilesList = document.getElementById('skippedFilesList');
 
   const modal = document.getElementById('codeCompareModal');
   const codeMhs = document.getElementById('code-mhs');
   const codeGh = document.getElementById('code-gh');
+  const blockPairList = document.getElementById('blockPairList');
 
   let studentUrls = [];
   let githubUrls = [];
+  let baseUrls = [];
   let lastResults = [];
 
   function updateList(listEl, urls) {
@@ -53,6 +68,15 @@ document.addEventListener('DOMContentLoaded', () => {
     }
   };
 
+  baseAddBtn.onclick = () => {
+    const url = baseInput.value.trim();
+    if (url && !baseUrls.includes(url)) {
+      baseUrls.push(url);
+      baseInput.value = '';
+      updateList(baseList, baseUrls);
+    }
+  };
+
   runBtn.onclick = async () => {
     if (!studentUrls.length) {
       alert('Tambahkan minimal satu URL mahasiswa.');
@@ -62,98 +86,316 @@ document.addEventListener('DOMContentLoaded', () => {
     loading.classList.remove('hidden');
     resultSection.classList.add('hidden');
     tableBody.innerHTML = '';
+    mhVsMhBody.innerHTML = '';
+    clusterList.innerHTML = '';
+    skippedFiles.classList.add('hidden');
+    skippedFilesList.innerHTML = '';
+    mhVsMhSection.classList.add('hidden');
     noResult.classList.add('hidden');
+    lastResults = [];
 
     const formData = new FormData();
     formData.append('student_repo_urls', JSON.stringify(studentUrls));
     formData.append('github_urls', JSON.stringify(githubUrls));
+    formData.append('base_repo_urls', JSON.stringify(baseUrls));
+    formData.append('min_score', minScoreInput.value || '0');
+    formData.append('top_k', topKInput.value || '0');
 
     try {
-      const res = await fetch('/analyze_code', {
+      const res = await fetch('/jobs', {
         method: 'POST',
         body: formData
       });
-      const data = await res.json();
-      lastResults = data.mh_vs_gh_results || [];
-      displayResults(lastResults);
+      const job = await res.json();
+      if (!res.ok) throw new Error(job.error || 'Gagal membuat job analisis.');
+
+      await streamJob(job.stream_url);
+      if (!lastResults.length) noResult.classList.remove('hidden');
     } catch (err) {
       console.error(err);
-      alert('Gagal menjalankan analisis.');
+      alert(err.message || 'Gagal menjalankan analisis.');
     } finally {
       loading.classList.add('hidden');
+      loading.textContent = loadingDefaultText;
     }
   };
 
-  function displayResults(results) {
-    if (!results.length) {
-      noResult.classList.remove('hidden');
-      return;
+  const loadingDefaultText = loading.textContent;
+  const phaseLabels = {
+    queued: 'Menunggu antrean',
+    scraping_mahasiswa: 'Mengunduh repositori mahasiswa',
+    scraping_github: 'Mengunduh repositori pembanding',
+    scraping_base: 'Mengunduh repositori starter',
+    fingerprinting: 'Membuat fingerprint',
+    comparing: 'Membandingkan',
+    comparing_mahasiswa: 'Membandingkan antar mahasiswa',
+    done: 'Selesai'
+  };
+
+  function describeJob(job) {
+    let text = phaseLabels[job.phase] || 'Memproses analisis';
+    if (job.phase === 'fingerprinting' && job.files_total) {
+      text += ` (${job.files_done}/${job.files_total} file)`;
+    } else if (job.phase === 'comparing' && job.pairs_total) {
+      text += ` (${job.pairs_done}/${job.pairs_total} pasangan)`;
+    }
+    if (lastResults.length) {
+      text += ` - ${lastResults.length} hasil`;
+    }
+    return text + '...';
+  }
+
+  // Membaca stream NDJSON job: setiap pasangan langsung ditambahkan ke tabel
+  async function streamJob(streamUrl) {
+    const res = await fetch(streamUrl);
+    if (!res.ok) {
+      const data = await res.json();
+      throw new Error(data.error || 'Gagal membaca status job.');
     }
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let lastProgress = {};
 
-    const sortedResults = results.slice().sort((a, b) => b.score - a.score);
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        const event = JSON.parse(line);
+        if (event.type === 'result') {
+          appendResult(event.result);
+          loading.textContent = describeJob(lastProgress);
+        } else if (event.type === 'progress') {
+          lastProgress = event;
+          loading.textContent = describeJob(event);
+        } else if (event.type === 'error') {
+          throw new Error(event.error || 'Analisis gagal.');
+        } else if (event.type === 'done') {
+          displayClusters((event.summary || {}).collusion_clusters || []);
+          displaySkippedFiles((event.summary || {}).skipped_files);
+          return;
+        }
+      }
+    }
+    throw new Error('Koneksi stream terputus sebelum analisis selesai.');
+  }
 
-    sortedResults.forEach((r, idx) => {
-      const row = document.createElement('tr');
-      row.innerHTML = `
-        <td class="p-2">${r.source_file}</td>
-        <td class="p-2">${r.compared_file}</td>
+  // Baris disisipkan sesuai urutan skor (tertinggi di atas)
+  function appendResult(r) {
+    const index = lastResults.push(r) - 1;
+    const isStudentPair = r.comparison === 'mh_vs_mh';
+    const body = isStudentPair ? mhVsMhBody : tableBody;
+    const row = document.createElement('tr');
+    row.dataset.score = r.score;
+    row.innerHTML = `
+        <td class="p-2">${escapeHtml(r.source_file)}</td>
+        <td class="p-2">${escapeHtml(r.compared_file)}</td>
         <td class="p-2">${r.score}%</td>
-        <td class="p-2 text-right"><button class="bg-blue-500 text-white px-3 py-1 rounded text-sm" data-idx="${idx}">Lihat</button></td>
+        <td class="p-2 text-right"><button class="bg-blue-500 text-white px-3 py-1 rounded text-sm" data-idx="${index}">Lihat</button></td>
       `;
-      row.querySelector('button').onclick = () => openModal(results.indexOf(r));
-      tableBody.appendChild(row);
+    row.querySelector('button').onclick = () => openModal(index);
+
+    const before = Array.from(body.children).find(tr => parseFloat(tr.dataset.score) < r.score);
+    body.insertBefore(row, before || null);
+    resultSection.classList.remove('hidden');
+    if (isStudentPair) mhVsMhSection.classList.remove('hidden');
+  }
+
+  function displayClusters(clusters) {
+    if (!clusters.length) return;
+    clusterList.innerHTML = '<p class="font-semibold mb-1">Klaster submission yang saling mirip:</p>';
+    clusters.forEach((c, idx) => {
+      const p = document.createElement('p');
+      p.className = 'border-b py-1';
+      p.textContent = `#${idx + 1} (maks. ${c.max_score}%, ${c.repos.length} repo): ${c.files.join(', ')}`;
+      clusterList.appendChild(p);
     });
+    mhVsMhSection.classList.remove('hidden');
+  }
+
+  const skipReasons = {
+    path: 'folder vendor/build',
+    size: 'terlalu besar',
+    minified: 'minified',
+    generated: 'hasil generator',
+    entropy: 'data tertanam'
+  };
 
+  function displaySkippedFiles(report) {
+    if (!report || !report.total) return;
+    const counts = Object.entries(report.by_reason).map(([reason, n]) => `${n} ${skipReasons[reason] || reason}`);
+    skippedFilesSummary.textContent = `${report.total} file dilewati saat ingest (${counts.join(', ')})`;
+    report.files.forEach(f => {
+      const li = document.createElement('li');
+      li.textContent = `${f.path} - ${skipReasons[f.reason] || f.reason}${f.detail ? ` (${f.detail})` : ''}`;
+      skippedFilesList.appendChild(li);
+    });
+    skippedFiles.classList.remove('hidden');
     resultSection.classList.remove('hidden');
   }
 
   async function openModal(index) {
     const result = lastResults[index];
+    const isStudentPair = result.comparison === 'mh_vs_mh';
     modal.classList.remove('hidden');
     modal.classList.add('flex');
     modal.classList.remove('opacity-0', 'scale-95');
     requestAnimationFrame(() => modal.classList.add('opacity-100', 'scale-100'));
     codeMhs.innerHTML = 'Memuat...';
     codeGh.innerHTML = 'Memuat...';
+    blockPairList.innerHTML = '';
+
+    const pairs = result.block_pairs || [];
+    const blocksM = isStudentPair ? result.similar_blocks_source : result.similar_blocks_mhs;
+    const blocksG = isStudentPair ? result.similar_blocks_compared : result.similar_blocks_gh;
+    const viewM = openCodeView(codeMhs, 'mahasiswa', result.source_file, blocksM, pairs.map(p => p.source));
+    const viewG = openCodeView(codeGh, isStudentPair ? 'mahasiswa' : 'github', result.compared_file, blocksG, pairs.map(p => p.compared));
+    await Promise.all([viewM, viewG]);
+    displayBlockPairs(result);
+  }
 
+  // Viewer kode lazy: hanya blok yang disorot (plus konteks) yang dimuat di awal,
+  // sisanya dimuat per potongan saat digulir ke layar
+  const CONTEXT_LINES = 20;
+  const CHUNK_LINES = 400;
+  const MAX_RANGE_LINES = 2000;
+
+  async function fetchLines(fileType, filename, start, end) {
+    const url = `/code/${encodeURIComponent(fileType)}/${encodeURIComponent(filename)}/lines?start=${start}&end=${end}`;
+    const res = await fetch(url);
+    const data = await res.json();
+    if (!res.ok) throw new Error(data.error || 'Gagal memuat kode.');
+    return data;
+  }
+
+  async function fetchRange(fileType, filename, start, end) {
+    const lines = [];
+    const truncated = [];
+    for (let from = start; from <= end; from += MAX_RANGE_LINES) {
+      const data = await fetchLines(fileType, filename, from, Math.min(end, from + MAX_RANGE_LINES - 1));
+      lines.push(...data.lines);
+      truncated.push(...data.truncated);
+    }
+    return { lines, truncated };
+  }
+
+  function mergeRanges(ranges) {
+    const sorted = ranges.filter(r => r.end >= r.start).sort((a, b) => a.start - b.start);
+    const merged = [];
+    for (const r of sorted) {
+      const last = merged[merged.length - 1];
+      if (last && r.start <= last.end + 1) last.end = Math.max(last.end, r.end);
+      else merged.push({ start: r.start, end: r.end });
+    }
+    return merged;
+  }
+
+  async function openCodeView(target, fileType, filename, blocks, extraRanges) {
+    if (target.gapObserver) target.gapObserver.disconnect();
     try {
-      const [resM, resG] = await Promise.all([
-        fetch('/get_code_content', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ filename: result.source_file, file_type: 'mahasiswa' })
-        }),
-        fetch('/get_code_content', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ filename: result.compared_file, file_type: 'github' })
-        })
-      ]);
-      const dataM = await resM.json();
-      const dataG = await resG.json();
-
-      displayAndHighlightCode(dataM.content, result.similar_blocks_mhs, codeMhs);
-      displayAndHighlightCode(dataG.content, result.similar_blocks_gh, codeGh);
+      const meta = await fetchLines(fileType, filename, 1, 0);
+      const total = meta.line_count;
+      const wanted = [{ start: 1, end: CONTEXT_LINES * 2 }]
+        .concat(blocks.concat(extraRanges).map(b => ({ start: b.start - CONTEXT_LINES, end: b.end + CONTEXT_LINES })))
+        .map(r => ({ start: Math.max(1, r.start), end: Math.min(total, r.end) }));
+      const ranges = mergeRanges(wanted);
+      const chunks = await Promise.all(ranges.map(r => fetchRange(fileType, filename, r.start, r.end)));
+
+      const view = { target, fileType, filename, blocks };
+      target.gapObserver = new IntersectionObserver(entries => {
+        entries.filter(e => e.isIntersecting).forEach(e => loadGap(view, e.target));
+      }, { root: target.parentElement, rootMargin: '200px' });
+      target.innerHTML = '';
+      let next = 1;
+      ranges.forEach((r, i) => {
+        if (r.start > next) target.appendChild(createGap(view, next, r.start - 1));
+        target.appendChild(createChunk(chunks[i], r.start, blocks));
+        next = r.end + 1;
+      });
+      if (next <= total) target.appendChild(createGap(view, next, total));
+      target.parentElement.scrollTop = 0;
     } catch (err) {
       console.error(err);
-      codeMhs.textContent = 'Gagal memuat.';
-      codeGh.textContent = 'Gagal memuat.';
+      target.textContent = err.message || 'Gagal memuat.';
     }
   }
 
-  function displayAndHighlightCode(codeContent, blocks, target) {
-    const lines = codeContent.split('\n');
+  function createChunk(chunk, start, blocks) {
+    const span = document.createElement('span');
+    const truncated = new Set(chunk.truncated);
     let html = '';
-
-    lines.forEach((line, index) => {
-      const lineNum = index + 1;
+    chunk.lines.forEach((line, i) => {
+      const lineNum = start + i;
       const isHighlighted = blocks.some(block => lineNum >= block.start && lineNum <= block.end);
       const lineClass = isHighlighted ? 'highlight-code-line' : '';
-      html += `<span class="line-number">${lineNum}.</span><span class="line-content ${lineClass}">${escapeHtml(line)}</span>\n`;
+      const suffix = truncated.has(lineNum) ? ' \u2026 [baris dipotong]' : '';
+      html += `<span class="line-number">${lineNum}.</span><span class="line-content ${lineClass}" data-line="${lineNum}">${escapeHtml(line)}${suffix}</span>\n`;
     });
+    span.innerHTML = html;
+    return span;
+  }
 
-    target.innerHTML = html;
-    target.parentElement.scrollTop = 0;
+  function createGap(view, start, end) {
+    const gap = document.createElement('span');
+    gap.className = 'code-gap';
+    gap.dataset.start = start;
+    gap.dataset.end = end;
+    gap.textContent = `\u22ef baris ${start}-${end} belum dimuat \u22ef\n`;
+    view.target.gapObserver.observe(gap);
+    return gap;
+  }
+
+  async function loadGap(view, gap) {
+    if (gap.dataset.loading) return;
+    gap.dataset.loading = '1';
+    view.target.gapObserver.unobserve(gap);
+    const start = parseInt(gap.dataset.start, 10);
+    const end = parseInt(gap.dataset.end, 10);
+    const chunkEnd = Math.min(end, start + CHUNK_LINES - 1);
+    try {
+      const chunk = await fetchRange(view.fileType, view.filename, start, chunkEnd);
+      const parts = [createChunk(chunk, start, view.blocks)];
+      if (chunkEnd < end) parts.push(createGap(view, chunkEnd + 1, end));
+      gap.replaceWith(...parts);
+    } catch (err) {
+      console.error(err);
+      gap.textContent = `Gagal memuat baris ${start}-${end}.\n`;
+    }
+  }
+
+  // Daftar pasangan blok A <-> B; klik satu pasangan untuk menandai dan menggulir kedua panel
+  function displayBlockPairs(result) {
+    const pairs = result.block_pairs || [];
+    if (!pairs.length) return;
+    blockPairList.innerHTML = `<p class="font-semibold mb-1">Pasangan blok (${result.coverage_source}% kode kiri ditemukan di kanan, ${result.coverage_compared}% sebaliknya):</p>`;
+    pairs.forEach((pair, idx) => {
+      const item = document.createElement('button');
+      item.className = 'block w-full text-left border-b py-1 hover:bg-gray-100';
+      item.textContent = `#${idx + 1} baris ${pair.source.start}-${pair.source.end} \u2194 baris ${pair.compared.start}-${pair.compared.end} (${pair.tokens} token, ${pair.coverage_source}% / ${pair.coverage_compared}%)`;
+      item.onclick = () => {
+        focusBlock(codeMhs, pair.source);
+        focusBlock(codeGh, pair.compared);
+      };
+      blockPairList.appendChild(item);
+    });
+  }
+
+  function focusBlock(target, block) {
+    let first = null;
+    target.querySelectorAll('span.line-content').forEach(span => {
+      const lineNum = parseInt(span.dataset.line, 10);
+      const active = lineNum >= block.start && lineNum <= block.end;
+      span.classList.toggle('active-block-line', active);
+      if (active && !first) first = span;
+    });
+    if (first) {
+      const pane = target.parentElement;
+      pane.scrollTop += first.getBoundingClientRect().top - pane.getBoundingClientRect().top;
+    }
   }
 
   function escapeHtml(text) {
@@ -1,53 +1,210 @@
 import os
 import json
-from flask import Flask, request, jsonify, send_from_directory
-from werkzeug.utils import secure_filename
+import time
+from flask import Flask, request, jsonify, send_from_directory, g
 # import atexit # Hapus baris ini
 
 # Import fungsi dari skrip Anda
-from github_scraper import parse_github_blob_url_to_raw, download_raw_code, scrape_repo_files
-from similarity_checker import preprocess_code, get_similar_blocks
+from github_scraper import get_client
+from similarity_checker import DEFAULT_HASH_MODE
+from fingerprint_store import FingerprintStore
+from fingerprint_filter import FingerprintFilter
+from ingest_filter import IngestFilter, DEFAULT_EXCLUDE_GLOBS
+from analysis import (AnalysisError, INGEST_MODES, DEFAULT_ARCHIVE_HOSTS, ArchiveUrlPolicy, DataDirLock,
+                      clear_directory, run_analysis)
+from jobs import JobStore, JobRunner
+from source_view import LineIndexCache, SourceTooLarge, MAX_RANGE_LINES, MAX_FULL_CONTENT_BYTES
+import metrics
 
 app = Flask(__name__)
 
 # Konfigurasi direktori unggahan
 UPLOAD_FOLDER_MAHASISWA = 'data/mahasiswa'
 UPLOAD_FOLDER_GITHUB = 'data/github'
+UPLOAD_FOLDER_BASE = 'data/boilerplate'   # Kode starter / korpus dasar yang fingerprint-nya diabaikan
 
 app.config['UPLOAD_FOLDER_MAHASISWA'] = UPLOAD_FOLDER_MAHASISWA
 app.config['UPLOAD_FOLDER_GITHUB'] = UPLOAD_FOLDER_GITHUB
+app.config['UPLOAD_FOLDER_BASE'] = UPLOAD_FOLDER_BASE
 
 os.makedirs(UPLOAD_FOLDER_MAHASISWA, exist_ok=True)
 os.makedirs(UPLOAD_FOLDER_GITHUB, exist_ok=True)
+os.makedirs(UPLOAD_FOLDER_BASE, exist_ok=True)
 
-# Helper functions (clear_student_files, clear_github_files, etc. - NO CHANGES)
+# Store fingerprint persisten: file yang isinya sama tidak di-fingerprint ulang antar analisis
+app.config['FINGERPRINT_STORE_PATH'] = os.path.join('data', 'fingerprints.sqlite3')
+app.config['FINGERPRINT_STORE_MAX_BYTES'] = int(os.getenv('FINGERPRINT_STORE_MAX_BYTES', 256 * 1024 * 1024))
+fingerprint_store = FingerprintStore(app.config['FINGERPRINT_STORE_PATH'], app.config['FINGERPRINT_STORE_MAX_BYTES'])
+
+# 'rolling' (Karp-Rabin + lexer per bahasa, cepat) atau 'sha1' (tokenizer dan hash SHA-1 versi lama,
+# skor sama dengan versi lama)
+app.config['HASH_MODE'] = os.getenv('HASH_MODE', DEFAULT_HASH_MODE)
+
+# Jumlah proses untuk fingerprinting dan perbandingan. 1 = serial (default), 0 = semua core.
+# Job kecil tetap dijalankan serial walaupun nilai ini > 1.
+app.config['ANALYSIS_WORKERS'] = int(os.getenv('ANALYSIS_WORKERS', 1))
+
+# Cara mengambil repo: 'files' (satu request per file) atau 'archive' (satu tarball per repo).
+# Pada mode 'archive', arsip/direktori di LOCAL_CORPUS_DIR juga bisa dipakai sebagai sumber offline.
+app.config['INGEST_MODE'] = os.getenv('INGEST_MODE', 'files')
+app.config['LOCAL_CORPUS_DIR'] = os.path.join('data', 'corpora')
+# URL arsip langsung (.zip/.tar.gz) hanya diambil dari host ini (dipisah koma), dan hanya jika host
+# mengarah ke alamat publik. ARCHIVE_ALLOW_PRIVATE=1 mengizinkan mirror di jaringan internal.
+app.config['ARCHIVE_URL_HOSTS'] = tuple(
+    h.strip() for h in os.getenv('ARCHIVE_URL_HOSTS', ','.join(DEFAULT_ARCHIVE_HOSTS)).split(',') if h.strip()
+)
+app.config['ARCHIVE_ALLOW_PRIVATE'] = os.getenv('ARCHIVE_ALLOW_PRIVATE', '0') == '1'
+
+# Scraping inkremental: folder data tidak dikosongkan tiap analisis, hanya file yang berubah
+# (menurut SHA blob di manifest repo) yang diunduh ulang. INCREMENTAL_SCRAPE=0 untuk perilaku lama.
+app.config['INCREMENTAL_SCRAPE'] = os.getenv('INCREMENTAL_SCRAPE', '1') != '0'
+
+# Filter hasil default (bisa ditimpa per analisis lewat form): skor minimum dalam persen dan
+# jumlah pasangan teratas per file mahasiswa (0 = semua)
+app.config['RESULT_MIN_SCORE'] = float(os.getenv('RESULT_MIN_SCORE', 0))
+app.config['RESULT_TOP_K'] = int(os.getenv('RESULT_TOP_K', 0))
+
+# Deteksi kolusi antar mahasiswa (file dari repo yang sama tidak dibandingkan)
+app.config['COMPARE_STUDENTS'] = os.getenv('COMPARE_STUDENTS', '1') != '0'
+
+# Fingerprint yang muncul di lebih dari pecahan ini dari semua file dianggap boilerplate dan
+# dibuang sebelum perbandingan. Default 0 (nonaktif) agar skor tetap sama dengan versi tanpa filter;
+# aktifkan mis. dengan 0.5. Hanya berlaku untuk korpus >= 10 file.
+app.config['FINGERPRINT_MAX_DF'] = float(os.getenv('FINGERPRINT_MAX_DF', 0))
+
+# Filter saat ingest: path vendor/build (glob, dipisah koma), file di atas INGEST_MAX_FILE_BYTES
+# (dari tree API, sebelum diunduh) dan file minified/hasil generator dilewati. INGEST_FILTER=0 menonaktifkan.
+app.config['INGEST_FILTER'] = os.getenv('INGEST_FILTER', '1') != '0'
+app.config['INGEST_EXCLUDE_GLOBS'] = tuple(
+    g.strip() for g in os.getenv('INGEST_EXCLUDE_GLOBS', ','.join(DEFAULT_EXCLUDE_GLOBS)).split(',') if g.strip()
+)
+app.config['INGEST_MAX_FILE_BYTES'] = int(os.getenv('INGEST_MAX_FILE_BYTES', 512 * 1024))
+
+# Profiling opsional per analisis: 'cprofile' (file .prof) atau 'sampling' (stack "folded"), ditulis ke PROFILE_DIR.
+# Kosong = nonaktif. Metric selalu aktif dan tersedia di /metrics.
+app.config['PROFILE_ANALYSES'] = os.getenv('PROFILE_ANALYSES', '') or None
+app.config['PROFILE_DIR'] = os.path.join('data', 'profiles')
+
+# Helper functions (clear_student_files, clear_github_files, etc.)
 def clear_student_files():
-    print(f"Membersihkan folder: {app.config['UPLOAD_FOLDER_MAHASISWA']}")
-    count = 0
-    for filename in os.listdir(app.config['UPLOAD_FOLDER_MAHASISWA']):
-        file_path = os.path.join(app.config['UPLOAD_FOLDER_MAHASISWA'], filename)
-        try:
-            if os.path.isfile(file_path) and not file_path.endswith('.gitkeep'):
-                os.unlink(file_path)
-                count += 1
-        except Exception as e:
-            print(f"Error deleting file {file_path}: {e}")
-    print(f"Berhasil menghapus {count} file mahasiswa.")
-    return count
+    return clear_directory(app.config['UPLOAD_FOLDER_MAHASISWA'], 'mahasiswa')
 
 def clear_github_files():
-    print(f"Membersihkan folder: {app.config['UPLOAD_FOLDER_GITHUB']}")
-    count = 0
-    for filename in os.listdir(app.config['UPLOAD_FOLDER_GITHUB']):
-        file_path = os.path.join(app.config['UPLOAD_FOLDER_GITHUB'], filename)
+    return clear_directory(app.config['UPLOAD_FOLDER_GITHUB'], 'GitHub')
+
+def parse_analysis_form(form):
+    """
+    Membaca parameter analisis dari form (daftar URL, ingest_mode, min_score, top_k) sebagai
+    dict argumen untuk analyze(). Melempar AnalysisError jika input tidak valid.
+    """
+    urls = {}
+    for field in ('student_repo_urls', 'github_urls', 'base_repo_urls'):
         try:
-            if os.path.isfile(file_path) and not file_path.endswith('.gitkeep'):
-                os.unlink(file_path)
-                count += 1
-        except Exception as e:
-            print(f"Error deleting file {file_path}: {e}")
-    print(f"Berhasil menghapus {count} file GitHub.")
-    return count
+            urls[field] = json.loads(form.get(field, '[]'))
+        except json.JSONDecodeError:
+            raise AnalysisError(f"Invalid JSON for {field}")
+    if not urls['student_repo_urls']:
+        raise AnalysisError("Mohon tambahkan setidaknya satu URL repositori mahasiswa.")
+    ingest_mode = form.get('ingest_mode') or app.config['INGEST_MODE']
+    if ingest_mode not in INGEST_MODES:
+        raise AnalysisError(f"Invalid ingest_mode: {ingest_mode}")
+    try:
+        min_score = float(form.get('min_score') or app.config['RESULT_MIN_SCORE'])
+        top_k = int(form.get('top_k') or app.config['RESULT_TOP_K'])
+    except ValueError:
+        raise AnalysisError("Invalid min_score or top_k")
+    if min_score < 0 or top_k < 0:
+        raise AnalysisError("min_score dan top_k tidak boleh negatif.")
+    compare_students = form.get('compare_students')
+    return {
+        "student_repo_urls": urls['student_repo_urls'],
+        "github_repo_urls": urls['github_urls'],
+        "ingest_mode": ingest_mode,
+        "min_score": min_score,
+        "top_k": top_k,
+        "compare_students": app.config['COMPARE_STUDENTS'] if compare_students is None else compare_students != '0',
+        "base_repo_urls": urls['base_repo_urls'],
+    }
+
+# Semua analisis memakai folder data yang sama, jadi dijalankan satu per satu, juga antar
+# proses worker server (lock pada file di data/)
+app.config['ANALYSIS_LOCK_PATH'] = os.path.join('data', 'analysis.lock')
+analysis_lock = DataDirLock(app.config['ANALYSIS_LOCK_PATH'])
+
+def analyze(student_repo_urls, github_repo_urls, ingest_mode=None, min_score=0.0, top_k=0,
+            compare_students=True, base_repo_urls=None, progress=None, on_result=None):
+    """
+    Menjalankan run_analysis dengan konfigurasi aplikasi.
+    """
+    fingerprint_filter = None
+    if app.config['FINGERPRINT_MAX_DF'] or base_repo_urls:
+        fingerprint_filter = FingerprintFilter(max_df=app.config['FINGERPRINT_MAX_DF'] or None)
+    ingest_filter = None
+    if app.config['INGEST_FILTER']:
+        ingest_filter = IngestFilter(app.config['INGEST_EXCLUDE_GLOBS'], app.config['INGEST_MAX_FILE_BYTES'])
+    with analysis_lock:
+        before = metrics.REGISTRY.snapshot()
+        started = time.perf_counter()
+        try:
+            with metrics.stage('analysis'):
+                result = run_analysis(
+                    student_repo_urls, github_repo_urls,
+                    app.config['UPLOAD_FOLDER_MAHASISWA'], app.config['UPLOAD_FOLDER_GITHUB'],
+                    store=fingerprint_store, hash_mode=app.config['HASH_MODE'], workers=app.config['ANALYSIS_WORKERS'],
+                    progress=progress, ingest_mode=ingest_mode or app.config['INGEST_MODE'],
+                    local_root=app.config['LOCAL_CORPUS_DIR'], incremental=app.config['INCREMENTAL_SCRAPE'],
+                    min_score=min_score, top_k=top_k, on_result=on_result, compare_students=compare_students,
+                    base_repo_urls=base_repo_urls, base_dir=app.config['UPLOAD_FOLDER_BASE'],
+                    fingerprint_filter=fingerprint_filter, ingest_filter=ingest_filter,
+                    archive_url_policy=ArchiveUrlPolicy(app.config['ARCHIVE_URL_HOSTS'],
+                                                        app.config['ARCHIVE_ALLOW_PRIVATE']),
+                )
+        except Exception:
+            metrics.ANALYSES.inc(status='error')
+            raise
+        metrics.ANALYSES.inc(status='done')
+        # Ringkasan waktu per tahap dan counter (token, pasangan, unduhan, cache) khusus analisis ini
+        result["timings"] = {"total_seconds": round(time.perf_counter() - started, 3),
+                             **metrics.REGISTRY.summary_since(before)}
+    result["fingerprint_store"] = fingerprint_store.stats()
+    result["github_rate_limit"] = get_client().rate_limit_status()
+    return result
+
+# Job analisis asinkron, status disimpan di SQLite agar bisa dibaca dari proses lain
+app.config['JOB_STORE_PATH'] = os.path.join('data', 'jobs.sqlite3')
+# Job selesai/gagal (beserta baris hasilnya) dihapus setelah JOB_RETENTION_SECONDS (0 = disimpan selamanya)
+app.config['JOB_RETENTION_SECONDS'] = float(os.getenv('JOB_RETENTION_SECONDS', 7 * 24 * 3600))
+job_store = JobStore(app.config['JOB_STORE_PATH'])
+job_runner = JobRunner(job_store, analyze, max_workers=1,
+                       profile_mode=app.config['PROFILE_ANALYSES'], profile_dir=app.config['PROFILE_DIR'],
+                       retention=app.config['JOB_RETENTION_SECONDS'] or None)
+
+# --- Metric ---
+
+metrics.REGISTRY.gauge('fingerprint_store_entries', 'Entri di FingerprintStore',
+                       lambda: fingerprint_store.stats()['entries'])
+metrics.REGISTRY.gauge('fingerprint_store_bytes', 'Ukuran FingerprintStore dalam byte',
+                       lambda: fingerprint_store.stats()['size_bytes'])
+metrics.REGISTRY.gauge('github_rate_limit_remaining', 'Sisa kuota GitHub API (terakhir terlihat)',
+                       lambda: get_client().rate_limit_status().get('remaining'))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        # Label memakai pola route (mis. /jobs/<job_id>), bukan URL, agar jumlah seri tetap kecil
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint,
+                                             method=request.method, status=response.status_code)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return app.response_class(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/')
 def index():
@@ -60,7 +217,8 @@ def serve_static(filename):
 @app.route('/clear_mahasiswa_files', methods=['POST'])
 def clear_mahasiswa_files_endpoint():
     try:
-        clear_student_files()
+        with analysis_lock:
+            clear_student_files()
         return jsonify({"message": "Semua file mahasiswa berhasil dihapus."}), 200
     except Exception as e:
         print(f"Error di endpoint /clear_mahasiswa_files: {e}")
@@ -69,13 +227,34 @@ def clear_mahasiswa_files_endpoint():
 @app.route('/clear_github_files', methods=['POST'])
 def clear_github_files_endpoint():
     try:
-        clear_github_files()
+        with analysis_lock:
+            clear_github_files()
         return jsonify({"message": "Semua file GitHub berhasil dihapus."}), 200
     except Exception as e:
         print(f"Error di endpoint /clear_github_files: {e}")
         return jsonify({"error": "Gagal menghapus file GitHub.", "details": str(e)}), 500
 
-# Endpoint: Untuk mengambil konten file kode asli (NO CHANGES)
+@app.route('/fingerprint_store/stats', methods=['GET'])
+def fingerprint_store_stats():
+    return jsonify(fingerprint_store.stats()), 200
+
+@app.route('/github/rate_limit', methods=['GET'])
+def github_rate_limit():
+    return jsonify(get_client().rate_limit_status()), 200
+
+CODE_FOLDERS = {'mahasiswa': 'UPLOAD_FOLDER_MAHASISWA', 'github': 'UPLOAD_FOLDER_GITHUB'}
+
+def resolve_code_path(file_type, filename):
+    """
+    Path file kode hasil analisis, atau None jika file_type/nama file tidak valid.
+    Nama file harus nama polos tanpa direktori.
+    """
+    folder = CODE_FOLDERS.get(file_type)
+    if folder is None or not filename or os.path.basename(filename) != filename or filename in ('.', '..'):
+        return None
+    return os.path.join(app.config[folder], filename)
+
+# Endpoint: Untuk mengambil konten file kode asli (seluruh isi; file besar ditolak, pakai /code/.../lines)
 @app.route('/get_code_content', methods=['POST'])
 def get_code_content():
     data = request.get_json()
@@ -85,18 +264,14 @@ def get_code_content():
     if not filename or not file_type:
         return jsonify({"error": "Filename and file_type are required."}), 400
 
-    base_dir = ""
-    if file_type == 'mahasiswa':
-        base_dir = app.config['UPLOAD_FOLDER_MAHASISWA']
-    elif file_type == 'github':
-        base_dir = app.config['UPLOAD_FOLDER_GITHUB']
-    else:
+    file_path = resolve_code_path(file_type, filename)
+    if file_path is None:
         return jsonify({"error": "Invalid file_type."}), 400
 
-    file_path = os.path.join(base_dir, filename)
-
     if not os.path.exists(file_path):
         return jsonify({"error": "File not found."}), 404
+    if os.path.getsize(file_path) > MAX_FULL_CONTENT_BYTES:
+        return jsonify({"error": "File terlalu besar; gunakan /code/<file_type>/<filename>/lines."}), 413
     
     try:
         with open(file_path, "r", encoding="utf-8") as f:
@@ -106,96 +281,155 @@ def get_code_content():
         print(f"Error reading file {file_path}: {e}")
         return jsonify({"error": f"Could not read file content: {str(e)}"}), 500
 
+# Indeks offset baris per file (mmap), dipakai ulang selama file tidak berubah
+line_index_cache = LineIndexCache()
 
-# Endpoint untuk menjalankan analisis (NO CHANGES)
-@app.route('/analyze_code', methods=['POST'])
-def analyze_code():
-    print("\n--- Memulai Analisis ---")
-    
-    clear_student_files() 
-    
-    student_repo_urls_str = request.form.get('student_repo_urls', '[]')
+@app.route('/code/<file_type>/<filename>/lines', methods=['GET'])
+def get_code_lines(file_type, filename):
+    """
+    Rentang baris satu file kode: ?start=1&end=200 (inklusif). Tanpa end, hanya metadata
+    (line_count, size) yang dikembalikan. Baris yang terlalu panjang dipotong dan dicatat di
+    `truncated`. Response memakai ETag (versi file + rentang), jadi bisa di-cache browser.
+    """
+    file_path = resolve_code_path(file_type, filename)
+    if file_path is None:
+        return jsonify({"error": "file_type atau nama file tidak valid."}), 400
     try:
-        student_repo_urls = json.loads(student_repo_urls_str)
-    except json.JSONDecodeError:
-        return jsonify({"error": "Invalid JSON for student_repo_urls"}), 400
+        start = int(request.args.get('start', 1))
+        end = int(request.args.get('end', 0))
+    except ValueError:
+        return jsonify({"error": "start dan end harus bilangan bulat."}), 400
+    start = max(1, start)
+    end = min(end, start + MAX_RANGE_LINES - 1)
 
-    print(f"URL Repositori Mahasiswa diterima: {student_repo_urls}")
-    
-    uploaded_student_files = [] 
-    if not student_repo_urls:
-        return jsonify({"error": "Mohon tambahkan setidaknya satu URL repositori mahasiswa."}), 400
-
-    for repo_url in student_repo_urls:
-        print(f"Mulai scraping repositori mahasiswa: {repo_url}")
-        downloaded = scrape_repo_files(repo_url, app.config['UPLOAD_FOLDER_MAHASISWA'])
-        uploaded_student_files.extend(downloaded)
-        print(f"Selesai scraping {repo_url}. Total file dari repo ini: {len(downloaded)}")
-    
-    if not uploaded_student_files:
-        return jsonify({
-            "error": "Gagal mengunduh file kode dari repositori mahasiswa yang diberikan. "
-                     "Pastikan URL repositori benar dan mengandung file kode yang didukung (mis. .js, .py, .java, dll.)."
-        }), 400
+    try:
+        index = line_index_cache.get(file_path)
+    except FileNotFoundError:
+        return jsonify({"error": "File not found."}), 404
+    except SourceTooLarge as e:
+        return jsonify({"error": str(e), "size": e.size, "limit": e.limit}), 413
+
+    etag = f"{index.etag}-{start}-{end}"
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    lines, truncated = index.read_lines(start, end)
+    response = jsonify({
+        "filename": filename,
+        "line_count": index.line_count,
+        "size": index.size,
+        "start": start,
+        "end": start + len(lines) - 1,
+        "lines": lines,
+        "truncated": truncated,
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
-    github_urls_str = request.form.get('github_urls', '[]')
+
+# Endpoint untuk menjalankan analisis secara sinkron (satu request sampai selesai)
+@app.route('/analyze_code', methods=['POST'])
+def analyze_code():
     try:
-        github_repo_urls = json.loads(github_urls_str)
-    except json.JSONDecodeError:
-        return jsonify({"error": "Invalid JSON for github_urls"}), 400
+        params = parse_analysis_form(request.form)
+        with metrics.profile(f"analysis-{time.strftime('%Y%m%d-%H%M%S')}", app.config['PROFILE_ANALYSES'],
+                             app.config['PROFILE_DIR']):
+            result = analyze(**params)
+    except AnalysisError as e:
+        return jsonify({"error": e.message}), e.status
+    print("Mengirim hasil.")
+    return jsonify(result)
 
-    print(f"URL Repositori GitHub diterima: {github_repo_urls}")
-    
-    clear_github_files()
-
-    scraped_github_files = []
-    if github_repo_urls:
-        for repo_url in github_repo_urls:
-            print(f"Mulai scraping repositori pembanding: {repo_url}")
-            downloaded = scrape_repo_files(repo_url, app.config['UPLOAD_FOLDER_GITHUB'])
-            scraped_github_files.extend(downloaded)
-            print(f"Selesai scraping {repo_url}. Total file dari repo ini: {len(downloaded)}")
-        
-        if not scraped_github_files:
-            return jsonify({
-                "error": "Gagal mengunduh file kode dari repositori GitHub pembanding yang diberikan. "
-                         "Pastikan URL repositori benar dan mengandung file kode yang didukung (mis. .js, .py, .java, dll.)."
-            }), 400
-    else:
-         print("Tidak ada URL GitHub pembanding yang diberikan.")
-
-    results_mh_vs_gh = []
-
-    mahasiswa_dir = app.config['UPLOAD_FOLDER_MAHASISWA']
-    github_dir = app.config['UPLOAD_FOLDER_GITHUB']
-
-    mahasiswa_file_paths = [os.path.join(mahasiswa_dir, f) for f in uploaded_student_files if os.path.isfile(os.path.join(mahasiswa_dir, f))]
-    github_file_paths = [os.path.join(github_dir, f) for f in scraped_github_files if os.path.isfile(os.path.join(github_dir, f))]
-
-    print("\nMemulai perbandingan menggunakan MOSS-like...")
-
-    if github_file_paths:
-        for m_path in mahasiswa_file_paths:
-            m_filename = os.path.basename(m_path)
-            for g_path in github_file_paths:
-                g_filename = os.path.basename(g_path)
-                score, blocks_mhs, blocks_gh = get_similar_blocks(m_path, g_path, k=5, w=10) # Sesuaikan k dan w jika perlu
-                
-                results_mh_vs_gh.append({
-                    "source_file": m_filename,
-                    "compared_file": g_filename,
-                    "score": round(score * 100, 2),
-                    "similar_blocks_mhs": blocks_mhs, 
-                    "similar_blocks_gh": blocks_gh    
-                })
-        print(f"Perbandingan Mahasiswa vs GitHub selesai. Total: {len(results_mh_vs_gh)} pasangan.")
-    else:
-        print("Tidak ada file GitHub untuk dibandingkan.")
-            
-    print("Analisis selesai. Mengirim hasil.")
+# Endpoint job asinkron: POST /jobs langsung mengembalikan id job, analisis berjalan di background
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    try:
+        params = parse_analysis_form(request.form)
+    except AnalysisError as e:
+        return jsonify({"error": e.message}), e.status
+    job_id = job_runner.submit(params)
     return jsonify({
-        "mh_vs_gh_results": results_mh_vs_gh,
-    })
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result",
+        "stream_url": f"/jobs/{job_id}/stream",
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job_store.fail_if_stale(job_id)
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found."}), 404
+    return jsonify(job), 200
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    job_store.fail_if_stale(job_id)
+    row = job_store.get_result(job_id)
+    if row is None:
+        return jsonify({"error": "Job not found."}), 404
+    status, result, error, error_status = row
+    if status == 'error':
+        return jsonify({"error": error}), error_status or 500
+    if status != 'done':
+        return jsonify({"error": "Job belum selesai.", "status": status}), 409
+    return app.response_class(result, mimetype='application/json')
+
+STREAM_POLL_INTERVAL = 0.5 # Detik
+
+def stream_job_events(job_id):
+    """
+    Generator baris NDJSON untuk satu job: {"type": "progress", ...} setiap kali status/progres
+    berubah, {"type": "result", "result": {...}} untuk setiap pasangan segera setelah tersimpan,
+    lalu {"type": "done", "total": n} atau {"type": "error", ...} di akhir.
+    Job yang heartbeat-nya berhenti (prosesnya mati) ditandai error, dan job yang sudah tidak ada
+    (mis. dihapus oleh retensi) diakhiri dengan event error, sehingga stream tidak menunggu selamanya.
+    """
+    last_seq = -1
+    last_state = None
+    while True:
+        rows = job_store.get_results(job_id, last_seq)
+        for seq, row in rows:
+            yield f'{{"type": "result", "result": {row}}}\n'
+            last_seq = seq
+        if rows:
+            continue
+
+        job_store.fail_if_stale(job_id)
+        job = job_store.get(job_id)
+        if job is None:
+            yield json.dumps({"type": "error", "error": "Job not found.", "status": 404}) + "\n"
+            return
+        state = {k: job[k] for k in ('status', 'phase', 'files_done', 'files_total', 'pairs_done', 'pairs_total')}
+        if state != last_state:
+            yield json.dumps({"type": "progress", **state}) + "\n"
+            last_state = state
+        if job['status'] == 'error':
+            _, _, error, error_status = job_store.get_summary(job_id)
+            yield json.dumps({"type": "error", "error": error, "status": error_status or 500}) + "\n"
+            return
+        if job['status'] == 'done':
+            # Baris terakhir ditulis sebelum status 'done', jadi cukup dikuras sekali lagi
+            for seq, row in job_store.get_results(job_id, last_seq, limit=-1):
+                yield f'{{"type": "result", "result": {row}}}\n'
+                last_seq = seq
+            # Ringkasan tanpa daftar pasangan (sudah dikirim per baris), mis. collusion_clusters
+            _, result, _, _ = job_store.get_summary(job_id)
+            summary = {k: v for k, v in json.loads(result).items() if not k.endswith('_results')}
+            yield json.dumps({"type": "done", "total": last_seq + 1, "summary": summary}) + "\n"
+            return
+        time.sleep(STREAM_POLL_INTERVAL)
+
+@app.route('/jobs/<job_id>/stream', methods=['GET'])
+def stream_job(job_id):
+    if job_store.get(job_id) is None:
+        return jsonify({"error": "Job not found."}), 404
+    return app.response_class(stream_job_events(job_id), mimetype='application/x-ndjson',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 # --- Hapus fungsi pembersihan saat shutdown ---
 # def cleanup_on_shutdown_with_choice():
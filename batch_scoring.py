@@ -0,0 +1,143 @@
+"""
+Penghitungan skor Jaccard secara batch: satu file sumber terhadap banyak file referensi dalam
+satu panggilan, tanpa membangun set Python per pasangan seperti calculate_moss_similarity.
+
+Dengan NumPy, hash unik setiap referensi disimpan sebagai array uint64 terurut. Semua array
+itu digabung menjadi satu array (hash, dokumen) yang terurut per hash. Untuk satu query,
+np.searchsorted mencari rentang setiap hash query di array gabungan, lalu np.bincount atas
+dokumen di rentang tersebut menghasilkan jumlah hash bersama untuk semua referensi sekaligus.
+Tanpa NumPy, dipakai fallback Python murni (postings dict) dengan antarmuka dan hasil yang sama.
+"""
+import heapq
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+
+def _hash_values(fingerprint):
+    """
+    Hash fingerprint (boleh berulang) dari FileFingerprint, iterable (hash, start_line, end_line),
+    atau iterable hash.
+    """
+    if hasattr(fingerprint, 'fp_hashes'):
+        return fingerprint.fp_hashes
+    return [fp[0] if isinstance(fp, tuple) else fp for fp in fingerprint]
+
+def sorted_hashes(fingerprint):
+    """
+    Hash unik satu file sebagai array uint64 terurut (NumPy wajib).
+    """
+    values = _hash_values(fingerprint)
+    if hasattr(values, 'typecode'):
+        # array('Q') dibaca langsung tanpa menyalin ke objek int Python
+        arr = np.frombuffer(values, dtype=np.uint64) if len(values) else np.empty(0, dtype=np.uint64)
+    else:
+        arr = np.fromiter(values, dtype=np.uint64)
+    return np.unique(arr)
+
+
+class BatchScorer:
+    """
+    Skor Jaccard satu file sumber terhadap semua referensi sekaligus.
+    references: list of (file_id, FileFingerprint atau iterable fingerprint).
+    `use_numpy` None berarti NumPy dipakai jika terpasang; False memaksa fallback Python murni.
+    Skornya sama persis dengan FingerprintIndex.query / compare_fingerprints.
+    """
+
+    def __init__(self, references, use_numpy=None):
+        self.use_numpy = HAVE_NUMPY if use_numpy is None else use_numpy
+        if self.use_numpy and not HAVE_NUMPY:
+            raise RuntimeError("BatchScorer dengan use_numpy=True membutuhkan numpy (pip install numpy).")
+        self.file_ids = [file_id for file_id, _ in references]
+        self._sort_keys = [str(file_id) for file_id in self.file_ids]
+
+        if self.use_numpy:
+            per_doc = [sorted_hashes(fingerprint) for _, fingerprint in references]
+            self.sizes = np.array([len(arr) for arr in per_doc], dtype=np.int64)
+            if per_doc:
+                all_hashes = np.concatenate(per_doc)
+                all_docs = np.repeat(np.arange(len(per_doc), dtype=np.int32), self.sizes)
+            else:
+                all_hashes = np.empty(0, dtype=np.uint64)
+                all_docs = np.empty(0, dtype=np.int32)
+            order = np.argsort(all_hashes, kind='stable')
+            self._hashes = all_hashes[order]
+            self._docs = all_docs[order]
+        else:
+            self._postings = {}     # hash -> list doc
+            self.sizes = []
+            for doc, (_, fingerprint) in enumerate(references):
+                hashes = set(_hash_values(fingerprint))
+                self.sizes.append(len(hashes))
+                for h in hashes:
+                    self._postings.setdefault(h, []).append(doc)
+
+    def __len__(self):
+        return len(self.file_ids)
+
+    def shared_counts(self, fingerprint):
+        """
+        Mengembalikan (jumlah hash unik query, jumlah hash bersama per referensi).
+        Jumlah hash bersama berupa array int64 (NumPy) atau list int (fallback), urut seperti `references`.
+        """
+        if not self.use_numpy:
+            query = set(_hash_values(fingerprint))
+            counts = [0] * len(self.file_ids)
+            for h in query:
+                for doc in self._postings.get(h, ()):
+                    counts[doc] += 1
+            return len(query), counts
+
+        query = sorted_hashes(fingerprint)
+        left = np.searchsorted(self._hashes, query, side='left')
+        right = np.searchsorted(self._hashes, query, side='right')
+        lengths = right - left
+        total = int(lengths.sum())
+        if not total:
+            return len(query), np.zeros(len(self.file_ids), dtype=np.int64)
+        # Indeks semua entri di rentang [left, right) tiap hash query, tanpa loop Python
+        starts = np.repeat(left - np.cumsum(lengths) + lengths, lengths)
+        positions = starts + np.arange(total)
+        return len(query), np.bincount(self._docs[positions], minlength=len(self.file_ids))
+
+    def score_row(self, fingerprint):
+        """
+        Jaccard query terhadap setiap referensi: (jumlah hash bersama, skor 0..1), keduanya
+        urut seperti `references`. Pasangan dengan union kosong diberi skor 0.
+        """
+        query_size, shared = self.shared_counts(fingerprint)
+        if not self.use_numpy:
+            scores = []
+            for count, size in zip(shared, self.sizes):
+                union = query_size + size - count
+                scores.append(count / union if union else 0.0)
+            return shared, scores
+        union = query_size + self.sizes - shared
+        scores = np.divide(shared, union, out=np.zeros(len(shared), dtype=np.float64), where=union > 0)
+        return shared, scores
+
+    def top_k(self, fingerprint, k=None, min_score=0.0):
+        """
+        Referensi yang berbagi fingerprint dengan query, skor >= min_score, terurut dari skor
+        tertinggi lalu file_id (sama dengan FingerprintIndex.query_top_k); paling banyak `k` jika diberikan.
+        Mengembalikan list (file_id, skor, jumlah hash bersama).
+        """
+        if k is not None and k <= 0:
+            return []
+        shared, scores = self.score_row(fingerprint)
+        if not self.use_numpy:
+            candidates = [(-score, self._sort_keys[doc], doc) for doc, score in enumerate(scores)
+                          if shared[doc] and score >= min_score]
+        else:
+            docs = np.flatnonzero((shared > 0) & (scores >= min_score))
+            if k is not None and len(docs) > k:
+                # Batas skor ke-k; dokumen dengan skor sama tetap ikut agar urutan file_id menentukan
+                kth = np.partition(scores[docs], len(docs) - k)[len(docs) - k]
+                docs = docs[scores[docs] >= kth]
+            candidates = [(-float(scores[doc]), self._sort_keys[doc], int(doc)) for doc in docs]
+        winners = heapq.nsmallest(k, candidates) if k is not None else sorted(candidates)
+        return [(self.file_ids[doc], -neg_score, int(shared[doc])) for neg_score, _, doc in winners]
@@ -0,0 +1,103 @@
+"""
+Benchmark penghitungan skor Jaccard satu query terhadap semua referensi:
+  pairwise  - calculate_moss_similarity per pasangan (set Python baru setiap pasangan)
+  index     - FingerprintIndex.query_top_k (postings dict, rarest-first)
+  python    - BatchScorer fallback Python murni
+  numpy     - BatchScorer dengan array uint64 terurut + searchsorted/bincount
+
+Korpus sama dengan bench_topk: hash umum (Zipf) bercampur hash unik, sebagian query menyalin
+potongan dari satu file referensi. Semua metode harus menghasilkan K teratas yang identik.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_batch_scoring
+    python -m benchmarks.bench_batch_scoring --references 20000 --queries 50 --pairwise-queries 2
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_scoring import BatchScorer, HAVE_NUMPY
+from fingerprint_index import FingerprintIndex
+from similarity_checker import calculate_moss_similarity
+from benchmarks.bench_topk import make_file
+
+
+def pairwise_top_k(query, references, k):
+    scored = []
+    for file_id, fps in references:
+        score = calculate_moss_similarity(query, fps)
+        if score > 0:
+            scored.append((-score, file_id))
+    scored.sort()
+    return [(file_id, -neg_score) for neg_score, file_id in scored[:k]]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--references', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--pairwise-queries', type=int, default=5,
+                        help='jumlah query untuk metode pairwise (lambat); waktunya diskalakan ke --queries')
+    parser.add_argument('--fingerprints', type=int, default=200, help='fingerprint per file')
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    references = []
+    for i in range(args.references):
+        references.append((f'ref_{i}', make_file(rng, args.fingerprints, 500, (i + 1) << 41)))
+    queries = [make_file(rng, args.fingerprints, 500, (args.references + i + 1) << 41,
+                         copy_from=rng.choice(references)[1])
+               for i in range(args.queries)]
+
+    index = FingerprintIndex()
+    build = {}
+    _, build['index'] = timed(lambda: [index.add(file_id, fps) for file_id, fps in references])
+    scorers = {'python': None}
+    scorers['python'], build['python'] = timed(lambda: BatchScorer(references, use_numpy=False))
+    if HAVE_NUMPY:
+        scorers['numpy'], build['numpy'] = timed(lambda: BatchScorer(references, use_numpy=True))
+
+    results, seconds = {}, {}
+    n_pairwise = min(args.pairwise_queries, args.queries)
+    pairwise, elapsed = timed(lambda: [pairwise_top_k(q, references, args.k) for q in queries[:n_pairwise]])
+    seconds['pairwise'] = elapsed * args.queries / max(1, n_pairwise)
+    top, seconds['index'] = timed(lambda: [index.query_top_k(q, args.k) for q in queries])
+    results['index'] = [[(r['file_id'], r['score'], r['shared']) for r in rows] for rows in top]
+    for name, scorer in scorers.items():
+        results[name], seconds[name] = timed(lambda: [scorer.top_k(q, args.k) for q in queries])
+
+    pairs = args.references * args.queries
+    print(f"{args.references} referensi, {args.queries} query, {args.fingerprints} fingerprint/file, k={args.k}")
+    print(f"{'metode':>10} {'build ms':>10} {'query ms':>10} {'pasangan/s':>14}")
+    for name in ('pairwise', 'index', 'python', 'numpy'):
+        if name not in seconds:
+            continue
+        build_ms = f"{build[name] * 1000:.1f}" if name in build else '-'
+        note = f"  (diskalakan dari {n_pairwise} query)" if name == 'pairwise' else ''
+        print(f"{name:>10} {build_ms:>10} {seconds[name] * 1000:10.1f} {pairs / seconds[name]:14,.0f}{note}")
+    if not HAVE_NUMPY:
+        print("numpy tidak terpasang; hanya fallback Python yang diukur.")
+
+    expected = results['index']
+    same = all(results[name] == expected for name in results)
+    same_pairwise = all([(f, s) for f, s, _ in expected[i]] == pairwise[i] for i in range(n_pairwise))
+    print(f"hasil identik: {same and same_pairwise}")
+    if 'numpy' in seconds:
+        print(f"speedup numpy vs index: {seconds['index'] / seconds['numpy']:.1f}x, "
+              f"vs pairwise: {seconds['pairwise'] / seconds['numpy']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark hashing k-gram: mode 'sha1' (generate_k_grams + hash_k_gram) vs 'rolling' (Karp-Rabin).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_hashing
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from similarity_checker import hash_k_grams, HASH_MODES
+
+
+def make_tokens(n_tokens, seed=0):
+    """
+    Membuat daftar (token, nomor_baris) sintetis yang menyerupai output preprocess_code.
+    """
+    rng = random.Random(seed)
+    vocab = ['if', 'for', 'return', 'function', 'const', 'STRING_LITERAL', '0', '1'] + \
+            [f'VAR_{i}' for i in range(200)]
+    tokens = []
+    line = 1
+    for _ in range(n_tokens):
+        tokens.append((rng.choice(vocab), line))
+        if rng.random() < 0.15:
+            line += 1
+    return tokens
+
+
+def time_mode(tokens, k, hash_mode, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hash_k_grams(tokens, k, hash_mode)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'tokens':>8} " + ' '.join(f"{mode + ' (ms)':>14}" for mode in HASH_MODES) + f" {'speedup':>8}")
+    for size in args.sizes:
+        tokens = make_tokens(size)
+        timings = {mode: time_mode(tokens, args.k, mode, args.repeat) for mode in HASH_MODES}
+        speedup = timings['sha1'] / timings['rolling'] if timings['rolling'] else float('inf')
+        print(f"{size:>8} " + ' '.join(f"{timings[mode] * 1000:>14.2f}" for mode in HASH_MODES) + f" {speedup:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
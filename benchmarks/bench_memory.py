@@ -0,0 +1,132 @@
+"""
+Benchmark memori: peak RSS untuk preprocessing + fingerprinting banyak file sekaligus
+(semua FileFingerprint tetap dipegang, seperti selama satu analisis).
+
+Mode yang dibandingkan, masing-masing dijalankan di proses terpisah agar peak RSS tidak bercampur:
+  legacy  - representasi lama: list (token_str, baris), list baris asli dari splitlines(),
+            tuple k-gram dari generate_k_grams dan list (hash, start, end) per file
+  tuples  - token sebagai list tuple (token_id, baris) di samping array hash/fingerprint
+  stream  - TokenStream (array('I') id + baris, offset byte per baris) dari compute_fingerprint
+
+Secara default memakai korpus sintetis (--files file x --lines baris) di direktori sementara;
+berikan DIR untuk memakai file sungguhan. Hanya berjalan di sistem yang punya modul `resource`.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_memory [--files 1000] [--lines 400] [DIR ...]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = ('legacy', 'tuples', 'stream')
+CODE_EXTENSIONS = ('.js', '.py', '.java', '.c', '.cpp', '.h')
+
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def make_corpus(directory, files, lines, seed=0):
+    rng = random.Random(seed)
+    for i in range(files):
+        body = []
+        for j in range(lines):
+            body.append(f"  let v{rng.randrange(40)} = call{rng.randrange(25)}(arg{rng.randrange(9)}, "
+                        f"{rng.randrange(100)}) + \"s{rng.randrange(5)}\"; // baris {j}\n")
+        with open(os.path.join(directory, f'file_{i}.js'), 'w', encoding='utf-8') as f:
+            f.write(f"function main{i}() {{\n{''.join(body)}}}\n")
+
+
+def collect_files(dirs):
+    paths = []
+    for d in dirs:
+        for root, _, names in os.walk(d):
+            paths.extend(os.path.join(root, n) for n in sorted(names) if n.endswith(CODE_EXTENSIONS))
+    return paths
+
+
+def run_mode(mode, paths, k, w):
+    from similarity_checker import (compute_fingerprint, read_source, tokenize_source, token_string,
+                                    generate_k_grams, hash_k_grams, winnowing)
+    kept = []
+    start = time.perf_counter()
+    for path in paths:
+        if mode == 'legacy':
+            text = read_source(path) or ''
+            tokens = [(token_string(t), line) for t, line in tokenize_source(text)]
+            original_lines = text.splitlines(keepends=True)
+            k_grams = generate_k_grams(tokens, k)
+            hashed = hash_k_grams(tokens, k)
+            kept.append((tokens, original_lines, k_grams, hashed, winnowing(hashed, w)))
+        elif mode == 'tuples':
+            fingerprint = compute_fingerprint(path, k, w)
+            fingerprint.tokens_with_lines = list(fingerprint.tokens_with_lines)
+            kept.append(fingerprint)
+        else:
+            kept.append(compute_fingerprint(path, k, w))
+    elapsed = time.perf_counter() - start
+    return {'mode': mode, 'files': len(kept), 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('dirs', nargs='*')
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--lines', type=int, default=400)
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('-w', type=int, default=10)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # Proses anak: satu mode, hasil dicetak sebagai JSON
+        paths = collect_files(args.dirs)
+        baseline = peak_rss_mb()
+        result = run_mode(args.mode, paths, args.k, args.w)
+        result['baseline_rss_mb'] = baseline
+        print(json.dumps(result))
+        return
+
+    tmp_dir = None
+    dirs = args.dirs
+    if not dirs:
+        tmp_dir = tempfile.mkdtemp(prefix='bench_memory_')
+        make_corpus(tmp_dir, args.files, args.lines)
+        dirs = [tmp_dir]
+    try:
+        paths = collect_files(dirs)
+        total_bytes = sum(os.path.getsize(p) for p in paths)
+        print(f"{len(paths)} file, {total_bytes / (1024 * 1024):.1f} MiB kode, k={args.k}, w={args.w}")
+        results = {}
+        for mode in MODES:
+            out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_memory', '--mode', mode,
+                                  '-k', str(args.k), '-w', str(args.w), *dirs],
+                                 cwd=ROOT, capture_output=True, text=True, check=True)
+            results[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+        for mode, r in results.items():
+            print(f"{mode:>7}: peak RSS {r['peak_rss_mb']:8.1f} MiB "
+                  f"(+{r['peak_rss_mb'] - r['baseline_rss_mb']:7.1f} di atas baseline), {r['seconds']:6.2f} s")
+        legacy, stream = results['legacy'], results['stream']
+        grown_legacy = legacy['peak_rss_mb'] - legacy['baseline_rss_mb']
+        grown_stream = stream['peak_rss_mb'] - stream['baseline_rss_mb']
+        if grown_stream > 0:
+            print(f"legacy/stream (di atas baseline): {grown_legacy / grown_stream:.1f}x")
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
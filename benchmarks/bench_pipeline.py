@@ -0,0 +1,253 @@
+"""
+Benchmark pipeline kemiripan end-to-end di atas korpus plagiarisme sintetis (synthetic_corpus).
+
+Tahap yang diukur (waktu terbaik dari --repeat kali):
+  read        - read_source_bytes + decode                      (MiB/s)
+  tokenize    - tokenize_source                                 (token/s)
+  hash        - hash_k_gram_arrays                              (k-gram/s)
+  winnow      - winnow                                          (k-gram/s)
+  fingerprint - fingerprint_paths (compute_fingerprint, -j)     (token/s)
+  compare     - compare_corpus: indeks + query semua mahasiswa  (pasangan/s)
+  analyze     - jalur /analyze_code setelah fingerprint: perbandingan, filter hasil
+                dan pasangan blok (analysis._compare_and_finish)  (pasangan/s)
+Peak RSS proses dicatat setelah setiap tahap. Precision/recall dihitung dari skor compare terhadap
+ground truth korpus, per ambang (--thresholds) dan per transformasi pada --threshold.
+
+--save menyimpan hasil sebagai baseline JSON; --baseline membandingkan dengan baseline lama dan
+keluar dengan kode 1 jika throughput turun lebih dari --tolerance persen atau precision/recall turun.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_pipeline [--references 200] [--students 300] [--save baseline.json]
+    python -m benchmarks.bench_pipeline --corpus DIR --baseline baseline.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from similarity_checker import (DEFAULT_HASH_MODE, HASH_MODES, read_source_bytes, tokenize_source,
+                                hash_k_gram_arrays, winnow)
+from parallel_engine import fingerprint_paths
+from fingerprint_index import compare_corpus
+from analysis import _compare_and_finish, _ResultFilter, _no_progress
+from benchmarks.synthetic_corpus import add_corpus_arguments, corpus_params, generate_corpus
+
+BASELINE_VERSION = 1
+DEFAULT_THRESHOLDS = (5, 10, 20, 30, 40, 50, 60, 70, 80)
+# Precision/recall yang turun lebih dari ini dianggap regresi
+QUALITY_TOLERANCE = 0.01
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def timed(fn, repeat):
+    """
+    Menjalankan fn() `repeat` kali; mengembalikan (hasil terakhir, waktu terbaik dalam detik).
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def run_stages(student_paths, reference_paths, args):
+    """
+    Mengukur setiap tahap pipeline. Mengembalikan (dict tahap, skor compare {(mahasiswa, referensi): skor}).
+    """
+    paths = student_paths + reference_paths
+    stages = {}
+
+    def record(name, seconds, items, unit):
+        stages[name] = {'seconds': round(seconds, 6), 'items': items, 'unit': unit,
+                        'per_second': round(items / seconds, 2) if seconds else None,
+                        'peak_rss_mb': peak_rss_mb()}
+
+    raw, seconds = timed(lambda: [read_source_bytes(p) for p in paths], args.repeat)
+    texts, seconds_decode = timed(lambda: [data.decode('utf-8') for data in raw], args.repeat)
+    record('read', seconds + seconds_decode, round(sum(len(d) for d in raw) / (1024 * 1024), 3), 'MiB')
+
+    streams, seconds = timed(lambda: [tokenize_source(text) for text in texts], args.repeat)
+    tokens = sum(len(s) for s in streams)
+    record('tokenize', seconds, tokens, 'token')
+
+    hashed, seconds = timed(lambda: [hash_k_gram_arrays(s, args.k, args.hash_mode) for s in streams], args.repeat)
+    k_grams = sum(len(h[0]) for h in hashed)
+    record('hash', seconds, k_grams, 'k-gram')
+
+    _, seconds = timed(lambda: [winnow(*h, args.w) for h in hashed], args.repeat)
+    record('winnow', seconds, k_grams, 'k-gram')
+    del raw, texts, streams, hashed
+
+    fps, seconds = timed(lambda: fingerprint_paths(paths, args.k, args.w, hash_mode=args.hash_mode,
+                                                   workers=args.workers), args.repeat)
+    record('fingerprint', seconds, tokens, 'token')
+
+    student_items = [(os.path.basename(fp.path), fp) for fp in fps[:len(student_paths)]]
+    reference_items = [(os.path.basename(fp.path), fp) for fp in fps[len(student_paths):]]
+    pairs_total = len(student_items) * len(reference_items)
+    ranked, seconds = timed(lambda: list(compare_corpus(student_items, reference_items)), args.repeat)
+    record('compare', seconds, pairs_total, 'pasangan')
+    scores = {(source, match['file_id']): match['score'] * 100 for source, matches in ranked for match in matches}
+
+    student_fps, reference_fps = fps[:len(student_paths)], fps[len(student_paths):]
+    def analyze():
+        report = _ResultFilter(min_score=args.threshold)
+        return _compare_and_finish(student_fps, reference_fps, args.workers, _no_progress, report)
+    _, seconds = timed(analyze, args.repeat)
+    record('analyze', seconds, pairs_total, 'pasangan')
+    return stages, scores
+
+
+def precision_recall(scores, truth_pairs, threshold):
+    predicted = {pair for pair, score in scores.items() if score >= threshold}
+    true_positive = len(predicted & truth_pairs)
+    precision = true_positive / len(predicted) if predicted else 1.0
+    recall = true_positive / len(truth_pairs) if truth_pairs else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'threshold': threshold, 'predicted': len(predicted), 'true_positive': true_positive,
+            'precision': round(precision, 4), 'recall': round(recall, 4), 'f1': round(f1, 4)}
+
+
+def quality_report(scores, truth, thresholds, threshold):
+    truth_pairs = {(p['student'], p['reference']) for p in truth['pairs']}
+    by_transform = {}
+    for pair in truth['pairs']:
+        for transform in pair['transforms']:
+            hit = scores.get((pair['student'], pair['reference']), 0.0) >= threshold
+            found, total = by_transform.get(transform, (0, 0))
+            by_transform[transform] = (found + hit, total + 1)
+    sweep = [precision_recall(scores, truth_pairs, t) for t in thresholds]
+    return {
+        'pairs': len(truth_pairs),
+        'at_threshold': precision_recall(scores, truth_pairs, threshold),
+        'best_f1': max(sweep, key=lambda r: r['f1']) if sweep else None,
+        'sweep': sweep,
+        'recall_by_transform': {t: round(found / total, 4) for t, (found, total) in sorted(by_transform.items())},
+    }
+
+
+def compare_baseline(result, baseline, tolerance):
+    """
+    Mencetak perbedaan terhadap baseline. Mengembalikan list regresi (string).
+    """
+    regressions = []
+    print(f"\nDibandingkan dengan baseline ({baseline.get('created', '?')}):")
+    for name, stage in result['stages'].items():
+        old = baseline.get('stages', {}).get(name)
+        if not old or not old.get('per_second') or not stage['per_second']:
+            continue
+        change = (stage['per_second'] / old['per_second'] - 1) * 100
+        flag = ''
+        if change < -tolerance:
+            flag = '  <-- REGRESI'
+            regressions.append(f"{name}: throughput {change:+.1f}%")
+        print(f"  {name:>11}: {old['per_second']:>14,.0f} -> {stage['per_second']:>14,.0f} {stage['unit']}/s ({change:+.1f}%){flag}")
+    old_quality = baseline.get('quality', {}).get('at_threshold')
+    new_quality = result['quality']['at_threshold']
+    if old_quality and old_quality['threshold'] == new_quality['threshold']:
+        for metric in ('precision', 'recall'):
+            delta = new_quality[metric] - old_quality[metric]
+            flag = ''
+            if delta < -QUALITY_TOLERANCE:
+                flag = '  <-- REGRESI'
+                regressions.append(f"{metric}: {old_quality[metric]} -> {new_quality[metric]}")
+            print(f"  {metric:>11}: {old_quality[metric]:.4f} -> {new_quality[metric]:.4f} ({delta:+.4f}){flag}")
+    if baseline.get('corpus') != result['corpus'] or baseline.get('config') != result['config']:
+        print("  Catatan: korpus atau konfigurasi berbeda dengan baseline; angka tidak sepenuhnya sebanding.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='direktori korpus yang sudah dibuat synthetic_corpus (default: buat baru)')
+    add_corpus_arguments(parser)
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('-w', type=int, default=10)
+    parser.add_argument('--hash-mode', choices=HASH_MODES, default=DEFAULT_HASH_MODE)
+    parser.add_argument('-j', '--workers', type=int, default=1, help='proses untuk fingerprint/analyze (0 = semua core)')
+    parser.add_argument('--repeat', type=int, default=3, help='pengulangan per tahap, diambil waktu terbaik')
+    parser.add_argument('--threshold', type=float, default=30.0, help='ambang skor (persen) untuk precision/recall')
+    parser.add_argument('--thresholds', default=','.join(map(str, DEFAULT_THRESHOLDS)), help='ambang untuk sweep')
+    parser.add_argument('--save', metavar='FILE', help='simpan hasil sebagai baseline JSON')
+    parser.add_argument('--baseline', metavar='FILE', help='bandingkan dengan baseline JSON')
+    parser.add_argument('--tolerance', type=float, default=10.0, help='penurunan throughput (persen) yang masih diterima')
+    args = parser.parse_args()
+
+    tmp_dir = None
+    corpus_dir = args.corpus
+    if corpus_dir is None:
+        tmp_dir = corpus_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+        generate_corpus(corpus_dir, **corpus_params(args))
+    try:
+        with open(os.path.join(corpus_dir, 'ground_truth.json'), encoding='utf-8') as f:
+            truth = json.load(f)
+        student_dir = os.path.join(corpus_dir, 'students')
+        reference_dir = os.path.join(corpus_dir, 'references')
+        student_paths = [os.path.join(student_dir, n) for n in sorted(os.listdir(student_dir))]
+        reference_paths = [os.path.join(reference_dir, n) for n in sorted(os.listdir(reference_dir))]
+        print(f"{len(student_paths)} file mahasiswa, {len(reference_paths)} file referensi, "
+              f"{len(truth['pairs'])} pasangan plagiarisme; k={args.k}, w={args.w}, hash={args.hash_mode}")
+
+        baseline_rss = peak_rss_mb()
+        stages, scores = run_stages(student_paths, reference_paths, args)
+        thresholds = [float(t) for t in args.thresholds.split(',') if t.strip()]
+        result = {
+            'version': BASELINE_VERSION,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'corpus': truth['params'],
+            'config': {'k': args.k, 'w': args.w, 'hash_mode': args.hash_mode, 'workers': args.workers},
+            'baseline_rss_mb': baseline_rss,
+            'stages': stages,
+            'quality': quality_report(scores, truth, thresholds, args.threshold),
+        }
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    for name, stage in stages.items():
+        rss = f", peak RSS {stage['peak_rss_mb']:.0f} MiB" if stage['peak_rss_mb'] is not None else ''
+        print(f"{name:>11}: {stage['seconds']:8.3f} s  {stage['per_second'] or 0:>14,.0f} {stage['unit']}/s{rss}")
+    quality = result['quality']
+    at = quality['at_threshold']
+    print(f"\nAmbang {at['threshold']}%: precision {at['precision']:.3f}, recall {at['recall']:.3f}, F1 {at['f1']:.3f} "
+          f"({at['true_positive']}/{quality['pairs']} pasangan ditemukan, {at['predicted']} dilaporkan)")
+    best = quality['best_f1']
+    if best:
+        print(f"F1 terbaik di ambang {best['threshold']}%: precision {best['precision']:.3f}, recall {best['recall']:.3f}")
+    print("Recall per transformasi: " + ', '.join(f"{t} {r:.3f}" for t, r in quality['recall_by_transform'].items()))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=1)
+        print(f"\nBaseline disimpan ke {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_baseline(result, json.load(f), args.tolerance)
+        if regressions:
+            print("Regresi: " + '; '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
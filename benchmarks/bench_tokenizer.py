@@ -0,0 +1,71 @@
+"""
+Microbenchmark tokenizer: legacy_tokenize_source (tokenizer lama, beberapa re.sub per baris + satu
+re.sub per identifier; dipakai hash_mode='sha1') dibandingkan dengan tokenize_source (satu regex
+master, satu lintasan). Jumlah token berbeda karena aturan komentar/string lexer baru lebih lengkap.
+
+Secara default memakai file hasil scraping di data/mahasiswa dan data/github; jika kosong,
+memakai file sumber repo ini sendiri.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_tokenizer [DIR ...]
+"""
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from similarity_checker import legacy_tokenize_source, tokenize_source
+
+CODE_EXTENSIONS = ('.js', '.py', '.java', '.c', '.cpp', '.h')
+
+
+def collect_files(dirs):
+    paths = []
+    for d in dirs:
+        if not os.path.isdir(d):
+            continue
+        for dirpath, _, filenames in os.walk(d):
+            paths.extend(os.path.join(dirpath, f) for f in filenames if f.lower().endswith(CODE_EXTENSIONS))
+    return sorted(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('dirs', nargs='*', default=[os.path.join('data', 'mahasiswa'), os.path.join('data', 'github')])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    paths = collect_files(args.dirs) or collect_files([ROOT])
+    texts = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                texts.append(f.read().decode('utf-8'))
+        except (OSError, UnicodeDecodeError):
+            continue
+    total_bytes = sum(len(t) for t in texts)
+    print(f"{len(texts)} file, {total_bytes / 1024:.0f} KiB")
+
+    def run_legacy():
+        return sum(len(legacy_tokenize_source(t)) for t in texts)
+
+    def run_single_pass():
+        return sum(len(tokenize_source(t)) for t in texts)
+
+    for name, fn in (('lama (per baris)', run_legacy), ('satu lintasan', run_single_pass)):
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            tokens = fn()
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:>18}: {best * 1000:9.1f} ms  {tokens:>9} token  {total_bytes / best / 1e6:6.2f} MB/s")
+        if name.startswith('lama'):
+            legacy_time = best
+    print(f"speedup: {legacy_time / best:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark query indeks: FingerprintIndex.query (semua pasangan + blok) vs query_top_k
+(rarest-first dengan ambang penerimaan, blok hanya untuk K teratas).
+
+Korpus sintetis: setiap file referensi berisi campuran hash umum (boilerplate, distribusi
+Zipf) dan hash unik; sebagian file query menyalin potongan dari satu file referensi.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_topk
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fingerprint_index import FingerprintIndex
+
+
+def make_file(rng, n_fps, common_pool, unique_base, copy_from=None):
+    fps = []
+    for line in range(n_fps):
+        if copy_from is not None and rng.random() < 0.5:
+            fps.append(rng.choice(copy_from))
+            continue
+        if rng.random() < 0.3:
+            h = int(rng.paretovariate(1.2)) % common_pool
+        else:
+            h = unique_base + rng.randrange(1 << 40)
+        fps.append((h, line + 1, line + 3))
+    return fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--references', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--fingerprints', type=int, default=200, help='fingerprint per file')
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = FingerprintIndex()
+    references = []
+    for i in range(args.references):
+        fps = make_file(rng, args.fingerprints, 500, (i + 1) << 41)
+        references.append(fps)
+        index.add(f'ref_{i}', fps)
+    queries = [make_file(rng, args.fingerprints, 500, (args.references + i + 1) << 41,
+                         copy_from=rng.choice(references))
+               for i in range(args.queries)]
+
+    start = time.perf_counter()
+    full = [index.query(q) for q in queries]
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    top = [index.query_top_k(q, args.k) for q in queries]
+    top_time = time.perf_counter() - start
+
+    same = all(t == f[:args.k] for t, f in zip(top, full))
+    full_rows = sum(len(f) for f in full)
+    top_rows = sum(len(t) for t in top)
+    print(f"{args.references} referensi, {args.queries} query, {args.fingerprints} fingerprint/file, k={args.k}")
+    print(f"{'query':>12}: {full_time * 1000:9.1f} ms  {full_rows:>9} baris")
+    print(f"{'query_top_k':>12}: {top_time * 1000:9.1f} ms  {top_rows:>9} baris")
+    print(f"speedup: {full_time / top_time:.1f}x  hasil identik: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark winnowing: implementasi O(n) berbasis deque (winnow_positions) dibandingkan dengan
+implementasi lama O(n*w) yang memotong jendela di setiap posisi.
+
+Kesetaraan kedua implementasi diuji di tests/test_similarity_checker.py (WinnowingTest).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_winnowing
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from array import array
+from similarity_checker import winnow
+
+
+def reference_winnowing(hashed_k_grams_info, w):
+    """
+    Implementasi winnowing sebelumnya (O(n*w)), dipakai sebagai pembanding waktu.
+    """
+    if not hashed_k_grams_info:
+        return set()
+    fingerprints = set()
+    n = len(hashed_k_grams_info)
+    for i in range(n - w + 1):
+        current_window = hashed_k_grams_info[i : i + w]
+        min_val = float('inf')
+        min_idx = -1
+        for j, (hash_val, _, _) in enumerate(current_window):
+            if hash_val <= min_val:
+                min_val = hash_val
+                min_idx = j
+        fingerprints.add(current_window[min_idx])
+    return fingerprints
+
+
+def random_case(rng, n, hash_range):
+    hashes = array('Q', (rng.randrange(hash_range) for _ in range(n)))
+    starts = array('I')
+    line = 1
+    for _ in range(n):
+        starts.append(line)
+        if rng.random() < 0.3:
+            line += 1
+    ends = array('I', (s + rng.randrange(3) for s in starts))
+    return hashes, starts, ends
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('-w', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'k-grams':>8} {'lama (ms)':>12} {'deque (ms)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        hashes, starts, ends = random_case(rng, size, 1 << 64)
+        info = list(zip(hashes, starts, ends))
+
+        start = time.perf_counter()
+        reference_winnowing(info, args.w)
+        old_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        winnow(hashes, starts, ends, args.w)
+        new_time = time.perf_counter() - start
+
+        print(f"{size:>8} {old_time * 1000:>12.2f} {new_time * 1000:>12.2f} {old_time / new_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+"""
+Generator korpus plagiarisme sintetis untuk benchmark pipeline (lihat bench_pipeline).
+
+Setiap file adalah program acak (beberapa fungsi berisi assignment, if/else, for, pemanggilan
+dan return) yang dirender ke JavaScript, Python atau Java. Sebagian file mahasiswa adalah salinan
+satu file referensi yang diberi transformasi plagiarisme yang diketahui:
+  rename   - semua identifier diganti nama secara konsisten
+  reorder  - urutan fungsi diacak dan statement bebas yang bersebelahan ditukar
+  comments - baris komentar disisipkan
+  format   - baris kosong disisipkan dan gaya spasi diubah
+  partial  - hanya sebagian fungsi yang disalin, sisanya fungsi baru
+Pasangan (mahasiswa, referensi) beserta transformasinya ditulis ke ground_truth.json.
+
+Struktur keluaran:
+    DIR/references/ref_00000.js ...
+    DIR/students/student_00000.py ...
+    DIR/ground_truth.json
+
+Jalankan dari root repo:
+    python -m benchmarks.synthetic_corpus DIR [--references 200] [--students 300] [--languages js,py,java]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+
+LANGUAGES = {'js': '.js', 'py': '.py', 'java': '.java'}
+TRANSFORMS = ('rename', 'reorder', 'comments', 'format', 'partial')
+
+VERBS = ('get', 'set', 'load', 'parse', 'build', 'count', 'find', 'merge', 'check', 'update', 'compute',
+         'scan', 'sort', 'apply', 'read', 'emit', 'split', 'join', 'score', 'track')
+NOUNS = ('item', 'total', 'index', 'value', 'node', 'list', 'key', 'record', 'buffer', 'count', 'limit',
+         'offset', 'result', 'entry', 'score', 'row', 'column', 'weight', 'size', 'token', 'state', 'flag')
+COMMENTS = ('hitung ulang nilai', 'cek batas dulu', 'TODO: rapikan', 'loop utama', 'nilai sementara',
+            'jangan diubah', 'hasil akhir', 'kasus khusus', 'optimasi kecil', 'sesuai soal nomor 2')
+OPERATORS = ('+', '-', '*', '%')
+COMPARATORS = ('<', '>', '<=', '>=', '==', '!=')
+
+
+# --- Program abstrak ---
+# Statement: ('assign', var, expr) | ('call', fn, [operand]) | ('if', cond, body, else_body)
+#            | ('for', var, bound, body) | ('return', expr)
+# Expr: (operand, op, operand) atau operand; operand: nama (str) atau int; ('call', fn, operand)
+
+class Namer:
+    def __init__(self, rng):
+        self.rng = rng
+        self.used = set()
+
+    def fresh(self, kind):
+        while True:
+            if kind == 'fn':
+                name = self.rng.choice(VERBS) + self.rng.choice(NOUNS).capitalize()
+            else:
+                name = self.rng.choice(NOUNS) + self.rng.choice(('', '', str(self.rng.randrange(10)),
+                                                                 self.rng.choice(NOUNS).capitalize()))
+            if name not in self.used:
+                self.used.add(name)
+                return name
+
+
+def _operand(rng, names, callables):
+    roll = rng.random()
+    if callables and roll < 0.12:
+        return ('call', rng.choice(callables), rng.choice(names))
+    if roll < 0.7:
+        return rng.choice(names)
+    return rng.randrange(1, 100)
+
+def _expr(rng, names, callables):
+    if rng.random() < 0.3:
+        return _operand(rng, names, callables)
+    return (_operand(rng, names, callables), rng.choice(OPERATORS), _operand(rng, names, callables))
+
+def _block(rng, namer, names, callables, length, depth):
+    body = []
+    names = list(names)
+    for _ in range(length):
+        roll = rng.random()
+        if depth < 2 and roll < 0.15:
+            cond = (rng.choice(names), rng.choice(COMPARATORS), _operand(rng, names, ()))
+            body.append(('if', cond, _block(rng, namer, names, callables, rng.randint(1, 3), depth + 1),
+                         _block(rng, namer, names, callables, rng.randint(0, 2), depth + 1)))
+        elif depth < 2 and roll < 0.27:
+            var = namer.fresh('var')
+            body.append(('for', var, rng.choice(names + [rng.randrange(5, 50)]),
+                         _block(rng, namer, names + [var], callables, rng.randint(1, 3), depth + 1)))
+        elif callables and roll < 0.35:
+            body.append(('call', rng.choice(callables), [rng.choice(names) for _ in range(rng.randint(1, 2))]))
+        else:
+            target = namer.fresh('var') if rng.random() < 0.5 or len(names) < 2 else rng.choice(names)
+            body.append(('assign', target, _expr(rng, names, callables)))
+            if target not in names:
+                names.append(target)
+    return body
+
+def make_program(rng, functions, statements):
+    """
+    Program acak: list fungsi {'name', 'params', 'body'} dengan body berakhir return.
+    """
+    namer = Namer(rng)
+    program = []
+    for _ in range(functions):
+        params = [namer.fresh('var') for _ in range(rng.randint(1, 3))]
+        callables = [f['name'] for f in program]
+        body = _block(rng, namer, params, callables, max(1, int(rng.gauss(statements, statements / 4))), 0)
+        assigned = [s[1] for s in body if s[0] == 'assign'] or params
+        body.append(('return', _expr(rng, assigned, ())))
+        program.append({'name': namer.fresh('fn'), 'params': params, 'body': body})
+    return program
+
+
+# --- Transformasi ---
+
+_SYNTAX = frozenset(('assign', 'call', 'if', 'for', 'return') + OPERATORS + COMPARATORS)
+
+def _names_in(node, names):
+    if isinstance(node, str):
+        if node not in _SYNTAX:
+            names.add(node)
+    elif isinstance(node, (tuple, list)):
+        for child in node:
+            _names_in(child, names)
+    return names
+
+def _names_of(program):
+    names = set()
+    for fn in program:
+        names.add(fn['name'])
+        names.update(fn['params'])
+        _names_in(fn['body'], names)
+    return names
+
+def _rename(node, mapping):
+    if isinstance(node, str):
+        return mapping.get(node, node)
+    if isinstance(node, tuple):
+        return tuple(_rename(child, mapping) for child in node)
+    if isinstance(node, list):
+        return [_rename(child, mapping) for child in node]
+    return node
+
+def rename_identifiers(rng, program):
+    namer = Namer(rng)
+    namer.used.update(_names_of(program))
+    mapping = {}
+    for name in sorted(_names_of(program)):
+        kind = 'fn' if any(fn['name'] == name for fn in program) else 'var'
+        mapping[name] = namer.fresh(kind)
+    return [{'name': mapping[fn['name']], 'params': [mapping[p] for p in fn['params']],
+             'body': _rename(fn['body'], mapping)} for fn in program]
+
+def reorder(rng, program):
+    program = [dict(fn) for fn in program]
+    rng.shuffle(program)
+    for fn in program:
+        body = list(fn['body'])
+        for i in range(len(body) - 2):
+            # Dua assignment bersebelahan yang tidak saling bergantung boleh ditukar
+            a, b = body[i], body[i + 1]
+            if a[0] == b[0] == 'assign' and a[1] not in _names_in(b, set()) and b[1] not in _names_in(a, set()) \
+                    and rng.random() < 0.5:
+                body[i], body[i + 1] = b, a
+        fn['body'] = body
+    return program
+
+def partial_copy(rng, program, functions, statements):
+    keep = max(1, int(len(program) * rng.uniform(0.4, 0.7)))
+    start = rng.randrange(len(program) - keep + 1)
+    own = make_program(rng, max(1, functions - keep), statements)
+    return own[:len(own) // 2] + program[start:start + keep] + own[len(own) // 2:]
+
+
+# --- Render ---
+
+def _render_operand(node, lang):
+    if isinstance(node, tuple):
+        return f"{node[1]}({_render_operand(node[2], lang)})"
+    return str(node)
+
+def _render_expr(expr, lang):
+    if isinstance(expr, tuple) and len(expr) == 3 and expr[0] != 'call':
+        return f"{_render_operand(expr[0], lang)} {expr[1]} {_render_operand(expr[2], lang)}"
+    return _render_operand(expr, lang)
+
+def _render_block(body, lang, indent, declared, style, out):
+    pad = style['indent'] * indent
+    for stmt in body:
+        if style['comment_rate'] and style['rng'].random() < style['comment_rate']:
+            out.append(f"{pad}{'#' if lang == 'py' else '//'} {style['rng'].choice(COMMENTS)}")
+        if style['blank_rate'] and style['rng'].random() < style['blank_rate']:
+            out.append('')
+        kind = stmt[0]
+        end = '' if lang == 'py' else ';'
+        if kind == 'assign':
+            decl = ''
+            if stmt[1] not in declared and lang != 'py':
+                decl = 'let ' if lang == 'js' else 'int '
+                declared.add(stmt[1])
+            out.append(f"{pad}{decl}{stmt[1]} = {_render_expr(stmt[2], lang)}{end}")
+        elif kind == 'call':
+            out.append(f"{pad}{stmt[1]}({', '.join(map(str, stmt[2]))}){end}")
+        elif kind == 'return':
+            out.append(f"{pad}return {_render_expr(stmt[1], lang)}{end}")
+        elif kind == 'if':
+            cond = f"{stmt[1][0]} {stmt[1][1]} {_render_operand(stmt[1][2], lang)}"
+            if lang == 'py':
+                out.append(f"{pad}if {cond}:")
+                _render_block(stmt[2], lang, indent + 1, declared, style, out)
+                if stmt[3]:
+                    out.append(f"{pad}else:")
+                    _render_block(stmt[3], lang, indent + 1, declared, style, out)
+            else:
+                out.append(f"{pad}if ({cond}){style['brace']}")
+                _render_block(stmt[2], lang, indent + 1, set(declared), style, out)
+                if stmt[3]:
+                    out.append(f"{pad}}} else{style['brace']}")
+                    _render_block(stmt[3], lang, indent + 1, set(declared), style, out)
+                out.append(f"{pad}}}")
+        elif kind == 'for':
+            var, bound = stmt[1], stmt[2]
+            if lang == 'py':
+                out.append(f"{pad}for {var} in range({bound}):")
+                _render_block(stmt[3], lang, indent + 1, declared, style, out)
+            else:
+                decl = 'let' if lang == 'js' else 'int'
+                out.append(f"{pad}for ({decl} {var} = 0; {var} < {bound}; {var}++){style['brace']}")
+                _render_block(stmt[3], lang, indent + 1, set(declared) | {var}, style, out)
+                out.append(f"{pad}}}")
+
+def render(program, lang, rng=None, comment_rate=0.0, blank_rate=0.0, indent='    ', brace=' {', class_name='Main'):
+    """
+    Merender program abstrak ke kode sumber bahasa `lang` ('js', 'py' atau 'java').
+    """
+    style = {'rng': rng or random.Random(0), 'comment_rate': comment_rate, 'blank_rate': blank_rate,
+             'indent': indent, 'brace': brace}
+    out = []
+    base = 0
+    if lang == 'java':
+        out.append(f"public class {class_name}{brace}")
+        base = 1
+    for fn in program:
+        pad = indent * base
+        params = ', '.join(fn['params'] if lang != 'java' else (f"int {p}" for p in fn['params']))
+        if lang == 'py':
+            out.append(f"def {fn['name']}({params}):")
+        elif lang == 'js':
+            out.append(f"function {fn['name']}({params}){brace}")
+        else:
+            out.append(f"{pad}static int {fn['name']}({params}){brace}")
+        _render_block(fn['body'], lang, base + 1, set(fn['params']), style, out)
+        if lang != 'py':
+            out.append(f"{pad}}}")
+        out.append('')
+    if lang == 'java':
+        out.append('}')
+    return '\n'.join(out) + '\n'
+
+
+# --- Korpus ---
+
+def plagiarize(rng, program, transforms, functions, statements):
+    """
+    Menerapkan transformasi ke salinan program. Mengembalikan (program, opsi render).
+    """
+    options = {}
+    if 'partial' in transforms:
+        program = partial_copy(rng, program, functions, statements)
+    if 'reorder' in transforms:
+        program = reorder(rng, program)
+    if 'rename' in transforms:
+        program = rename_identifiers(rng, program)
+    if 'comments' in transforms:
+        options['comment_rate'] = rng.uniform(0.1, 0.3)
+    if 'format' in transforms:
+        options.update(blank_rate=rng.uniform(0.05, 0.2), indent=rng.choice(('  ', '\t')), brace=rng.choice((' {', '{')))
+    return program, options
+
+def generate_corpus(out_dir, references=200, students=300, plagiarism_rate=0.3, languages=('js', 'py', 'java'),
+                    functions=6, statements=8, seed=0):
+    """
+    Menulis korpus ke `out_dir` dan mengembalikan ground truth:
+    {'params': {...}, 'pairs': [{'student', 'reference', 'transforms'}], 'files': {nama: bahasa}}.
+    Nama file unik di seluruh korpus (ref_NNNNN / student_NNNNN).
+    """
+    rng = random.Random(seed)
+    ref_dir = os.path.join(out_dir, 'references')
+    student_dir = os.path.join(out_dir, 'students')
+    os.makedirs(ref_dir, exist_ok=True)
+    os.makedirs(student_dir, exist_ok=True)
+
+    files = {}
+    ref_programs = []
+    for i in range(references):
+        lang = rng.choice(languages)
+        program = make_program(rng, max(1, int(rng.gauss(functions, functions / 3))), statements)
+        name = f"ref_{i:05d}{LANGUAGES[lang]}"
+        with open(os.path.join(ref_dir, name), 'w', encoding='utf-8') as f:
+            f.write(render(program, lang, rng, class_name=f"Ref{i}"))
+        ref_programs.append((name, lang, program))
+        files[name] = lang
+
+    pairs = []
+    for i in range(students):
+        name_base = f"student_{i:05d}"
+        if ref_programs and rng.random() < plagiarism_rate:
+            ref_name, lang, program = rng.choice(ref_programs)
+            transforms = sorted(rng.sample(TRANSFORMS, rng.randint(1, 3)))
+            program, options = plagiarize(rng, program, transforms, functions, statements)
+            pairs.append({'student': name_base + LANGUAGES[lang], 'reference': ref_name, 'transforms': transforms})
+        else:
+            lang = rng.choice(languages)
+            program = make_program(rng, max(1, int(rng.gauss(functions, functions / 3))), statements)
+            options = {}
+        name = name_base + LANGUAGES[lang]
+        with open(os.path.join(student_dir, name), 'w', encoding='utf-8') as f:
+            f.write(render(program, lang, rng, class_name=f"Student{i}", **options))
+        files[name] = lang
+
+    truth = {
+        'params': {'references': references, 'students': students, 'plagiarism_rate': plagiarism_rate,
+                   'languages': list(languages), 'functions': functions, 'statements': statements, 'seed': seed},
+        'pairs': pairs,
+        'files': files,
+    }
+    with open(os.path.join(out_dir, 'ground_truth.json'), 'w', encoding='utf-8') as f:
+        json.dump(truth, f, indent=1)
+    return truth
+
+
+def add_corpus_arguments(parser):
+    parser.add_argument('--references', type=int, default=200, help='jumlah file referensi')
+    parser.add_argument('--students', type=int, default=300, help='jumlah file mahasiswa')
+    parser.add_argument('--plagiarism-rate', type=float, default=0.3, help='fraksi mahasiswa yang menyalin')
+    parser.add_argument('--languages', default='js,py,java', help='daftar bahasa dipisah koma (js,py,java)')
+    parser.add_argument('--functions', type=int, default=6, help='rata-rata fungsi per file')
+    parser.add_argument('--statements', type=int, default=8, help='rata-rata statement per fungsi')
+    parser.add_argument('--seed', type=int, default=0)
+
+def corpus_params(args):
+    languages = tuple(lang.strip() for lang in args.languages.split(',') if lang.strip())
+    unknown = set(languages) - set(LANGUAGES)
+    if unknown:
+        raise SystemExit(f"Bahasa tidak dikenal: {', '.join(sorted(unknown))}")
+    return {'references': args.references, 'students': args.students, 'plagiarism_rate': args.plagiarism_rate,
+            'languages': languages, 'functions': args.functions, 'statements': args.statements, 'seed': args.seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('out_dir')
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    truth = generate_corpus(args.out_dir, **corpus_params(args))
+    print(f"{len(truth['files'])} file ditulis ke {args.out_dir}, {len(truth['pairs'])} pasangan plagiarisme.")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+from collections import Counter
+
+
+# Di bawah jumlah dokumen ini frekuensi dokumen tidak bermakna (mis. 2 file: setiap hash bersama = 100%)
+DEFAULT_MIN_DOCS = 10
+
+
+class FingerprintFilter:
+    """
+    Menyaring fingerprint boilerplate sebelum perbandingan, sehingga kode starter atau pola umum
+    framework tidak menaikkan skor dan tidak menambah pasangan kandidat.
+    Dua sumber hash yang dibuang:
+      - korpus dasar (mis. repo starter tugas) yang didaftarkan lewat add_base();
+      - hash yang muncul di lebih dari `max_df` (pecahan 0..1) dokumen korpus, dihitung oleh fit()
+        jika korpus berisi minimal `min_docs` dokumen.
+    """
+    def __init__(self, max_df=None, min_docs=DEFAULT_MIN_DOCS):
+        self.max_df = max_df
+        self.min_docs = min_docs
+        self.base_hashes = set()
+        self.base_documents = 0
+        self.suppressed = frozenset()
+        self.documents = 0
+        self._blocked = frozenset()
+
+    @property
+    def blocked(self):
+        # Gabungan dihitung sekali setelah add_base()/fit(), bukan pada setiap apply()
+        if self._blocked is None:
+            self._blocked = self.suppressed | self.base_hashes
+        return self._blocked
+
+    def add_base(self, fingerprint):
+        """
+        Mendaftarkan satu dokumen korpus dasar (FileFingerprint atau iterable hash).
+        """
+        hashes = getattr(fingerprint, 'hashes', None)
+        if hashes is None:
+            hashes = {fp[0] if isinstance(fp, tuple) else fp for fp in fingerprint}
+        self.base_hashes.update(hashes)
+        self.base_documents += 1
+        self._blocked = None
+
+    def fit(self, fingerprints):
+        """
+        Menghitung frekuensi dokumen setiap hash di korpus (iterable FileFingerprint) dan
+        menandai hash yang melewati max_df. Mengembalikan self.
+        """
+        document_frequency = Counter()
+        documents = 0
+        for fingerprint in fingerprints:
+            document_frequency.update(fingerprint.hashes)
+            documents += 1
+        self.documents = documents
+        if not self.max_df or documents < self.min_docs:
+            self.suppressed = frozenset()
+        else:
+            limit = self.max_df * documents
+            self.suppressed = frozenset(h for h, df in document_frequency.items() if df > limit)
+        self._blocked = None
+        return self
+
+    def apply(self, fingerprint):
+        """
+        FileFingerprint tanpa hash yang diblokir (objek yang sama jika tidak ada yang dibuang).
+        """
+        blocked = self.blocked
+        if not blocked or blocked.isdisjoint(fingerprint.hashes):
+            return fingerprint
+        return fingerprint.without(blocked)
+
+    def apply_all(self, fingerprints):
+        blocked = self.blocked
+        return [fp.without(blocked) if blocked and not blocked.isdisjoint(fp.hashes) else fp for fp in fingerprints]
+
+    def stats(self):
+        return {
+            "base_documents": self.base_documents,
+            "base_hashes": len(self.base_hashes),
+            "documents": self.documents,
+            "max_df": self.max_df,
+            "suppressed_hashes": len(self.suppressed),
+        }
@@ -0,0 +1,379 @@
+import os
+import gzip
+import json
+import heapq
+from bisect import bisect_left
+
+from batch_scoring import BatchScorer, HAVE_NUMPY
+from languages import partition_by_family
+from similarity_checker import merge_overlapping_segments
+
+
+class FingerprintIndex:
+    """
+    Indeks terbalik fingerprint: setiap hash hasil winnowing dipetakan ke postings list
+    berisi (file_id, start_line, end_line). Query hanya menelusuri hash milik file yang dicari,
+    sehingga hanya file yang benar-benar berbagi fingerprint yang dihitung skornya.
+    """
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        self._postings = {}     # hash -> list of (doc, start_line, end_line)
+        self._doc_hashes = {}   # doc -> frozenset hash unik
+        self._doc_ids = {}      # file_id -> doc
+        self._file_ids = {}     # doc -> file_id
+        self._next_doc = 0
+
+    def __len__(self):
+        return len(self._doc_ids)
+
+    def __contains__(self, file_id):
+        return file_id in self._doc_ids
+
+    def file_ids(self):
+        return list(self._doc_ids)
+
+    def add(self, file_id, fingerprint):
+        """
+        Menambahkan (atau mengganti) satu file ke indeks.
+        `fingerprint` adalah FileFingerprint atau iterable (hash, start_line, end_line).
+        """
+        if file_id in self._doc_ids:
+            self.remove(file_id)
+
+        fingerprints = getattr(fingerprint, 'fingerprints', fingerprint)
+        doc = self._next_doc
+        self._next_doc += 1
+        self._doc_ids[file_id] = doc
+        self._file_ids[doc] = file_id
+
+        hashes = set()
+        # Diurutkan agar entri satu file untuk hash yang sama selalu berdampingan di postings list
+        for h, start_line, end_line in sorted(fingerprints):
+            self._postings.setdefault(h, []).append((doc, start_line, end_line))
+            hashes.add(h)
+        self._doc_hashes[doc] = frozenset(hashes)
+
+    def remove(self, file_id):
+        doc = self._doc_ids.pop(file_id, None)
+        if doc is None:
+            return False
+        del self._file_ids[doc]
+        for h in self._doc_hashes.pop(doc):
+            entries = [entry for entry in self._postings[h] if entry[0] != doc]
+            if entries:
+                self._postings[h] = entries
+            else:
+                del self._postings[h]
+        return True
+
+    def fingerprints_of(self, file_id):
+        """
+        Merekonstruksi list (hash, start_line, end_line) milik satu file dari postings.
+        """
+        doc = self._doc_ids[file_id]
+        return [(h, s, e) for h in self._doc_hashes[doc] for d, s, e in self._postings[h] if d == doc]
+
+    def query(self, fingerprint, min_shared=1, exclude=None):
+        """
+        Mencari file di indeks yang berbagi fingerprint dengan `fingerprint`.
+        Mengembalikan list dict {file_id, score, shared, blocks_query, blocks_match}
+        terurut dari skor tertinggi. Skor adalah Jaccard atas set hash, sama dengan compare_fingerprints.
+        """
+        query_ranges = {}
+        for h, start_line, end_line in getattr(fingerprint, 'fingerprints', fingerprint):
+            query_ranges.setdefault(h, []).append((start_line, end_line))
+        query_size = len(query_ranges)
+
+        shared_hashes = {}  # doc -> list hash bersama
+        match_ranges = {}   # doc -> list (start_line, end_line) di file indeks
+        for h in query_ranges:
+            entries = self._postings.get(h)
+            if not entries:
+                continue
+            last_doc = None
+            for doc, start_line, end_line in entries:
+                if doc != last_doc:
+                    shared_hashes.setdefault(doc, []).append(h)
+                    last_doc = doc
+                match_ranges.setdefault(doc, []).append((start_line, end_line))
+
+        results = []
+        for doc, hashes in shared_hashes.items():
+            file_id = self._file_ids[doc]
+            shared = len(hashes)
+            if shared < min_shared or (exclude is not None and exclude(file_id)):
+                continue
+            union_size = query_size + len(self._doc_hashes[doc]) - shared
+            blocks_query = merge_overlapping_segments(
+                [{'start': s, 'end': e} for h in hashes for s, e in query_ranges[h]]
+            )
+            blocks_match = merge_overlapping_segments(
+                [{'start': s, 'end': e} for s, e in match_ranges[doc]]
+            )
+            results.append({
+                'file_id': file_id,
+                'score': shared / union_size,
+                'shared': shared,
+                'blocks_query': blocks_query,
+                'blocks_match': blocks_match,
+            })
+
+        results.sort(key=lambda r: (-r['score'], str(r['file_id'])))
+        return results
+
+    def query_top_k(self, fingerprint, k=None, min_score=0.0, exclude=None):
+        """
+        Seperti query(), tetapi hanya mengembalikan `k` file dengan skor tertinggi (semua jika k None)
+        yang skornya >= min_score (pecahan 0..1). Hasilnya sama dengan query() yang dipotong.
+
+        Hash query diproses dari postings list terpendek (hash paling langka). Setelah r hash
+        tersisa, file yang belum pernah muncul paling banyak berbagi r hash, jadi skornya paling
+        tinggi r/|A|. Begitu nilai itu di bawah ambang (skor ke-k sementara atau min_score), file
+        baru tidak lagi diterima sebagai kandidat. Blok baris hanya dihitung untuk pemenang.
+        """
+        query_ranges = {}
+        for h, start_line, end_line in getattr(fingerprint, 'fingerprints', fingerprint):
+            query_ranges.setdefault(h, []).append((start_line, end_line))
+        query_size = len(query_ranges)
+        if not query_size or (k is not None and k <= 0):
+            return []
+
+        ordered = sorted((h for h in query_ranges if h in self._postings), key=lambda h: len(self._postings[h]))
+        doc_sizes = self._doc_hashes
+        shared = {}      # doc -> jumlah hash bersama sejauh ini
+        skipped = set()  # doc yang ditolak oleh exclude
+        threshold = min_score
+        rest = []
+
+        for i, h in enumerate(ordered):
+            if (len(ordered) - i) / query_size < threshold:
+                rest = ordered[i:]
+                break
+            last_doc = None
+            for doc, _, _ in self._postings[h]:
+                if doc == last_doc:
+                    continue
+                last_doc = doc
+                if doc in shared:
+                    shared[doc] += 1
+                elif doc not in skipped:
+                    if exclude is not None and exclude(self._file_ids[doc]):
+                        skipped.add(doc)
+                    else:
+                        shared[doc] = 1
+            if k is not None and len(shared) >= k and i % 16 == 15:
+                # Skor saat ini adalah batas bawah; skor ke-k di antaranya menjadi ambang penerimaan
+                kth_lower_bound = heapq.nlargest(
+                    k, (c / (query_size + len(doc_sizes[d]) - c) for d, c in shared.items())
+                )[-1]
+                threshold = max(threshold, kth_lower_bound)
+
+        if rest and shared:
+            # Hanya kandidat yang sudah ada yang diperbarui: lewat postings list atau cek set per kandidat
+            candidates = list(shared)
+            if len(candidates) * len(rest) < sum(len(self._postings[h]) for h in rest):
+                for doc in candidates:
+                    doc_hashes = doc_sizes[doc]
+                    shared[doc] += sum(1 for h in rest if h in doc_hashes)
+            else:
+                for h in rest:
+                    last_doc = None
+                    for doc, _, _ in self._postings[h]:
+                        if doc != last_doc and doc in shared:
+                            shared[doc] += 1
+                            last_doc = doc
+
+        scored = []
+        for doc, count in shared.items():
+            score = count / (query_size + len(doc_sizes[doc]) - count)
+            if score >= min_score:
+                scored.append((-score, str(self._file_ids[doc]), doc, count))
+        winners = heapq.nsmallest(k, scored) if k is not None else sorted(scored)
+        return [self._match_result(query_ranges, doc, -neg_score, count) for neg_score, _, doc, count in winners]
+
+    def match_results(self, fingerprint, scored):
+        """
+        Melengkapi skor yang dihitung di luar indeks (mis. batch_scoring.BatchScorer) dengan blok baris.
+        scored: list (file_id, score, shared). Mengembalikan list dict yang sama dengan query_top_k.
+        """
+        query_ranges = {}
+        for h, start_line, end_line in getattr(fingerprint, 'fingerprints', fingerprint):
+            query_ranges.setdefault(h, []).append((start_line, end_line))
+        return [self._match_result(query_ranges, self._doc_ids[file_id], score, shared)
+                for file_id, score, shared in scored]
+
+    def _match_result(self, query_ranges, doc, score, shared):
+        hashes = [h for h in query_ranges if h in self._doc_hashes[doc]]
+        blocks_query = merge_overlapping_segments(
+            [{'start': s, 'end': e} for h in hashes for s, e in query_ranges[h]]
+        )
+        match_ranges = []
+        for h in hashes:
+            # Postings terurut per doc (doc baru selalu bernomor lebih besar), jadi cukup bisect
+            entries = self._postings[h]
+            i = bisect_left(entries, (doc,))
+            while i < len(entries) and entries[i][0] == doc:
+                match_ranges.append({'start': entries[i][1], 'end': entries[i][2]})
+                i += 1
+        blocks_match = merge_overlapping_segments(match_ranges)
+        return {
+            'file_id': self._file_ids[doc],
+            'score': score,
+            'shared': shared,
+            'blocks_query': blocks_query,
+            'blocks_match': blocks_match,
+        }
+
+    def _doc_ranges(self, doc):
+        """
+        hash -> list (start_line, end_line) milik satu dokumen, diambil dari postings.
+        """
+        return {h: [(s, e) for d, s, e in self._postings[h] if d == doc] for h in self._doc_hashes[doc]}
+
+    def self_join(self, min_score=0.0, group_of=None):
+        """
+        Membandingkan semua file di indeks satu sama lain tanpa perbandingan M^2/2 penuh:
+        setiap postings list menyumbang satu hitungan ke setiap pasangan file di dalamnya, jadi
+        biayanya sebanding dengan jumlah fingerprint bersama. Pasangan yang `group_of(file_id)`-nya
+        sama (mis. file dari repo yang sama) dilewati.
+        Mengembalikan list dict {file_a, file_b, score, shared, blocks_a, blocks_b} terurut dari
+        skor tertinggi, hanya untuk pasangan dengan skor >= min_score (pecahan 0..1).
+        """
+        groups = {}
+        if group_of is not None:
+            groups = {doc: group_of(file_id) for doc, file_id in self._file_ids.items()}
+
+        pair_counts = {}
+        for entries in self._postings.values():
+            docs = sorted({doc for doc, _, _ in entries})
+            if len(docs) < 2:
+                continue
+            for i, doc_a in enumerate(docs):
+                group_a = groups.get(doc_a)
+                for doc_b in docs[i + 1:]:
+                    if group_a is not None and group_a == groups.get(doc_b):
+                        continue
+                    key = (doc_a, doc_b)
+                    pair_counts[key] = pair_counts.get(key, 0) + 1
+
+        scored = []
+        for (doc_a, doc_b), shared in pair_counts.items():
+            score = shared / (len(self._doc_hashes[doc_a]) + len(self._doc_hashes[doc_b]) - shared)
+            if score >= min_score:
+                scored.append((score, doc_a, doc_b, shared))
+        scored.sort(key=lambda p: (-p[0], str(self._file_ids[p[1]]), str(self._file_ids[p[2]])))
+
+        ranges_cache = {}
+        results = []
+        for score, doc_a, doc_b, shared in scored:
+            for doc in (doc_a, doc_b):
+                if doc not in ranges_cache:
+                    ranges_cache[doc] = self._doc_ranges(doc)
+            ranges_a, ranges_b = ranges_cache[doc_a], ranges_cache[doc_b]
+            common = self._doc_hashes[doc_a] & self._doc_hashes[doc_b]
+            results.append({
+                'file_a': self._file_ids[doc_a],
+                'file_b': self._file_ids[doc_b],
+                'score': score,
+                'shared': shared,
+                'blocks_a': merge_overlapping_segments([{'start': s, 'end': e} for h in common for s, e in ranges_a[h]]),
+                'blocks_b': merge_overlapping_segments([{'start': s, 'end': e} for h in common for s, e in ranges_b[h]]),
+            })
+        return results
+
+    def save(self, path):
+        """
+        Menyimpan indeks ke disk (JSON terkompresi gzip).
+        """
+        path_dir = os.path.dirname(path)
+        if path_dir:
+            os.makedirs(path_dir, exist_ok=True)
+        files = {file_id: self.fingerprints_of(file_id) for file_id in self._doc_ids}
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'version': self.FORMAT_VERSION, 'files': files}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != cls.FORMAT_VERSION:
+            raise ValueError(f"Versi indeks tidak didukung: {data.get('version')}")
+        index = cls()
+        for file_id, fingerprints in data['files'].items():
+            index.add(file_id, [tuple(fp) for fp in fingerprints])
+        return index
+
+
+def compare_corpus(sources, references, top_k=None, min_score=0.0):
+    """
+    Membandingkan setiap fingerprint di `sources` dengan seluruh `references` lewat FingerprintIndex.
+    sources/references: list of (file_id, FileFingerprint).
+    Jika top_k atau min_score diberikan, hanya pasangan teratas yang dihitung: skornya lewat
+    BatchScorer (NumPy) bila tersedia, selain itu query_top_k; blok baris hanya untuk pemenang.
+    Menghasilkan (source_id, list hasil query) per file sumber, sesuai urutan `sources`.
+    """
+    index = FingerprintIndex()
+    for file_id, fingerprint in references:
+        index.add(file_id, fingerprint)
+    scorer = BatchScorer(references) if HAVE_NUMPY and (top_k or min_score) else None
+    for source_id, fingerprint in sources:
+        if scorer is not None:
+            yield source_id, index.match_results(fingerprint, scorer.top_k(fingerprint, top_k or None, min_score))
+        elif top_k or min_score:
+            yield source_id, index.query_top_k(fingerprint, top_k or None, min_score)
+        else:
+            yield source_id, index.query(fingerprint)
+
+
+def self_join_by_language(items, min_score=0.0, group_of=None):
+    """
+    FingerprintIndex.self_join yang dijalankan per keluarga bahasa, sehingga pasangan lintas
+    bahasa tidak pernah dihitung. items: list of (file_id, FileFingerprint).
+    Mengembalikan list dict yang sama dengan self_join, digabung dan terurut dari skor tertinggi.
+    """
+    pairs = []
+    for family_items in partition_by_family(items, lambda item: item[1].path).values():
+        if len(family_items) < 2:
+            continue
+        index = FingerprintIndex()
+        for file_id, fingerprint in family_items:
+            index.add(file_id, fingerprint)
+        pairs.extend(index.self_join(min_score, group_of=group_of))
+    pairs.sort(key=lambda p: (-p['score'], str(p['file_a']), str(p['file_b'])))
+    return pairs
+
+
+def similarity_clusters(pairs, min_score=0.0):
+    """
+    Mengelompokkan file yang saling mirip (union-find atas pasangan dengan skor >= min_score).
+    pairs: iterable dict {file_a, file_b, score}. Mengembalikan list dict {files, max_score, pairs}
+    untuk kelompok berisi >= 2 file, terurut dari skor tertinggi lalu ukuran kelompok.
+    """
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    kept = [p for p in pairs if p['score'] >= min_score]
+    for p in kept:
+        root_a, root_b = find(p['file_a']), find(p['file_b'])
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    clusters = {}
+    for p in kept:
+        cluster = clusters.setdefault(find(p['file_a']), {'files': set(), 'max_score': 0.0, 'pairs': 0})
+        cluster['files'].update((p['file_a'], p['file_b']))
+        cluster['max_score'] = max(cluster['max_score'], p['score'])
+        cluster['pairs'] += 1
+    result = [{'files': sorted(c['files'], key=str), 'max_score': c['max_score'], 'pairs': c['pairs']}
+              for c in clusters.values()]
+    result.sort(key=lambda c: (-c['max_score'], -len(c['files']), str(c['files'][0])))
+    return result
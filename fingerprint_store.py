@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+# Naikkan jika format buffer atau cara tokenisasi berubah; entri lama tidak akan cocok lagi
+# dan terbuang lewat LRU
+STORE_FORMAT_VERSION = 5
+
+
+class FingerprintStore:
+    """
+    Penyimpanan fingerprint persisten (SQLite) di bawah data/, sehingga file yang isinya sama
+    tidak perlu di-fingerprint ulang di analisis berikutnya.
+    Kunci: SHA isi file + parameter (k, w, set keyword, mode hash, bahasa/lexer).
+    Nilai: buffer FileFingerprint.pack() berisi hash hasil winnowing beserta rentang barisnya.
+    Ukuran dibatasi `max_bytes`; entri yang paling lama tidak diakses dibuang lebih dulu (LRU).
+    """
+    def __init__(self, db_path=os.path.join('data', 'fingerprints.sqlite3'), max_bytes=256 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                params TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_fingerprints_last_access ON fingerprints(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_params(k, w, kw_key, hash_mode, language=None):
+        """
+        Representasi string yang stabil dari parameter fingerprinting. `language` adalah nama
+        Language (languages.py) yang menentukan lexer; isi yang sama dengan ekstensi berbeda
+        menghasilkan token berbeda.
+        """
+        return json.dumps({'k': k, 'w': w, 'keywords': sorted(kw_key), 'hash_mode': hash_mode,
+                           'language': language, 'format': STORE_FORMAT_VERSION}, sort_keys=True)
+
+    @staticmethod
+    def make_key(content_hash, params):
+        return hashlib.sha1(f"{content_hash}:{params}".encode('utf-8')).hexdigest()
+
+    def get(self, content_hash, k, w, kw_key, hash_mode, language=None):
+        """
+        Mengembalikan buffer fingerprint (bytes) atau None jika belum tersimpan.
+        """
+        if content_hash is None:
+            return None
+        key = self.make_key(content_hash, self.make_params(k, w, kw_key, hash_mode, language))
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM fingerprints WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE fingerprints SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return bytes(row[0])
+
+    def put(self, content_hash, k, w, kw_key, data, hash_mode, language=None):
+        if content_hash is None:
+            return
+        params = self.make_params(k, w, kw_key, hash_mode, language)
+        key = self.make_key(content_hash, params)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (key, content_hash, params, data, size_bytes, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, content_hash, params, sqlite3.Binary(data), len(data), time.time())
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM fingerprints").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Buang entri yang paling lama tidak diakses sampai ukuran total di bawah batas
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size_bytes FROM fingerprints ORDER BY last_access ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM fingerprints WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def stats(self):
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM fingerprints"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM fingerprints")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
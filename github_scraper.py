@@ -1,7 +1,318 @@
 import requests
 import os
+import json
 import re
-from urllib.parse import urlparse, urljoin
+import time
+import random
+import tarfile
+import zipfile
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin, quote
+from requests.adapters import HTTPAdapter
+
+import metrics
+from languages import SUPPORTED_EXTENSIONS
+
+# Base URL bisa diarahkan ke server lokal (mis. untuk pengujian) lewat environment variable
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com')
+GITHUB_RAW_URL = os.getenv('GITHUB_RAW_URL', 'https://raw.githubusercontent.com')
+
+DOWNLOAD_WORKERS = 8        # Thread unduhan per repo
+MAX_PER_HOST = 6            # Koneksi serentak maksimum ke satu host (dibagi semua scrape yang berjalan)
+MAX_RETRIES = 4
+RETRY_BACKOFF = 0.5         # Detik, dikali 2 setiap percobaan ulang
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# Ekstensi file kode yang diambil dari repositori: semua ekstensi yang punya lexer di languages.py
+DEFAULT_EXTENSIONS = SUPPORTED_EXTENSIONS
+
+
+class DeadlineExceeded(requests.exceptions.RequestException):
+    """
+    Batas waktu keseluruhan scraping terlewati.
+    """
+
+
+_session = None
+_session_lock = threading.Lock()
+_host_semaphores = {}
+
+def get_session():
+    """
+    requests.Session bersama (keep-alive + connection pooling) untuk semua unduhan.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=DOWNLOAD_WORKERS * 4)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+def _host_semaphore(url):
+    host = urlparse(url).netloc
+    with _session_lock:
+        semaphore = _host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = _host_semaphores[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return semaphore
+
+def _remaining(deadline):
+    return None if deadline is None else deadline - time.monotonic()
+
+def _release_on_close(response, semaphore):
+    """
+    Slot koneksi host dilepas saat response ditutup (close() atau akhir blok `with`), bukan saat
+    header diterima, karena body response stream=True baru dibaca setelah request() kembali.
+    """
+    close = response.close
+    released = []
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            if not released:
+                released.append(True)
+                semaphore.release()
+
+    response.close = close_and_release
+
+def _send(method, url, timeout, deadline, session, **kwargs):
+    """
+    Satu request tanpa percobaan ulang. Slot batas koneksi per host dipegang selama body dibaca:
+    sampai request() kembali, atau untuk stream=True sampai response ditutup.
+    """
+    remaining = _remaining(deadline)
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Batas waktu terlewati sebelum mengambil {url}")
+    request_timeout = timeout if remaining is None else min(timeout, remaining)
+
+    semaphore = _host_semaphore(url)
+    semaphore.acquire()
+    try:
+        response = session.request(method, url, timeout=request_timeout, **kwargs)
+    except BaseException:
+        semaphore.release()
+        raise
+    if kwargs.get('stream'):
+        _release_on_close(response, semaphore)
+    else:
+        semaphore.release()
+    return response
+
+def _retry_delay(response, attempt):
+    """
+    Jeda sebelum percobaan ke-(attempt + 1): exponential backoff + jitter, minimal Retry-After.
+    """
+    delay = RETRY_BACKOFF * (2 ** attempt) + random.uniform(0, RETRY_BACKOFF)
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, int(retry_after))
+    return delay
+
+def _sleep_before_retry(delay, deadline, url):
+    remaining = _remaining(deadline)
+    if remaining is not None and delay >= remaining:
+        raise DeadlineExceeded(f"Batas waktu terlewati saat menunggu percobaan ulang {url}")
+    time.sleep(delay)
+
+def request_with_retry(method, url, deadline=None, timeout=10, session=None, **kwargs):
+    """
+    Request HTTP lewat session bersama dengan batas koneksi per host dan percobaan ulang
+    (exponential backoff + jitter, menghormati Retry-After) untuk 429/5xx dan error jaringan,
+    paling banyak MAX_RETRIES kali. Response stream=True harus ditutup (mis. lewat `with`)
+    agar slot koneksi host dilepas.
+    `deadline` adalah waktu time.monotonic() absolut; DeadlineExceeded dilempar jika terlewati.
+    """
+    session = session or get_session()
+    for attempt in range(MAX_RETRIES + 1):
+        response = None
+        try:
+            response = _send(method, url, timeout, deadline, session, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return response
+            response.close()
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+        _sleep_before_retry(_retry_delay(response, attempt), deadline, url)
+
+# --- CLIENT GITHUB API (branch default, token, rate limit) ---
+
+RATE_LIMIT_RESERVE = 2          # Sisa kuota yang tidak dipakai, agar request lain (mis. UI) tetap bisa jalan
+RATE_LIMIT_PACE_BELOW = 0.1     # Di bawah 10% kuota, request disebar merata sampai waktu reset
+MAX_RATE_LIMIT_WAIT = 15 * 60   # Detik; menunggu lebih lama dari ini dianggap gagal
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """
+    Kuota API GitHub habis dan waktu reset terlalu lama untuk ditunggu.
+    """
+
+
+class GitHubClient:
+    """
+    Klien GitHub REST API di atas session dan batas koneksi per host yang sama dengan unduhan:
+      - token dari environment variable GITHUB_TOKEN (jika ada) dikirim di setiap request API;
+      - branch default setiap repo di-resolve sekali lalu di-cache;
+      - X-RateLimit-Remaining/Reset dicatat dari setiap response dan dibagi oleh semua scrape
+        yang berjalan bersamaan, sehingga request diperlambat sebelum kuota habis, dan 403/429
+        karena rate limit ditunggu sampai reset alih-alih gagal di tengah analisis.
+    """
+    def __init__(self, token=None, api_url=None, session=None):
+        self.token = token if token is not None else os.getenv('GITHUB_TOKEN')
+        self._api_url = api_url
+        self.session = session
+        self._lock = threading.Lock()
+        self._branches = {}
+        self.rate_limit = None
+        self.rate_remaining = None
+        self.rate_reset = None   # Epoch detik
+
+    @property
+    def api_url(self):
+        return self._api_url or GITHUB_API_URL
+
+    def headers(self):
+        headers = {'Accept': 'application/vnd.github+json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        return headers
+
+    def rate_limit_status(self):
+        with self._lock:
+            return {"limit": self.rate_limit, "remaining": self.rate_remaining, "reset": self.rate_reset}
+
+    def _record_rate_limit(self, response):
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        limit = response.headers.get('X-RateLimit-Limit')
+        if remaining is None or not remaining.isdigit():
+            return
+        with self._lock:
+            self.rate_remaining = int(remaining)
+            if reset and reset.isdigit():
+                self.rate_reset = int(reset)
+            if limit and limit.isdigit():
+                self.rate_limit = int(limit)
+
+    def _throttle_delay(self):
+        with self._lock:
+            remaining, reset, limit = self.rate_remaining, self.rate_reset, self.rate_limit
+            if remaining is None or reset is None:
+                return 0.0
+            until_reset = reset - time.time()
+            if until_reset <= 0:
+                return 0.0
+            if remaining <= RATE_LIMIT_RESERVE:
+                return until_reset
+            if limit and remaining < limit * RATE_LIMIT_PACE_BELOW:
+                # Kuota tersisa dibagi rata sampai reset; hitungan diturunkan agar thread lain ikut melambat
+                self.rate_remaining = remaining - 1
+                return until_reset / (remaining - RATE_LIMIT_RESERVE)
+            return 0.0
+
+    def _wait(self, delay, deadline, url):
+        if delay <= 0:
+            return
+        if delay > MAX_RATE_LIMIT_WAIT:
+            raise RateLimitExceeded(f"Kuota API GitHub habis, reset dalam {int(delay)} detik ({url})")
+        remaining = _remaining(deadline)
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded(f"Batas waktu terlewati saat menunggu rate limit GitHub ({url})")
+        print(f"Menunggu rate limit GitHub {delay:.1f} detik...")
+        time.sleep(delay)
+
+    @staticmethod
+    def _rate_limited(response):
+        if response.status_code not in (403, 429):
+            return False
+        return response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers
+
+    def get(self, path, deadline=None, timeout=15, headers=None, **kwargs):
+        """
+        GET ke `{api_url}{path}` dengan token, pencatatan rate limit dan penundaan proaktif.
+        Satu lapis percobaan ulang (paling banyak MAX_RETRIES kali) untuk 403/429 karena rate limit
+        (ditunggu sampai reset atau Retry-After), 5xx dan error jaringan. Header X-RateLimit-*
+        dicatat dari setiap response, termasuk yang diulang.
+        """
+        url = f"{self.api_url}{path}"
+        request_headers = self.headers()
+        request_headers.update(headers or {})
+        session = self.session or get_session()
+        for attempt in range(MAX_RETRIES + 1):
+            self._wait(self._throttle_delay(), deadline, url)
+            started = time.perf_counter()
+            try:
+                response = _send('GET', url, timeout, deadline, session, headers=request_headers, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                metrics.GITHUB_REQUESTS.inc(kind='api', status='error')
+                if attempt == MAX_RETRIES:
+                    raise
+                _sleep_before_retry(_retry_delay(None, attempt), deadline, url)
+                continue
+            except requests.exceptions.RequestException:
+                metrics.GITHUB_REQUESTS.inc(kind='api', status='error')
+                raise
+            finally:
+                metrics.GITHUB_REQUEST_SECONDS.observe(time.perf_counter() - started, kind='api')
+            metrics.GITHUB_REQUESTS.inc(kind='api', status=response.status_code)
+            self._record_rate_limit(response)
+            if attempt == MAX_RETRIES:
+                return response
+            if self._rate_limited(response):
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = int(retry_after)
+                else:
+                    reset = response.headers.get('X-RateLimit-Reset', '')
+                    delay = int(reset) - time.time() if reset.isdigit() else RETRY_BACKOFF * (2 ** attempt)
+                response.close()
+                self._wait(max(delay, RETRY_BACKOFF), deadline, url)
+            elif response.status_code in RETRY_STATUSES:
+                delay = _retry_delay(response, attempt)
+                response.close()
+                _sleep_before_retry(delay, deadline, url)
+            else:
+                return response
+
+    def default_branch(self, username, repo_name, deadline=None):
+        """
+        Nama branch default repo (di-cache per repo), atau None jika repo tidak bisa dibaca.
+        """
+        key = (username.lower(), repo_name.lower())
+        with self._lock:
+            if key in self._branches:
+                return self._branches[key]
+        try:
+            response = self.get(f"/repos/{username}/{repo_name}", deadline=deadline)
+            response.raise_for_status()
+            branch = response.json().get('default_branch')
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Gagal membaca informasi repositori {username}/{repo_name}: {e}")
+            return None
+        if branch:
+            with self._lock:
+                self._branches[key] = branch
+        return branch
+
+
+_client = None
+
+def get_client():
+    """
+    GitHubClient bersama, agar cache branch dan status rate limit dipakai oleh semua scrape.
+    """
+    global _client
+    with _session_lock:
+        if _client is None:
+            _client = GitHubClient()
+        return _client
 
 # Fungsi yang sudah ada (parse_github_blob_url_to_raw dan download_raw_code) tetap sama
 
@@ -20,23 +331,93 @@ def parse_github_blob_url_to_raw(blob_url):
         return raw_url
     return None
 
-def download_raw_code(url, save_path):
+def fetch_raw_code(url, save_path, deadline=None, etag=None, last_modified=None, headers=None):
     """
-    Mengunduh konten raw dari URL ke path penyimpanan.
+    Mengunduh konten raw dari URL ke path penyimpanan, dengan request kondisional
+    (If-None-Match / If-Modified-Since) jika etag atau last_modified diberikan.
+    Mengembalikan (status, etag, last_modified) dengan status 'downloaded', 'not_modified' atau 'failed'.
     """
     # print(f"Mengunduh dari: {url}") # Uncomment for debugging
+    headers = dict(headers or {})
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    tmp_path = save_path + '.part'
+    started = time.perf_counter()
+    status = 'error'
     try:
-        r = requests.get(url, stream=True, timeout=10) # Tambahkan timeout
-        r.raise_for_status() # Akan memunculkan HTTPError untuk status kode 4xx/5xx
-
-        with open(save_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
-        # print(f"Berhasil mengunduh ke: {save_path}") # Uncomment for debugging
-        return True
-    except requests.exceptions.RequestException as e:
+        with request_with_retry('GET', url, deadline=deadline, stream=True, headers=headers) as r:
+            status = r.status_code
+            if r.status_code == 304:
+                return 'not_modified', etag, last_modified
+            r.raise_for_status() # Akan memunculkan HTTPError untuk status kode 4xx/5xx
+
+            size = 0
+            with open(tmp_path, "wb") as f:
+                for chunk in r.iter_content(chunk_size=8192):
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, save_path)
+            metrics.DOWNLOADED_BYTES.inc(size, kind='raw')
+            # print(f"Berhasil mengunduh ke: {save_path}") # Uncomment for debugging
+            return 'downloaded', r.headers.get('ETag'), r.headers.get('Last-Modified')
+    except (requests.exceptions.RequestException, OSError) as e:
         print(f"Gagal mengunduh {url}: {e}")
-        return False
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        return 'failed', None, None
+    finally:
+        metrics.GITHUB_REQUEST_SECONDS.observe(time.perf_counter() - started, kind='raw')
+        metrics.GITHUB_REQUESTS.inc(kind='raw', status=status)
+
+def download_raw_code(url, save_path, deadline=None):
+    """
+    Mengunduh konten raw dari URL ke path penyimpanan. Mengembalikan True jika berhasil.
+    """
+    return fetch_raw_code(url, save_path, deadline)[0] == 'downloaded'
+
+def download_many(downloads, max_workers=DOWNLOAD_WORKERS, deadline=None, headers=None):
+    """
+    Mengunduh banyak file secara bersamaan lewat session bersama.
+    downloads: list of (url, save_path) atau (url, save_path, etag, last_modified).
+    `headers` dikirim di setiap request (mis. Authorization untuk repo privat).
+    Mengembalikan list hasil fetch_raw_code dengan urutan yang sama.
+    """
+    if not downloads:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(downloads))) as executor:
+        return list(executor.map(lambda d: fetch_raw_code(d[0], d[1], deadline, *d[2:], headers=headers), downloads))
+
+
+# --- MANIFEST REPO (scraping inkremental) ---
+
+MANIFEST_DIR = '.manifests'   # Subfolder di save_dir; tidak ikut terhapus oleh clear_directory
+MANIFEST_VERSION = 1
+
+def manifest_path(save_dir, username, repo_name):
+    return os.path.join(save_dir, MANIFEST_DIR, f"{username}_{repo_name}.json")
+
+def load_manifest(path):
+    """
+    Manifest repo: ETag tree API dan, untuk setiap file, SHA blob git, nama file lokal serta
+    ETag/Last-Modified URL raw. Mengembalikan {} jika belum ada atau tidak valid.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+def save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.part'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
 
 # --- FUNGSI BARU UNTUK MENGUNDUH SELURUH REPO ---
 def get_github_repo_info(repo_url):
@@ -52,62 +433,375 @@ def get_github_repo_info(repo_url):
         return username, repo_name
     return None, None
 
-def scrape_repo_files(repo_url, save_dir, allowed_extensions=('.js', '.py', '.java', '.c', '.cpp', '.h')):
+def scrape_repo_files(repo_url, save_dir, allowed_extensions=DEFAULT_EXTENSIONS,
+                      max_workers=DOWNLOAD_WORKERS, timeout=None, incremental=True, ingest_filter=None):
     """
     Mengunduh semua file kode dari repositori GitHub ke direktori yang ditentukan.
-    Menggunakan GitHub API untuk mendapatkan daftar file.
+    Menggunakan GitHub API untuk mendapatkan daftar file, lalu mengunduh file secara bersamaan.
+    `timeout` (detik) membatasi durasi keseluruhan; file yang belum terunduh saat itu dilewati.
+    Dengan `incremental`, manifest repo dipakai agar hanya blob yang SHA-nya berubah yang diunduh
+    (lewat request kondisional), dan file yang sudah dihapus dari repo ikut dihapus secara lokal.
+    `ingest_filter` (IngestFilter) melewati path vendor/build dan file besar sebelum diunduh
+    (memakai `size` dari tree API), lalu file minified/hasil generator setelah diunduh. File yang
+    dilewati karena isinya dicatat di manifest agar tidak diunduh ulang selama SHA-nya dan
+    konfigurasi filter sama; jika konfigurasi filter berubah, file tersebut diunduh dan file lokal
+    yang tidak berubah dinilai ulang.
     """
+    deadline = time.monotonic() + timeout if timeout else None
     username, repo_name = get_github_repo_info(repo_url)
     if not username or not repo_name:
         print(f"URL repositori tidak valid: {repo_url}")
         return []
+    if ingest_filter is not None:
+        ingest_filter = ingest_filter.scoped(repo_url)
+
+    client = get_client()
+    branch = client.default_branch(username, repo_name, deadline)
+    if not branch:
+        return []
+    tree_path = f"/repos/{username}/{repo_name}/git/trees/{quote(branch, safe='')}?recursive=1"
 
-    api_url = f"https://api.github.com/repos/{username}/{repo_name}/git/trees/main?recursive=1"
-    # Atau 'master' jika 'main' tidak ada. Bisa juga deteksi default branch.
-    # Untuk skripsi, gunakan default branch atau parameterkan.
+    path_of_manifest = manifest_path(save_dir, username, repo_name)
+    manifest = load_manifest(path_of_manifest) if incremental else {}
+    old_files = manifest.get('files', {})
+    extensions = sorted(allowed_extensions)
 
     headers = {}
-    # Anda bisa menambahkan Personal Access Token (PAT) di sini untuk rate limit yang lebih tinggi:
-    # GITHUB_TOKEN = os.getenv('GITHUB_TOKEN') # Pastikan Anda menyetel environment variable ini
-    # if GITHUB_TOKEN:
-    #     headers['Authorization'] = f'token {GITHUB_TOKEN}'
+    filter_signature = ingest_filter.signature if ingest_filter is not None else None
+    # Keputusan filter di manifest hanya berlaku untuk konfigurasi filter yang sama
+    same_filter = manifest.get('ingest_filter') == filter_signature
+    if (manifest.get('tree_etag') and manifest.get('extensions') == extensions and manifest.get('branch') == branch
+            and same_filter):
+        # 304 berarti tree tidak berubah, daftar file diambil dari manifest
+        headers['If-None-Match'] = manifest['tree_etag']
 
     print(f"Mengambil daftar file dari {repo_url}...")
     try:
-        response = requests.get(api_url, headers=headers, timeout=15)
-        response.raise_for_status()
-        tree_data = response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Gagal mengambil daftar file dari API GitHub {api_url}: {e}")
+        response = client.get(tree_path, deadline=deadline, headers=headers)
+        if response.status_code == 304:
+            tree_etag = manifest['tree_etag']
+            tree_items = [{'path': path, 'type': 'blob', 'sha': entry['sha'], 'size': entry.get('size')}
+                          for path, entry in old_files.items()]
+        else:
+            response.raise_for_status()
+            tree_etag = response.headers.get('ETag')
+            tree_items = response.json().get('tree', [])
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Gagal mengambil daftar file dari API GitHub {client.api_url}{tree_path}: {e}")
         return []
 
+    entries = []   # (file_path, local_filename, sha, size) untuk file kode, urutan sesuai tree
+    downloads = [] # (raw_url, save_path, etag, last_modified) untuk file yang berubah atau belum ada
+    download_paths = []
+    new_files = {}
+    for item in tree_items:
+        if item['type'] == 'blob': # 'blob' berarti file
+            file_path = item['path']
+            file_ext = os.path.splitext(file_path)[1].lower()
+
+            if file_ext in allowed_extensions:
+                if ingest_filter is not None:
+                    reason = ingest_filter.check_path(file_path, item.get('size'))
+                    if reason:
+                        # Tetap dicatat di manifest agar tree dari cache (304) juga melaporkannya
+                        new_files[file_path] = {'sha': item.get('sha'), 'size': item.get('size'), 'skipped': reason}
+                        continue
+                old = old_files.get(file_path)
+                if (ingest_filter is not None and same_filter and old and old.get('skipped')
+                        and old.get('sha') == item.get('sha')):
+                    # Isi blob dan filter sama dengan saat dilewati sebelumnya: tidak perlu diunduh lagi
+                    ingest_filter.record(file_path, old['skipped'], old.get('detail'))
+                    new_files[file_path] = old
+                    continue
+
+                raw_file_url = f"{GITHUB_RAW_URL}/{username}/{repo_name}/{quote(branch)}/{quote(file_path)}"
+
+                # Buat nama file unik untuk penyimpanan lokal
+                local_filename = f"{username}_{repo_name}_{file_path.replace('/', '_')}"
+                save_path = os.path.join(save_dir, local_filename)
+                entries.append((file_path, local_filename, item.get('sha'), item.get('size')))
+
+                if not os.path.exists(save_path):
+                    downloads.append((raw_file_url, save_path, None, None))
+                    download_paths.append(file_path)
+                elif old is None or old.get('sha') != item.get('sha') or not item.get('sha'):
+                    # Blob berubah (atau belum tercatat): unduh ulang, kecuali server menjawab 304
+                    downloads.append((raw_file_url, save_path, old and old.get('etag'), old and old.get('last_modified')))
+                    download_paths.append(file_path)
+                # else: SHA sama dan file lokal ada, tidak perlu request
+
+    unchanged = len(entries) - len(downloads)
+    print(f"  Mengunduh {len(downloads)} file ({unchanged} tidak berubah)...")
+    raw_headers = {'Authorization': f'Bearer {client.token}'} if client.token else None
+    results = dict(zip(download_paths, download_many(downloads, max_workers, deadline, raw_headers)))
+
     downloaded_files_names = []
-    if 'tree' in tree_data:
-        for item in tree_data['tree']:
-            if item['type'] == 'blob': # 'blob' berarti file
-                file_path = item['path']
-                file_ext = os.path.splitext(file_path)[1].lower()
-
-                if file_ext in allowed_extensions:
-                    raw_file_url = f"https://raw.githubusercontent.com/{username}/{repo_name}/main/{file_path}"
-                    # Pastikan 'main' cocok dengan branch yang Anda ambil dari API.
-                    # Jika 'main' tidak ditemukan, coba 'master' atau ambil dari response API.
-
-                    # Buat nama file unik untuk penyimpanan lokal
-                    local_filename = f"{username}_{repo_name}_{file_path.replace('/', '_')}"
-                    save_path = os.path.join(save_dir, local_filename)
-
-                    if not os.path.exists(save_path):
-                        print(f"  Mengunduh: {file_path}")
-                        if download_raw_code(raw_file_url, save_path):
-                            downloaded_files_names.append(local_filename)
-                    else:
-                        # print(f"  Sudah ada: {file_path}") # Uncomment if you want to see skipped files
-                        downloaded_files_names.append(local_filename) # Masih anggap ini sebagai file yang "diambil"
-
-    print(f"Selesai mengunduh file dari {repo_url}. Total: {len(downloaded_files_names)} file kode.")
+    for file_path, local_filename, sha, size in entries:
+        status, etag, last_modified = results.get(file_path, ('unchanged', None, None))
+        if status == 'failed':
+            continue
+        old = old_files.get(file_path, {})
+        if status == 'unchanged' or status == 'not_modified':
+            etag, last_modified = etag or old.get('etag'), last_modified or old.get('last_modified')
+        entry = {'sha': sha, 'size': size, 'local': local_filename, 'etag': etag, 'last_modified': last_modified}
+        if ingest_filter is not None and (status == 'downloaded' or not same_filter):
+            # File yang baru diunduh, atau file lokal yang lolos filter dengan konfigurasi lama
+            save_path = os.path.join(save_dir, local_filename)
+            with open(save_path, 'rb') as f:
+                verdict = ingest_filter.content_verdict(f.read())
+            if verdict:
+                reason, detail = verdict
+                ingest_filter.record(file_path, reason, detail)
+                os.unlink(save_path)
+                new_files[file_path] = {'sha': sha, 'size': size, 'skipped': reason, 'detail': detail}
+                continue
+        new_files[file_path] = entry
+        downloaded_files_names.append(local_filename)
+
+    # File yang tidak ada lagi di repo dihapus agar tidak ikut dianalisis atau ditampilkan
+    removed = 0
+    current_paths = {file_path for file_path, _, _, _ in entries}
+    for file_path, old in old_files.items():
+        if file_path not in current_paths:
+            stale_path = os.path.join(save_dir, old.get('local', ''))
+            if old.get('local') and os.path.isfile(stale_path):
+                os.unlink(stale_path)
+                removed += 1
+
+    if incremental:
+        failed = sum(1 for status, _, _ in results.values() if status == 'failed')
+        save_manifest(path_of_manifest, {
+            'version': MANIFEST_VERSION,
+            # Jika ada unduhan gagal, tree harus diminta ulang pada scrape berikutnya
+            'tree_etag': tree_etag if not failed else None,
+            'extensions': extensions,
+            'branch': branch,
+            'ingest_filter': filter_signature,
+            'files': new_files,
+        })
+
+    not_modified = sum(1 for status, _, _ in results.values() if status == 'not_modified')
+    print(f"Selesai mengunduh file dari {repo_url}. Total: {len(downloaded_files_names)} file kode "
+          f"({len(downloads) - not_modified} diunduh, {unchanged + not_modified} tidak berubah, {removed} dihapus).")
     return downloaded_files_names
 
+# --- INGESTI SATU ARSIP PER REPO (tarball/zipball atau corpus lokal) ---
+
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tgz', '.tar', '.zip')
+MAX_MEMBER_BYTES = 2 * 1024 * 1024   # File lebih besar dari ini di dalam arsip dilewati
+ZIP_SPOOL_BYTES = 16 * 1024 * 1024   # Zip butuh seek; dibuffer di memori sampai ukuran ini, lalu ke file temporer
+
+
+def archive_kind(name):
+    """
+    'zip', 'tar' atau None berdasarkan akhiran nama/path arsip.
+    """
+    lower = name.lower()
+    if lower.endswith('.zip'):
+        return 'zip'
+    if lower.endswith(('.tar.gz', '.tgz', '.tar')):
+        return 'tar'
+    return None
+
+def _archive_label(name):
+    base = os.path.basename(name.rstrip('/\\'))
+    for suffix in ARCHIVE_SUFFIXES:
+        if base.lower().endswith(suffix):
+            return base[:-len(suffix)]
+    return base
+
+def _member_path(name, strip_components):
+    parts = [p for p in name.replace('\\', '/').split('/') if p and p != '.']
+    if '..' in parts or len(parts) <= strip_components:
+        return None
+    return '/'.join(parts[strip_components:])
+
+def _allowed(path, allowed_extensions):
+    return os.path.splitext(path)[1].lower() in allowed_extensions
+
+def _check_deadline(deadline):
+    remaining = _remaining(deadline)
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded("Batas waktu terlewati saat membaca arsip")
+
+def iter_tar_members(fileobj, allowed_extensions=DEFAULT_EXTENSIONS, strip_components=0, deadline=None,
+                     ingest_filter=None):
+    """
+    Membaca arsip tar (boleh terkompresi) secara streaming dan menghasilkan (path, bytes)
+    untuk file yang ekstensinya diizinkan. Member lain dilewati tanpa ditulis ke disk.
+    Jika `ingest_filter` (IngestFilter) diberikan, path dan ukuran member diperiksa sebelum dibaca.
+    """
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for member in archive:
+            _check_deadline(deadline)
+            if not member.isfile() or member.size > MAX_MEMBER_BYTES:
+                continue
+            path = _member_path(member.name, strip_components)
+            if path is None or not _allowed(path, allowed_extensions):
+                continue
+            if ingest_filter is not None and ingest_filter.check_path(path, member.size):
+                continue
+            extracted = archive.extractfile(member)
+            if extracted is not None:
+                yield path, extracted.read()
+
+def iter_zip_members(fileobj, allowed_extensions=DEFAULT_EXTENSIONS, strip_components=0, deadline=None,
+                     ingest_filter=None):
+    """
+    Sama dengan iter_tar_members untuk arsip zip. `fileobj` harus bisa di-seek.
+    """
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            _check_deadline(deadline)
+            if info.is_dir() or info.file_size > MAX_MEMBER_BYTES:
+                continue
+            path = _member_path(info.filename, strip_components)
+            if path is None or not _allowed(path, allowed_extensions):
+                continue
+            if ingest_filter is not None and ingest_filter.check_path(path, info.file_size):
+                continue
+            yield path, archive.read(info)
+
+def iter_directory_files(root, allowed_extensions=DEFAULT_EXTENSIONS, deadline=None, ingest_filter=None):
+    """
+    Menghasilkan (path relatif, bytes) untuk file kode di bawah direktori lokal, terurut.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            _check_deadline(deadline)
+            full_path = os.path.join(dirpath, filename)
+            if not _allowed(filename, allowed_extensions) or os.path.islink(full_path):
+                continue
+            size = os.path.getsize(full_path)
+            if size > MAX_MEMBER_BYTES:
+                continue
+            path = os.path.relpath(full_path, root).replace(os.sep, '/')
+            if ingest_filter is not None and ingest_filter.check_path(path, size):
+                continue
+            with open(full_path, 'rb') as f:
+                yield path, f.read()
+
+MAX_REDIRECTS = 5
+
+def _open_with_checked_redirects(url, deadline, check_url=None):
+    """
+    GET streaming yang mengikuti redirect secara manual, agar setiap tujuan redirect bisa
+    diperiksa `check_url` sebelum diminta.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        response = request_with_retry('GET', url, deadline=deadline, timeout=30, stream=True, allow_redirects=False)
+        if not response.is_redirect:
+            return response
+        location = urljoin(url, response.headers['Location'])
+        response.close()
+        if check_url is not None:
+            check_url(location)
+        url = location
+    raise requests.exceptions.TooManyRedirects(f"Terlalu banyak redirect: {url}")
+
+def _iter_remote_archive(open_response, kind, allowed_extensions, strip_components, deadline, ingest_filter=None):
+    # Durasi 'archive' mencakup seluruh stream, termasuk pemrosesan file di dalamnya
+    started = time.perf_counter()
+    with open_response() as r:
+        try:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            if kind == 'tar':
+                yield from iter_tar_members(r.raw, allowed_extensions, strip_components, deadline, ingest_filter)
+                return
+            with tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_BYTES) as spool:
+                for chunk in r.iter_content(chunk_size=65536):
+                    spool.write(chunk)
+                spool.seek(0)
+                yield from iter_zip_members(spool, allowed_extensions, strip_components, deadline, ingest_filter)
+        finally:
+            # tell() = byte mentah (terkompresi) yang sudah dibaca dari socket
+            metrics.DOWNLOADED_BYTES.inc(r.raw.tell(), kind='archive')
+            metrics.GITHUB_REQUEST_SECONDS.observe(time.perf_counter() - started, kind='archive')
+
+def iter_archive_source(source, allowed_extensions=DEFAULT_EXTENSIONS, deadline=None, ingest_filter=None,
+                        check_url=None):
+    """
+    Menentukan jenis sumber dan mengembalikan (prefix nama lokal, iterator (path, bytes)).
+    Sumber yang didukung:
+      - URL repo GitHub (https://github.com/user/repo): tarball branch default lewat API
+      - URL langsung ke arsip .tar.gz/.tgz/.tar/.zip
+      - path lokal ke direktori atau arsip .tar.gz/.tgz/.tar/.zip
+    Untuk tarball GitHub, direktori teratas (user-repo-sha/) dibuang dari path.
+    `check_url(url)` (opsional) dipanggil untuk setiap tujuan redirect URL arsip langsung dan
+    melempar exception jika URL itu tidak boleh diambil.
+    """
+    parsed = urlparse(source)
+    if parsed.scheme in ('http', 'https'):
+        kind = archive_kind(parsed.path)
+        if kind is None:
+            username, repo_name = get_github_repo_info(source)
+            if not username or not repo_name:
+                raise ValueError(f"URL repositori tidak valid: {source}")
+            prefix = f"{username}_{repo_name}"
+            # Tanpa ref, endpoint tarball memakai branch default repo
+            open_tarball = lambda: get_client().get(f"/repos/{username}/{repo_name}/tarball",
+                                                    deadline=deadline, timeout=30, stream=True)
+            return prefix, _iter_remote_archive(open_tarball, 'tar', allowed_extensions, 1, deadline, ingest_filter)
+        open_archive = lambda: _open_with_checked_redirects(source, deadline, check_url)
+        return _archive_label(parsed.path), _iter_remote_archive(open_archive, kind, allowed_extensions, 0, deadline,
+                                                                 ingest_filter)
+
+    if os.path.isdir(source):
+        return _archive_label(source), iter_directory_files(source, allowed_extensions, deadline, ingest_filter)
+    kind = archive_kind(source)
+    if kind is None or not os.path.isfile(source):
+        raise ValueError(f"Sumber arsip tidak dikenali: {source}")
+
+    def iter_local():
+        with open(source, 'rb') as f:
+            if kind == 'tar':
+                yield from iter_tar_members(f, allowed_extensions, 0, deadline, ingest_filter)
+            else:
+                yield from iter_zip_members(f, allowed_extensions, 0, deadline, ingest_filter)
+    return _archive_label(source), iter_local()
+
+def scrape_repo_archive(source, save_dir, allowed_extensions=DEFAULT_EXTENSIONS, on_file=None, timeout=None,
+                        ingest_filter=None, check_url=None):
+    """
+    Mengambil semua file kode dari satu sumber arsip (lihat iter_archive_source) dengan satu
+    request streaming, bukan satu request per file. Hanya member yang ekstensinya diizinkan yang
+    ditulis ke save_dir (dengan pola nama yang sama seperti scrape_repo_files).
+    `on_file(local_filename, data)` dipanggil untuk setiap file, sehingga isi file bisa langsung
+    di-fingerprint tanpa dibaca ulang dari disk.
+    `ingest_filter` (IngestFilter) melewati file vendor/minified/hasil generator; lihat ingest_filter.py.
+    `check_url` diteruskan ke iter_archive_source untuk memeriksa tujuan redirect.
+    Mengembalikan list nama file lokal.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    if ingest_filter is not None:
+        ingest_filter = ingest_filter.scoped(source)
+    try:
+        prefix, members = iter_archive_source(source, allowed_extensions, deadline, ingest_filter, check_url)
+    except ValueError as e:
+        print(e)
+        return []
+
+    print(f"Mengambil arsip dari {source}...")
+    local_filenames = []
+    try:
+        for file_path, data in members:
+            if ingest_filter is not None and ingest_filter.check_content(file_path, data):
+                continue
+            local_filename = f"{prefix}_{file_path.replace('/', '_')}"
+            with open(os.path.join(save_dir, local_filename), 'wb') as f:
+                f.write(data)
+            local_filenames.append(local_filename)
+            if on_file is not None:
+                on_file(local_filename, data)
+    except (requests.exceptions.RequestException, tarfile.TarError, zipfile.BadZipFile, OSError) as e:
+        # File yang sudah terbaca sebelum error tetap dipakai
+        print(f"Gagal membaca arsip {source}: {e}")
+
+    print(f"Selesai membaca arsip {source}. Total: {len(local_filenames)} file kode.")
+    return local_filenames
+
 # Jika Anda ingin menguji scraper ini secara mandiri:
 if __name__ == "__main__":
     # Contoh penggunaan untuk scraping repositori penuh
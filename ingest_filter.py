@@ -0,0 +1,183 @@
+import math
+import re
+import threading
+from collections import Counter
+from fnmatch import fnmatch
+
+import metrics
+
+
+# Pola path yang dilewati saat ingest. Pola berakhiran '/' cocok dengan nama direktori di
+# kedalaman mana pun; pola lain dicocokkan ke nama file (atau ke path penuh jika memuat '/').
+DEFAULT_EXCLUDE_GLOBS = (
+    'node_modules/', 'bower_components/', 'vendor/', 'vendors/', 'third_party/',
+    'dist/', 'build/', 'out/', 'target/', '.git/', '__pycache__/', 'venv/', '.venv/',
+    '*.min.js', '*-min.js', '*.bundle.js', '*.chunk.js',
+)
+# File lebih besar dari ini dilewati (memakai field `size` tree API, sebelum diunduh)
+DEFAULT_MAX_FILE_BYTES = 512 * 1024
+
+# Heuristik konten, hanya dihitung dari potongan awal file
+CONTENT_SAMPLE_BYTES = 64 * 1024
+MINIFIED_MAX_LINE = 1000        # Ada baris sepanjang ini ...
+MINIFIED_AVG_LINE = 200         # ... dan rata-rata panjang baris di atas ini
+MIN_WHITESPACE_RATIO = 0.05     # Kode tulisan tangan jarang punya spasi < 5%
+MAX_ENTROPY_BITS = 5.9          # Entropi per byte di atas ini: data base64/biner tertanam
+# Penanda file hasil generator, hanya dicari di beberapa baris pertama (header)
+GENERATED_HEADER_LINES = 5
+GENERATED_MARKERS = re.compile(
+    rb'@generated|do not edit|auto-?generated|this file (?:is|was) (?:automatically )?generated',
+    re.IGNORECASE,
+)
+
+
+def byte_entropy(data):
+    """
+    Entropi Shannon (bit per byte) dari `data`.
+    """
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum(c / total * math.log2(c / total) for c in Counter(data).values())
+
+
+class IngestFilter:
+    """
+    Tahap filter saat ingest: file vendor/hasil build (glob path), file terlalu besar (ukuran dari
+    tree API atau header arsip, sebelum diunduh) dan file minified/hasil generator (heuristik
+    panjang baris, rasio spasi, entropi dan penanda "generated") dilewati.
+    Setiap file yang dilewati dicatat beserta alasannya dan sumbernya (repo/arsip); lihat report().
+    Satu objek bisa dipakai bersama oleh beberapa scrape yang berjalan paralel.
+    """
+    def __init__(self, exclude_globs=DEFAULT_EXCLUDE_GLOBS, max_bytes=DEFAULT_MAX_FILE_BYTES, check_content=True):
+        self.exclude_globs = tuple(exclude_globs or ())
+        self.max_bytes = max_bytes
+        self.content_checks = check_content
+        self.skipped = []   # list dict {source, path, reason, detail}
+        self._lock = threading.Lock()
+
+    @property
+    def signature(self):
+        """
+        Konfigurasi filter dalam bentuk JSON, disimpan di manifest agar daftar file dari cache
+        tree tidak dipakai ulang setelah konfigurasi filter berubah.
+        """
+        return [list(self.exclude_globs), self.max_bytes, self.content_checks]
+
+    def record(self, path, reason, detail, source=None):
+        with self._lock:
+            self.skipped.append({'source': source, 'path': path, 'reason': reason, 'detail': detail})
+        metrics.FILES.inc(result=f'skipped_{reason}')
+        return reason
+
+    def _matching_glob(self, path):
+        parts = path.split('/')
+        for pattern in self.exclude_globs:
+            if pattern.endswith('/'):
+                if any(fnmatch(part, pattern[:-1]) for part in parts[:-1]):
+                    return pattern
+            elif fnmatch(path if '/' in pattern else parts[-1], pattern):
+                return pattern
+        return None
+
+    def check_path(self, path, size=None, source=None):
+        """
+        Dipanggil sebelum file diunduh/dibaca. Mengembalikan alasan ('path' atau 'size') jika
+        file dilewati, atau None jika file boleh diambil.
+        """
+        pattern = self._matching_glob(path)
+        if pattern is not None:
+            return self.record(path, 'path', pattern, source)
+        if self.max_bytes and size is not None and size > self.max_bytes:
+            return self.record(path, 'size', f"{size} > {self.max_bytes} byte", source)
+        return None
+
+    def content_reason(self, data):
+        """
+        Heuristik murah atas potongan awal isi file. Mengembalikan (alasan, detail) atau None.
+        """
+        sample = data[:CONTENT_SAMPLE_BYTES]
+        if not sample:
+            return None
+        header = b'\n'.join(sample[:4096].split(b'\n', GENERATED_HEADER_LINES)[:GENERATED_HEADER_LINES])
+        marker = GENERATED_MARKERS.search(header)
+        if marker:
+            return 'generated', marker.group().decode('ascii', 'replace')
+
+        lines = sample.split(b'\n')
+        longest = max(len(line) for line in lines)
+        average = len(sample) / len(lines)
+        if longest > MINIFIED_MAX_LINE and average > MINIFIED_AVG_LINE:
+            return 'minified', f"baris terpanjang {longest}, rata-rata {average:.0f} byte"
+        if len(sample) >= 1024:
+            whitespace = sum(sample.count(c) for c in b' \t\n\r') / len(sample)
+            if whitespace < MIN_WHITESPACE_RATIO:
+                return 'minified', f"rasio spasi {whitespace:.3f}"
+            entropy = byte_entropy(sample)
+            if entropy > MAX_ENTROPY_BITS:
+                return 'entropy', f"{entropy:.2f} bit/byte"
+        return None
+
+    def content_verdict(self, data):
+        """
+        (alasan, detail) jika isi file harus dilewati (ukuran atau heuristik konten), atau None.
+        Tidak mencatat apa pun; lihat check_content.
+        """
+        if self.max_bytes and len(data) > self.max_bytes:
+            return 'size', f"{len(data)} > {self.max_bytes} byte"
+        if not self.content_checks:
+            return None
+        return self.content_reason(data)
+
+    def check_content(self, path, data, source=None):
+        """
+        Dipanggil setelah isi file tersedia. Mengembalikan alasan ('size', 'generated', 'minified'
+        atau 'entropy') jika file dilewati, atau None.
+        """
+        found = self.content_verdict(data)
+        if found is None:
+            return None
+        return self.record(path, *found, source)
+
+    def scoped(self, source):
+        """
+        Tampilan filter dengan sumber tetap, sehingga check_path/check_content bisa dipanggil
+        tanpa argumen source (mis. dari iterator arsip).
+        """
+        return _ScopedIngestFilter(self, source)
+
+    def report(self):
+        """
+        Ringkasan file yang dilewati: jumlah per alasan dan daftar lengkapnya.
+        """
+        with self._lock:
+            skipped = list(self.skipped)
+        return {
+            'total': len(skipped),
+            'by_reason': dict(Counter(entry['reason'] for entry in skipped)),
+            'files': skipped,
+        }
+
+
+class _ScopedIngestFilter:
+    __slots__ = ('parent', 'source')
+
+    def __init__(self, parent, source):
+        self.parent = parent
+        self.source = source
+
+    @property
+    def signature(self):
+        return self.parent.signature
+
+    def check_path(self, path, size=None):
+        return self.parent.check_path(path, size, self.source)
+
+    def check_content(self, path, data):
+        return self.parent.check_content(path, data, self.source)
+
+    def content_verdict(self, data):
+        return self.parent.content_verdict(data)
+
+    def record(self, path, reason, detail):
+        return self.parent.record(path, reason, detail, self.source)
@@ -0,0 +1,292 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from analysis import AnalysisError
+import metrics
+
+JOB_STATUSES = ('queued', 'running', 'done', 'error')
+
+_PROGRESS_FIELDS = ('phase', 'files_done', 'files_total', 'pairs_done', 'pairs_total')
+
+# Baris hasil ditulis per batch: saat batch penuh atau setelah progress_interval detik
+RESULT_BATCH_SIZE = 200
+
+# Selama job antre/berjalan, proses pemiliknya memperbarui updated_at setiap HEARTBEAT_INTERVAL detik.
+# Job yang tidak diperbarui lebih dari STALE_AFTER detik dianggap yatim (prosesnya mati).
+HEARTBEAT_INTERVAL = 5.0
+STALE_AFTER = 60.0
+STALE_ERROR = "Job terhenti: proses yang menjalankannya tidak lagi merespons."
+
+
+class JobStore:
+    """
+    Status job analisis di SQLite (data/jobs.sqlite3), sehingga status dan hasil sebuah job
+    bisa dibaca dari proses worker lain, bukan hanya dari proses yang menjalankannya.
+    """
+    def __init__(self, db_path=os.path.join('data', 'jobs.sqlite3')):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                phase TEXT,
+                files_done INTEGER NOT NULL DEFAULT 0,
+                files_total INTEGER NOT NULL DEFAULT 0,
+                pairs_done INTEGER NOT NULL DEFAULT 0,
+                pairs_total INTEGER NOT NULL DEFAULT 0,
+                params TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                error_status INTEGER,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        # Hasil per pasangan, ditulis selama analisis berjalan agar bisa di-stream ke klien
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_results (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                row TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            )
+        """)
+        self._conn.commit()
+
+    def create(self, params):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, phase, params, created_at, updated_at) VALUES (?, 'queued', 'queued', ?, ?, ?)",
+                (job_id, json.dumps(params), now, now)
+            )
+            self._conn.commit()
+        return job_id
+
+    def update(self, job_id, **fields):
+        if not fields:
+            return
+        fields['updated_at'] = time.time()
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id):
+        """
+        Status job tanpa hasilnya, atau None jika job tidak ada.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, phase, files_done, files_total, pairs_done, pairs_total, error, "
+                "created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def add_results(self, job_id, start_seq, rows):
+        """
+        Menyimpan baris hasil dengan nomor urut start_seq, start_seq + 1, ...
+        """
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO job_results (job_id, seq, row) VALUES (?, ?, ?)",
+                [(job_id, start_seq + i, json.dumps(row)) for i, row in enumerate(rows)]
+            )
+            self._conn.commit()
+
+    def touch(self, job_ids):
+        """
+        Heartbeat: memperbarui updated_at job yang masih antre/berjalan.
+        """
+        if not job_ids:
+            return
+        placeholders = ', '.join('?' for _ in job_ids)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET updated_at = ? WHERE id IN ({placeholders}) AND status IN ('queued', 'running')",
+                (time.time(), *job_ids)
+            )
+            self._conn.commit()
+
+    def fail_if_stale(self, job_id, max_age=STALE_AFTER):
+        """
+        Menandai job antre/berjalan yang heartbeat-nya lebih lama dari `max_age` detik sebagai error.
+        Mengembalikan True jika job ditandai. Kondisi dicek di dalam UPDATE, sehingga job yang
+        baru saja diperbarui oleh pemiliknya tidak ikut tertimpa.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'error', error = ?, error_status = 500, updated_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running') AND updated_at < ?",
+                (STALE_ERROR, now, job_id, now - max_age)
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def prune(self, max_age):
+        """
+        Menghapus job selesai/gagal yang terakhir diperbarui lebih dari `max_age` detik lalu,
+        beserta baris hasilnya. Mengembalikan jumlah job yang dihapus.
+        """
+        cutoff = time.time() - max_age
+        with self._lock:
+            job_ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('done', 'error') AND updated_at < ?", (cutoff,)
+            )]
+            if job_ids:
+                placeholders = ', '.join('?' for _ in job_ids)
+                self._conn.execute(f"DELETE FROM job_results WHERE job_id IN ({placeholders})", job_ids)
+                self._conn.execute(f"DELETE FROM jobs WHERE id IN ({placeholders})", job_ids)
+                self._conn.commit()
+        return len(job_ids)
+
+    def get_results(self, job_id, after_seq=-1, limit=1000):
+        """
+        Baris hasil setelah after_seq sebagai list of (seq, row_json), terurut.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, row FROM job_results WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, after_seq, limit)
+            ).fetchall()
+
+    def get_result(self, job_id):
+        """
+        Mengembalikan (status, result_json, error, error_status) atau None jika job tidak ada.
+        result_json adalah hasil lengkap: ringkasan ditambah daftar pasangan dari job_results.
+        """
+        row = self.get_summary(job_id)
+        if row is None or row[1] is None:
+            return row
+        status, summary, error, error_status = row
+        summary = json.loads(summary)
+        counts = {key: value for key, value in summary.items() if key.endswith('_results') and isinstance(value, int)}
+        if counts:
+            # Baris disimpan sekali saja (job_results); daftar per jenis perbandingan disusun ulang di sini
+            for key in counts:
+                summary[key] = []
+            for _, row_json in self.get_results(job_id, limit=-1):
+                result_row = json.loads(row_json)
+                summary[f"{result_row['comparison']}_results"].append(result_row)
+        return status, json.dumps(summary), error, error_status
+
+    def get_summary(self, job_id):
+        """
+        Seperti get_result, tetapi result_json hanya berisi ringkasan: setiap daftar `*_results`
+        diganti jumlah barisnya.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, result, error, error_status FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+
+class JobRunner:
+    """
+    Menjalankan `analysis_fn(progress=..., on_result=..., **params)` di background thread pool
+    dan mencatat fase, kemajuan serta setiap baris hasil ke JobStore. Penulisan progres dan
+    hasil dibatasi `progress_interval` detik.
+    Dengan `profile_mode` ('cprofile' atau 'sampling'), setiap job diprofil ke `profile_dir`/job-<id>.
+    Job milik runner ini diberi heartbeat selama antre/berjalan. Dengan `retention` (detik), job
+    selesai yang lebih tua dari itu dihapus setiap kali job baru dikirim.
+    """
+    def __init__(self, store, analysis_fn, max_workers=1, progress_interval=0.5, profile_mode=None, profile_dir=None,
+                 retention=None, heartbeat_interval=HEARTBEAT_INTERVAL):
+        self.store = store
+        self.analysis_fn = analysis_fn
+        self.progress_interval = progress_interval
+        self.profile_mode = profile_mode
+        self.profile_dir = profile_dir
+        self.retention = retention
+        self.heartbeat_interval = heartbeat_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._active = set()
+        self._active_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name='analysis-job-heartbeat', daemon=True)
+        self._heartbeat.start()
+
+    def submit(self, params):
+        if self.retention:
+            self.store.prune(self.retention)
+        job_id = self.store.create(params)
+        with self._active_lock:
+            self._active.add(job_id)
+        self._executor.submit(self._run, job_id, params)
+        return job_id
+
+    def _heartbeat_loop(self):
+        while not self._stopped.wait(self.heartbeat_interval):
+            with self._active_lock:
+                job_ids = list(self._active)
+            try:
+                self.store.touch(job_ids)
+            except sqlite3.Error as e:
+                print(f"Gagal menulis heartbeat job: {e}")
+
+    def _run(self, job_id, params):
+        state = {}
+        last_write = [0.0]
+
+        def progress(**fields):
+            phase_changed = 'phase' in fields and fields['phase'] != state.get('phase')
+            state.update((k, v) for k, v in fields.items() if k in _PROGRESS_FIELDS)
+            now = time.monotonic()
+            if phase_changed or now - last_write[0] >= self.progress_interval:
+                self.store.update(job_id, **state)
+                last_write[0] = now
+
+        pending_rows = []
+        next_seq = [0]
+        last_flush = [time.monotonic()]
+
+        def flush_results():
+            if pending_rows:
+                self.store.add_results(job_id, next_seq[0], pending_rows)
+                next_seq[0] += len(pending_rows)
+                pending_rows.clear()
+            last_flush[0] = time.monotonic()
+
+        def on_result(row):
+            pending_rows.append(row)
+            if len(pending_rows) >= RESULT_BATCH_SIZE or time.monotonic() - last_flush[0] >= self.progress_interval:
+                flush_results()
+
+        self.store.update(job_id, status='running')
+        try:
+            with metrics.profile(f"job-{job_id}", self.profile_mode, self.profile_dir):
+                result = self.analysis_fn(progress=progress, on_result=on_result, **params)
+            # Semua baris sudah tersimpan sebelum status menjadi 'done'
+            flush_results()
+        except AnalysisError as e:
+            self.store.update(job_id, status='error', error=e.message, error_status=e.status, **state)
+        except Exception as e:
+            traceback.print_exc()
+            self.store.update(job_id, status='error', error=f"Analisis gagal: {e}", error_status=500, **state)
+        else:
+            # Baris pasangan sudah ada di job_results; di sini hanya jumlahnya agar tidak tersimpan dua kali
+            summary = {key: len(value) if key.endswith('_results') else value for key, value in result.items()}
+            self.store.update(job_id, status='done', result=json.dumps(summary), **state)
+        finally:
+            with self._active_lock:
+                self._active.discard(job_id)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+        self._stopped.set()
@@ -0,0 +1,177 @@
+import os
+import re
+
+
+# Gabungan keyword lama untuk semua bahasa; dipakai untuk ekstensi yang tidak terdaftar
+DEFAULT_KEYWORDS = frozenset([
+    'if', 'else', 'for', 'while', 'do', 'return', 'function', 'var', 'const', 'let', 'class',
+    'public', 'private', 'protected', 'static', 'void', 'int', 'float', 'double', 'char', 'bool',
+    'true', 'false', 'null', 'this', 'super', 'new', 'import', 'export', 'default', 'try', 'catch', 'finally',
+    'async', 'await', 'break', 'continue', 'switch', 'case', 'default', 'in', 'of', 'typeof', 'instanceof',
+    'def', 'class', 'import', 'from', 'as', 'with', 'open', 'lambda', 'yield', 'None', 'True', 'False',
+    'and', 'or', 'not',
+])
+
+# Potongan regex lexer. Setiap lexer memakai nama grup yang sama (comment, string, identifier,
+# number, newline, space, punct, dan directive untuk preprocessor C) sehingga satu loop
+# tokenize_source bisa melayani semua bahasa.
+_C_COMMENT = r'/\*.*?(?:\*/|\Z)|//[^\n]*'
+_QUOTED = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+_TAIL = r'''
+  | (?P<number>[0-9][A-Za-z0-9_]*)
+  | (?P<newline>\n)
+  | (?P<space>[^\S\n]+)
+  | (?P<punct>.)
+'''
+_IDENTIFIER = r'(?P<identifier>[A-Za-z_][A-Za-z0-9_]*)'
+
+
+def _lexer(comment, string, identifier=_IDENTIFIER, directive=None):
+    parts = []
+    if directive:
+        # Sebelum `space`, agar direktif yang diindentasi tetap dikenali dari awal baris
+        parts.append(f'(?P<directive>{directive})')
+    parts.append(f'(?P<comment>{comment})')
+    parts.append(f'(?P<string>{string})')
+    parts.append(identifier)
+    return re.compile('\n  | '.join(parts) + _TAIL, re.VERBOSE | re.DOTALL | re.MULTILINE)
+
+
+class Language:
+    """
+    Aturan tokenisasi satu bahasa: ekstensi file, lexer (regex yang sudah dikompilasi) dan tabel
+    keyword/builtin yang tidak dinormalisasi menjadi VAR_n. Bahasa dengan `family` yang sama
+    dianggap kompatibel dan dibandingkan satu sama lain (mis. C dengan C++, JS dengan TS).
+    """
+    __slots__ = ('name', 'family', 'extensions', 'keywords', 'lexer')
+
+    def __init__(self, name, family, extensions, keywords, lexer):
+        self.name = name
+        self.family = family
+        self.extensions = tuple(extensions)
+        self.keywords = frozenset(keywords)
+        self.lexer = lexer
+
+    def __repr__(self):
+        return f"Language({self.name!r})"
+
+
+_JS_KEYWORDS = '''
+    break case catch class const continue debugger default delete do else export extends finally for
+    function if import in instanceof let new return super switch this throw try typeof var void while
+    with yield async await of static get set null undefined true false NaN Infinity
+    console Math JSON Object Array String Number Boolean Promise Map Set Date Error RegExp Symbol
+    require module exports document window parseInt parseFloat setTimeout setInterval length prototype
+'''
+_TS_KEYWORDS = '''
+    interface type enum implements namespace declare readonly private protected public abstract as
+    any number string boolean never unknown keyof infer is
+'''
+_PYTHON_KEYWORDS = '''
+    False None True and as assert async await break class continue def del elif else except finally
+    for from global if import in is lambda nonlocal not or pass raise return try while with yield match
+    case self cls print len range open int str float list dict set tuple bool bytes enumerate zip map
+    filter sorted reversed sum min max abs round isinstance hasattr getattr setattr super object type
+    input iter next any all Exception ValueError TypeError KeyError IndexError
+'''
+_JAVA_KEYWORDS = '''
+    abstract assert boolean break byte case catch char class const continue default do double else enum
+    extends final finally float for goto if implements import instanceof int interface long native new
+    package private protected public return short static strictfp super switch synchronized this throw
+    throws transient try void volatile while var record yield sealed permits true false null
+    String System Integer Long Double Boolean Character Math Object List ArrayList Map HashMap Set HashSet
+    Arrays Collections Scanner Exception out println print length
+'''
+_C_KEYWORDS = '''
+    auto break case char const continue default do double else enum extern float for goto if inline int
+    long register restrict return short signed sizeof static struct switch typedef union unsigned void
+    volatile while _Bool bool true false NULL
+    printf scanf fprintf sprintf snprintf puts gets getchar putchar malloc calloc realloc free strlen
+    strcmp strcpy strncpy strcat memcpy memset fopen fclose fgets size_t FILE stdin stdout stderr EOF
+'''
+_CPP_KEYWORDS = _C_KEYWORDS + '''
+    alignas alignof and and_eq asm bitand bitor catch char16_t char32_t class compl constexpr const_cast
+    decltype delete dynamic_cast explicit export friend mutable namespace new noexcept not not_eq nullptr
+    operator or or_eq private protected public reinterpret_cast static_assert static_cast template this
+    thread_local throw try typeid typename using virtual wchar_t xor xor_eq override final
+    std cout cin cerr endl string vector map set pair make_pair push_back size begin end
+'''
+
+_C_DIRECTIVE = r'^[ \t]*\#[ \t]*(?:(?:include|include_next|import)[ \t]*(?:<[^>\n]*>|"[^"\n]*")|[A-Za-z_][A-Za-z0-9_]*)'
+# Awalan u8/L/u/U dan raw string C++ R"delim( ... )delim"
+_CPP_STRING = r'(?:u8|[LuU])?R"(?P<raw_delim>[^()\\\s]{0,16})\(.*?\)(?P=raw_delim)"|(?:u8|[LuU])?(?:' + _QUOTED + ')'
+
+_GENERIC_LEXER = re.compile(r'''
+    (?P<comment>/\*.*?(?:\*/|\Z)|//[^\n]*|\#[^\n]*)
+  | (?P<string>""".*?(?:"""|\Z)|\'\'\'.*?(?:\'\'\'|\Z)
+              |"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)
+  | (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+''' + _TAIL, re.VERBOSE | re.DOTALL)
+
+# Ekstensi yang tidak terdaftar memakai aturan lama (semua keyword digabung, '#' sebagai komentar)
+GENERIC = Language('generic', 'generic', (), DEFAULT_KEYWORDS, _GENERIC_LEXER)
+
+LANGUAGES = (
+    Language('javascript', 'javascript', ('.js', '.mjs', '.cjs', '.jsx'), _JS_KEYWORDS.split(),
+             _lexer(_C_COMMENT, _QUOTED + r'|`(?:\\.|[^`\\])*`', r'(?P<identifier>[A-Za-z_$][A-Za-z0-9_$]*)')),
+    Language('typescript', 'javascript', ('.ts', '.tsx'), (_JS_KEYWORDS + _TS_KEYWORDS).split(),
+             _lexer(_C_COMMENT, _QUOTED + r'|`(?:\\.|[^`\\])*`', r'(?P<identifier>[A-Za-z_$][A-Za-z0-9_$]*)')),
+    Language('python', 'python', ('.py', '.pyw'), _PYTHON_KEYWORDS.split(),
+             _lexer(r'\#[^\n]*',
+                    r'''(?:[rRbBuUfF]{1,2})?(?:""".*?(?:"""|\Z)|\'\'\'.*?(?:\'\'\'|\Z)|''' + _QUOTED + ')')),
+    Language('java', 'java', ('.java',), _JAVA_KEYWORDS.split(),
+             _lexer(_C_COMMENT, r'""".*?(?:"""|\Z)|' + _QUOTED)),
+    Language('c', 'c', ('.c', '.h'), _C_KEYWORDS.split(),
+             _lexer(_C_COMMENT, r'(?:u8|[LuU])?(?:' + _QUOTED + ')', directive=_C_DIRECTIVE)),
+    Language('cpp', 'c', ('.cpp', '.cc', '.cxx', '.hpp', '.hh', '.hxx'), _CPP_KEYWORDS.split(),
+             _lexer(_C_COMMENT, _CPP_STRING, directive=_C_DIRECTIVE)),
+)
+
+_BY_EXTENSION = {ext: language for language in LANGUAGES for ext in language.extensions}
+_BY_NAME = {language.name: language for language in LANGUAGES + (GENERIC,)}
+
+# Semua ekstensi yang punya lexer; default allowed_extensions untuk scraping
+SUPPORTED_EXTENSIONS = tuple(_BY_EXTENSION)
+
+# Bagian direktif preprocessor: nama (include, define, ...) dan argumen header opsional
+DIRECTIVE_PARTS = re.compile(r'\#[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*(.*)')
+
+
+def language_for_extension(ext):
+    return _BY_EXTENSION.get(ext.lower(), GENERIC)
+
+def language_for_path(path):
+    """
+    Language untuk path berdasarkan ekstensinya; GENERIC jika ekstensi tidak terdaftar.
+    """
+    return language_for_extension(os.path.splitext(path)[1])
+
+def get_language(name):
+    return _BY_NAME[name]
+
+def compatible(path_a, path_b):
+    """
+    True jika dua file berasal dari keluarga bahasa yang sama dan karena itu layak dibandingkan.
+    """
+    return language_for_path(path_a).family == language_for_path(path_b).family
+
+def partition_by_family(items, path_of):
+    """
+    Mengelompokkan `items` per keluarga bahasa (urutan kemunculan pertama, urutan item
+    di dalam kelompok dipertahankan). `path_of(item)` mengembalikan path file item tersebut.
+    """
+    groups = {}
+    for item in items:
+        groups.setdefault(language_for_path(path_of(item)).family, []).append(item)
+    return groups
+
+def compatible_pair_count(source_paths, reference_paths):
+    """
+    Jumlah pasangan (sumber, referensi) dengan keluarga bahasa yang sama; selisihnya terhadap
+    len(sources) * len(references) adalah pasangan lintas bahasa yang dilewati.
+    """
+    reference_families = {}
+    for path in reference_paths:
+        family = language_for_path(path).family
+        reference_families[family] = reference_families.get(family, 0) + 1
+    return sum(reference_families.get(language_for_path(path).family, 0) for path in source_paths)
@@ -1,134 +1,388 @@
 # main.py
+"""
+Pemindaian korpus secara batch tanpa interaksi (cron, build node).
 
+Contoh:
+    python main.py --students data/mahasiswa --references data/github --out hasil.csv
+    python main.py --student-repos mahasiswa.txt --reference-repos pembanding.txt --out hasil.jsonl -j 0
+    python main.py --students submissions/ --compare-students --out hasil.parquet --min-score 30
+
+Fingerprint dihitung sekali per file (paralel dengan -j) dan disimpan di FingerprintStore, lalu
+dibandingkan lewat FingerprintIndex per keluarga bahasa: mesin yang sama dengan similarity_checker.get_similar_blocks
+dan aplikasi web. Kemajuan dicatat di file checkpoint (<out>.checkpoint), sehingga run yang
+terputus dilanjutkan dari file sumber terakhir yang selesai saat perintah yang sama dijalankan ulang.
+"""
 import os
-from github_scraper import download_raw_code # Akan disesuaikan
-from similarity_checker import preprocess_code, jaccard_similarity # Akan disesuaikan
-
-def run_github_scraper():
-    print("Memulai pengunduhan kode dari GitHub...")
-    # Contoh URL raw code GitHub
-    # Anda perlu mengubah ini untuk mendapatkan URL raw yang benar, bukan URL blob.
-    # Misalnya, Anda bisa membuat fungsi parse_github_blob_url_to_raw() di github_scraper.py
-    urls = [
-        "https://github.com/Ahmadfaisal04/AHMAD-FAISAL---105841100121/blob/master/App.js",
-        "https://github.com/Linzty/Muhammad_Dasril_Asdar-105841100321-lab1/blob/main/App.js",
-        "https://github.com/Linzty/Muhammad_Dasril_Asdar-105841100321-lab1/blob/main/font.js"
-    ]
-
-    os.makedirs("data/github", exist_ok=True)
-
-    # *** PENTING: Perbarui fungsi download_raw_code di github_scraper.py
-    # untuk mengunduh konten raw, bukan halaman blob.
-    # Contoh dasar (Anda harus mengimplementasikan logika parsing URL):
-    # for i, url in enumerate(urls):
-    #     raw_url = parse_github_blob_url_to_raw(url) # Ini perlu diimplementasikan
-    #     if raw_url:
-    #         save_path = f"data/github/github_code_{i}_{os.path.basename(url).replace('.js', '')}.js" # Contoh nama file
-    #         download_raw_code(raw_url, save_path)
-    #         print(f"Mengunduh {raw_url} ke {save_path}")
-    #     else:
-    #         print(f"Gagal mem-parsing URL: {url}")
-    
-    # Untuk sementara, saya akan biarkan seperti kode Anda, tapi ingat ini perlu diubah
-    for i, url in enumerate(urls):
-        # Anda perlu mem-parsing URL di sini untuk mendapatkan URL raw content
-        # Contoh sederhana (TIDAK AKURAT, HANYA ILUSTRASI):
-        raw_url = url.replace("github.com", "raw.githubusercontent.com").replace("/blob/", "/")
-        
-        # Ekstrak nama file dari URL untuk nama penyimpanan yang lebih baik
-        file_name = url.split('/')[-1]
-        repo_name = url.split('/')[-3] # Mungkin nama repo
-        user_name = url.split('/')[-4] # Mungkin nama user
-
-        save_path = f"data/github/{user_name}_{repo_name}_{file_name}"
-        
-        print(f"Mengunduh {raw_url} ke {save_path}")
-        download_raw_code(raw_url, save_path)
-        print(f"Selesai mengunduh.")
-
-def run_similarity_check():
-    print("\nMemulai deteksi kemiripan kode...")
-    
-    # Perbandingan Mahasiswa vs GitHub
-    print("\n--- Mahasiswa vs GitHub ---")
-    results_mh_vs_gh = []
-    mahasiswa_dir = "data/mahasiswa"
-    github_dir = "data/github"
-
-    # Pastikan direktori mahasiswa ada dan berisi file
-    if not os.path.exists(mahasiswa_dir) or not os.listdir(mahasiswa_dir):
-        print(f"Direktori '{mahasiswa_dir}' kosong atau tidak ada. Mohon masukkan file kode mahasiswa.")
-        return
-
-    # Pastikan direktori github ada dan berisi file
-    if not os.path.exists(github_dir) or not os.listdir(github_dir):
-        print(f"Direktori '{github_dir}' kosong atau tidak ada. Mohon jalankan scraper GitHub.")
-        return
-
-    for m_file in os.listdir(mahasiswa_dir):
-        m_path = os.path.join(mahasiswa_dir, m_file)
-        if not os.path.isfile(m_path): # Skip directories
-            continue
-        tokens_m = preprocess_code(m_path)
-
-        for g_file in os.listdir(github_dir):
-            g_path = os.path.join(github_dir, g_file)
-            if not os.path.isfile(g_path): # Skip directories
-                continue
-            tokens_g = preprocess_code(g_path)
-
-            score = jaccard_similarity(tokens_m, tokens_g)
-            results_mh_vs_gh.append({
-                "source_file": m_file,
-                "compared_file": g_file,
-                "score": round(score * 100, 2),
-                "type": "Mahasiswa vs GitHub"
-            })
-    
-    for r in sorted(results_mh_vs_gh, key=lambda x: x['score'], reverse=True):
-        if r['score'] > 0: # Hanya tampilkan jika ada kemiripan
-            print(f"{r['source_file']} vs {r['compared_file']} → {r['score']}% mirip")
-
-    # Perbandingan Mahasiswa vs Mahasiswa (Penting untuk Turnitin)
-    print("\n--- Mahasiswa vs Mahasiswa ---")
-    results_mh_vs_mh = []
-    mahasiswa_files = [os.path.join(mahasiswa_dir, f) for f in os.listdir(mahasiswa_dir) if os.path.isfile(os.path.join(mahasiswa_dir, f))]
-
-    for i in range(len(mahasiswa_files)):
-        for j in range(i + 1, len(mahasiswa_files)): # Hindari perbandingan dengan diri sendiri dan duplikat
-            file1_path = mahasiswa_files[i]
-            file2_path = mahasiswa_files[j]
-
-            tokens1 = preprocess_code(file1_path)
-            tokens2 = preprocess_code(file2_path)
-
-            score = jaccard_similarity(tokens1, tokens2)
-            results_mh_vs_mh.append({
-                "source_file": os.path.basename(file1_path),
-                "compared_file": os.path.basename(file2_path),
-                "score": round(score * 100, 2),
-                "type": "Mahasiswa vs Mahasiswa"
-            })
-    
-    for r in sorted(results_mh_vs_mh, key=lambda x: x['score'], reverse=True):
-        if r['score'] > 0: # Hanya tampilkan jika ada kemiripan
-            print(f"{r['source_file']} vs {r['compared_file']} → {r['score']}% mirip")
+import sys
+import abc
+import csv
+import json
+import hashlib
+import argparse
 
+from github_scraper import DEFAULT_EXTENSIONS
+from similarity_checker import DEFAULT_HASH_MODE, HASH_MODES
+from fingerprint_store import FingerprintStore
+from fingerprint_index import self_join_by_language, similarity_clusters
+from parallel_engine import fingerprint_paths, compare_corpus_by_language
+from ingest_filter import CONTENT_SAMPLE_BYTES, IngestFilter
+from analysis import scrape_repos, aligned_block_fields, COLLUSION_MIN_SCORE
 
-if __name__ == "__main__":
-    # Buat direktori data jika belum ada
-    os.makedirs("data/mahasiswa", exist_ok=True)
-    os.makedirs("data/github", exist_ok=True)
+OUTPUT_FORMATS = ('csv', 'jsonl', 'parquet')
+RESULT_COLUMNS = (
+    'comparison', 'source_file', 'compared_file', 'score', 'shared',
+    'coverage_source', 'coverage_compared', 'blocks_source', 'blocks_compared', 'block_pairs',
+)
+JSON_COLUMNS = ('blocks_source', 'blocks_compared', 'block_pairs')
+# Jumlah file sumber per batch: hasil ditulis dan checkpoint dicatat setiap batch
+CHECKPOINT_BATCH = 200
+
+
+# --- Input ---
+
+def read_repo_list(path):
+    """
+    Membaca daftar URL repo (satu per baris; baris kosong dan komentar '#' dilewati).
+    """
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def collect_code_files(roots, ingest_filter=None, extensions=DEFAULT_EXTENSIONS):
+    """
+    Mencari file kode di bawah setiap direktori. Mengembalikan list (file_id, path, group):
+    file_id adalah path relatif (diawali nama direktori jika ada lebih dari satu root), group
+    adalah subdirektori teratas (satu subdirektori = satu submission) atau None.
+    `ingest_filter` (IngestFilter) melewati path vendor/build, file terlalu besar, dan file
+    minified, hasil generator atau berentropi tinggi, sama seperti scrape_repo_files.
+    """
+    files = []
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if os.path.splitext(filename)[1].lower() not in extensions:
+                    continue
+                path = os.path.join(dirpath, filename)
+                rel = os.path.relpath(path, root).replace(os.sep, '/')
+                if ingest_filter is not None:
+                    if ingest_filter.check_path(rel, os.path.getsize(path)):
+                        continue
+                    # Ukuran sudah diperiksa check_path; heuristik konten hanya butuh potongan awal file
+                    with open(path, 'rb') as f:
+                        if ingest_filter.check_content(rel, f.read(CONTENT_SAMPLE_BYTES)):
+                            continue
+                file_id = rel if len(roots) == 1 else f"{os.path.basename(os.path.normpath(root))}/{rel}"
+                group = rel.split('/', 1)[0] if '/' in rel else None
+                files.append((file_id, path, group))
+    return files
+
+def gather_side(dirs, repo_list, download_dir, label, ingest_filter):
+    """
+    File satu sisi (mahasiswa atau referensi) dari direktori lokal dan/atau daftar repo yang
+    diunduh ke `download_dir`. Mengembalikan list (file_id, path, group).
+    """
+    files = collect_code_files(dirs or [], ingest_filter)
+    if repo_list:
+        os.makedirs(download_dir, exist_ok=True)
+        groups = {}
+        names = scrape_repos(read_repo_list(repo_list), download_dir, label, groups=groups, ingest_filter=ingest_filter)
+        files.extend((name, os.path.join(download_dir, name), groups.get(name)) for name in names)
+    return files
+
+
+# --- Output ---
+
+class ResultWriter(abc.ABC):
+    """
+    Penulis hasil yang bisa dilanjutkan: position() dicatat di checkpoint setelah setiap batch,
+    dan truncate(position) membuang keluaran batch yang belum tercatat saat run dilanjutkan.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    @abc.abstractmethod
+    def write(self, rows):
+        """Menambahkan satu batch baris hasil ke keluaran."""
+
+    @abc.abstractmethod
+    def position(self):
+        """Posisi keluaran (JSON) setelah semua batch yang sudah ditulis tersimpan di disk."""
+
+    @abc.abstractmethod
+    def truncate(self, position):
+        """Membuang keluaran setelah `position`."""
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def flat(row):
+        return {col: json.dumps(row.get(col)) if col in JSON_COLUMNS else row.get(col) for col in RESULT_COLUMNS}
+
+
+class _FileResultWriter(ResultWriter):
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = open(path, 'a+', encoding='utf-8', newline='')
+
+    def position(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def truncate(self, position):
+        self._file.seek(position)
+        self._file.truncate()
+
+    def close(self):
+        self._file.close()
+
+
+class CsvResultWriter(_FileResultWriter):
+    def write(self, rows):
+        writer = csv.DictWriter(self._file, fieldnames=RESULT_COLUMNS)
+        if self._file.tell() == 0:
+            writer.writeheader()
+        writer.writerows(self.flat(row) for row in rows)
+
+
+class JsonlResultWriter(_FileResultWriter):
+    def write(self, rows):
+        for row in rows:
+            self._file.write(json.dumps({col: row.get(col) for col in RESULT_COLUMNS}) + '\n')
+
+
+class ParquetResultWriter(ResultWriter):
+    """
+    Dataset Parquet: setiap batch ditulis sebagai satu file part-NNNNN.parquet di direktori `path`.
+    Membutuhkan pyarrow (opsional).
+    """
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Format parquet membutuhkan pyarrow (pip install pyarrow).")
+        super().__init__(path)
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        os.makedirs(path, exist_ok=True)
 
-    print("Selamat datang di Code Turnitin Project!")
-    print("Pastikan Anda memiliki file kode mahasiswa di 'data/mahasiswa'.")
-    print("--------------------------------------------------")
+    def _parts(self):
+        return sorted(f for f in os.listdir(self.path) if f.startswith('part-') and f.endswith('.parquet'))
 
-    choice = input("Pilih aksi:\n1. Unduh kode GitHub (Jalankan Scraper)\n2. Periksa Kemiripan Kode\nPilihan Anda (1/2): ")
+    def write(self, rows):
+        if not rows:
+            return
+        flat = [self.flat(row) for row in rows]
+        table = self._pa.table({col: [r[col] for r in flat] for col in RESULT_COLUMNS})
+        part = os.path.join(self.path, f"part-{len(self._parts()):05d}.parquet")
+        self._pq.write_table(table, part + '.tmp')
+        os.replace(part + '.tmp', part)
 
-    if choice == '1':
-        run_github_scraper()
-    elif choice == '2':
-        run_similarity_check()
+    def position(self):
+        return len(self._parts())
+
+    def truncate(self, position):
+        for name in self._parts()[position:]:
+            os.unlink(os.path.join(self.path, name))
+
+WRITERS = {'csv': CsvResultWriter, 'jsonl': JsonlResultWriter, 'parquet': ParquetResultWriter}
+
+def output_format(path, fmt=None):
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    return ext if ext in OUTPUT_FORMATS else 'csv'
+
+
+# --- Checkpoint ---
+
+def input_digest(students, references):
+    """
+    SHA-1 atas daftar file input (file_id, ukuran, mtime) kedua sisi, terurut. Disimpan di
+    parameter checkpoint agar run tidak dilanjutkan setelah file input ditambah, dihapus atau diubah.
+    """
+    digest = hashlib.sha1()
+    for side, files in (('mahasiswa', students), ('referensi', references)):
+        for file_id, path in sorted((file_id, path) for file_id, path, _ in files):
+            st = os.stat(path)
+            digest.update(json.dumps([side, file_id, st.st_size, st.st_mtime_ns]).encode('utf-8') + b'\n')
+    return digest.hexdigest()
+
+
+class ScanCheckpoint:
+    """
+    File JSON-lines: baris header berisi parameter run, lalu satu baris per batch yang selesai
+    ({"sources": [...], "position": ...}) dan per tahap ({"stage": ..., "position": ...}).
+    Baris ditulis setelah keluaran batch di-fsync, jadi batch yang tercatat pasti ada di keluaran.
+    """
+    def __init__(self, path, params, restart=False):
+        self.path = path
+        self.done_sources = set()
+        self.stages = set()
+        self.position = None
+        if restart and os.path.exists(path):
+            os.unlink(path)
+        if os.path.exists(path):
+            self._load(params)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'params': params}) + '\n')
+
+    def _load(self, params):
+        with open(self.path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines or lines[0].get('params') != params:
+            raise SystemExit(f"Checkpoint {self.path} dibuat dengan parameter lain; jalankan dengan --restart.")
+        for entry in lines[1:]:
+            self.done_sources.update(entry.get('sources', ()))
+            if entry.get('stage'):
+                self.stages.add(entry['stage'])
+            self.position = entry.get('position', self.position)
+
+    def record(self, position, sources=(), stage=None):
+        entry = {'sources': list(sources), 'position': position}
+        if stage:
+            entry['stage'] = stage
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.done_sources.update(sources)
+        self.position = position
+
+
+# --- Scan ---
+
+def result_row(comparison, source_file, compared_file, score, shared, blocks_source, blocks_compared, fp_source, fp_compared):
+    row = {
+        'comparison': comparison,
+        'source_file': source_file,
+        'compared_file': compared_file,
+        'score': round(score * 100, 2),
+        'shared': shared,
+        'blocks_source': blocks_source,
+        'blocks_compared': blocks_compared,
+    }
+    row.update(aligned_block_fields(fp_source, fp_compared))
+    return row
+
+def run_scan(args):
+    ingest_filter = None if args.no_ingest_filter else IngestFilter()
+    students = gather_side(args.students, args.student_repos, os.path.join(args.download_dir, 'mahasiswa'),
+                           'mahasiswa', ingest_filter)
+    references = gather_side(args.references, args.reference_repos, os.path.join(args.download_dir, 'github'),
+                             'pembanding', ingest_filter)
+    if not students:
+        raise SystemExit("Tidak ada file mahasiswa yang ditemukan.")
+    if ingest_filter is not None and ingest_filter.skipped:
+        print(f"File yang dilewati: {ingest_filter.report()['by_reason']}")
+    print(f"{len(students)} file mahasiswa, {len(references)} file referensi.")
+
+    fmt = output_format(args.out, args.format)
+    params = {
+        'k': args.k, 'w': args.w, 'hash_mode': args.hash_mode, 'min_score': args.min_score, 'top_k': args.top_k,
+        'compare_students': args.compare_students, 'format': fmt,
+        'inputs': input_digest(students, references),
+    }
+    writer = WRITERS[fmt](args.out)
+    checkpoint = ScanCheckpoint(args.checkpoint or args.out + '.checkpoint', params, args.restart)
+    if checkpoint.position is not None:
+        writer.truncate(checkpoint.position)
+        print(f"Melanjutkan run: {len(checkpoint.done_sources)} file mahasiswa sudah selesai.")
     else:
-        print("Pilihan tidak valid.")
\ No newline at end of file
+        writer.truncate(0)
+
+    # Fingerprint yang sudah ada di store tidak dihitung ulang, jadi tahap ini juga bisa dilanjutkan
+    store = FingerprintStore(args.store, args.store_max_bytes)
+    total = len(students) + len(references)
+    progress_every = max(1, total // 20)
+    def fingerprint_side(files, offset):
+        def progress(done):
+            if (done + offset) % progress_every == 0:
+                print(f"  fingerprint {done + offset}/{total}")
+        return fingerprint_paths([path for _, path, _ in files], args.k, args.w, hash_mode=args.hash_mode,
+                                 workers=args.workers, store=store, progress=progress)
+    print("Membuat fingerprint...")
+    student_fps = dict(zip((fid for fid, _, _ in students), fingerprint_side(students, 0)))
+    reference_fps = dict(zip((fid for fid, _, _ in references), fingerprint_side(references, len(students))))
+    print(f"Fingerprint selesai. Store: {store.stats()}")
+
+    min_score = max(0.0, args.min_score - 0.005) / 100 if args.min_score else 0.0
+    try:
+        if reference_fps:
+            pending = [(fid, fp) for fid, fp in student_fps.items() if fid not in checkpoint.done_sources]
+            print(f"Membandingkan {len(pending)} file mahasiswa dengan {len(reference_fps)} file referensi...")
+            batch_rows, batch_sources = [], []
+            for source_id, matches, _ in compare_corpus_by_language(pending, list(reference_fps.items()), args.workers,
+                                                                    top_k=args.top_k or None, min_score=min_score):
+                for match in matches:
+                    if round(match['score'] * 100, 2) < args.min_score:
+                        break
+                    batch_rows.append(result_row(
+                        'mh_vs_gh', source_id, match['file_id'], match['score'], match['shared'],
+                        match['blocks_query'], match['blocks_match'],
+                        student_fps[source_id], reference_fps[match['file_id']]))
+                batch_sources.append(source_id)
+                if len(batch_sources) >= CHECKPOINT_BATCH:
+                    writer.write(batch_rows)
+                    checkpoint.record(writer.position(), batch_sources)
+                    print(f"  {len(checkpoint.done_sources)}/{len(student_fps)} file mahasiswa selesai")
+                    batch_rows, batch_sources = [], []
+            if batch_sources:
+                writer.write(batch_rows)
+                checkpoint.record(writer.position(), batch_sources)
+
+        if args.compare_students and 'mh_vs_mh' not in checkpoint.stages:
+            print("Membandingkan antar mahasiswa...")
+            groups = {fid: group for fid, _, group in students}
+            pairs = self_join_by_language(list(student_fps.items()), min_score, group_of=groups.get)
+            rows = [result_row('mh_vs_mh', p['file_a'], p['file_b'], p['score'], p['shared'], p['blocks_a'], p['blocks_b'],
+                               student_fps[p['file_a']], student_fps[p['file_b']])
+                    for p in pairs if round(p['score'] * 100, 2) >= args.min_score]
+            writer.write(rows)
+            checkpoint.record(writer.position(), stage='mh_vs_mh')
+            for i, cluster in enumerate(similarity_clusters(pairs, COLLUSION_MIN_SCORE / 100), 1):
+                print(f"Klaster {i} (maks. {round(cluster['max_score'] * 100, 2)}%): {', '.join(cluster['files'])}")
+    finally:
+        writer.close()
+        store.close()
+    print(f"Selesai. Hasil ditulis ke {args.out} ({fmt}).")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', nargs='*', default=[], metavar='DIR', help='direktori kode mahasiswa')
+    parser.add_argument('--student-repos', metavar='FILE', help='file berisi URL repo mahasiswa, satu per baris')
+    parser.add_argument('--references', nargs='*', default=[], metavar='DIR', help='direktori kode referensi')
+    parser.add_argument('--reference-repos', metavar='FILE', help='file berisi URL repo referensi, satu per baris')
+    parser.add_argument('--download-dir', default='data', help='tujuan unduhan repo (default: data)')
+    parser.add_argument('--out', required=True, help='file hasil (.csv/.jsonl) atau direktori .parquet')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, help='default: dari ekstensi --out')
+    parser.add_argument('--checkpoint', help='file checkpoint (default: <out>.checkpoint)')
+    parser.add_argument('--restart', action='store_true', help='abaikan checkpoint lama dan mulai dari awal')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='jumlah proses (0 = semua core)')
+    parser.add_argument('--store', default=os.path.join('data', 'fingerprints.sqlite3'))
+    parser.add_argument('--store-max-bytes', type=int, default=1024 * 1024 * 1024)
+    parser.add_argument('--min-score', type=float, default=0.0, help='skor minimum dalam persen')
+    parser.add_argument('--top-k', type=int, default=0, help='pasangan teratas per file mahasiswa (0 = semua)')
+    parser.add_argument('--compare-students', action='store_true', help='bandingkan juga antar file mahasiswa')
+    parser.add_argument('--no-ingest-filter', action='store_true', help='jangan lewati file vendor/minified/besar')
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('-w', type=int, default=10)
+    parser.add_argument('--hash-mode', choices=HASH_MODES, default=DEFAULT_HASH_MODE)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not (args.students or args.student_repos):
+        build_parser().error("berikan --students atau --student-repos")
+    if not (args.references or args.reference_repos or args.compare_students):
+        build_parser().error("berikan --references/--reference-repos atau --compare-students")
+    run_scan(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
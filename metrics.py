@@ -0,0 +1,374 @@
+import os
+import sys
+import time
+import cProfile
+import threading
+from contextlib import contextmanager
+from collections import Counter as _Tally
+
+
+# Batas bucket histogram durasi (detik); analisis penuh bisa berjalan beberapa menit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+METRIC_PREFIX = 'codeturnitin_'
+# Interval sampling profiler (detik)
+SAMPLING_INTERVAL = 0.005
+PROFILE_MODES = ('cprofile', 'sampling')
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Label harus {labelnames}, diberikan {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, help, labelnames=(), in_summary=True):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.in_summary = in_summary
+        self._values = {}
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self.registry._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _state(self):
+        return dict(self._values)
+
+    def _render(self):
+        lines = self._header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    Histogram kumulatif ala Prometheus. Per label disimpan jumlah observasi per bucket
+    (bucket terakhir = +Inf) diikuti total nilai.
+    """
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help, labelnames=(), in_summary=True, buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labelnames, in_summary)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self.registry._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _state(self):
+        return {key: tuple(state) for key, state in self._values.items()}
+
+    def _render(self):
+        lines = self._header()
+        for key, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', _format_value(bound))])} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {state[-1]!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Gauge yang nilainya diambil dari fungsi saat render (mis. ukuran store); tidak masuk snapshot.
+    `fn()` mengembalikan angka, atau dict {tuple label: angka} jika ada labelnames.
+    """
+    kind = 'gauge'
+
+    def __init__(self, registry, name, help, fn, labelnames=()):
+        super().__init__(registry, name, help, labelnames, in_summary=False)
+        self.fn = fn
+
+    def _state(self):
+        return {}
+
+    def _render(self):
+        try:
+            values = self.fn()
+        except Exception as e:
+            print(f"Gagal membaca gauge {self.name}: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = self._header()
+        for key, value in sorted(values.items()):
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Kumpulan counter, histogram dan gauge dalam satu proses, thread-safe.
+    snapshot()/diff()/merge() memungkinkan delta dari proses worker digabung ke proses utama
+    dan ringkasan satu analisis dihitung sebagai selisih dua snapshot (summary_since).
+    """
+    def __init__(self, prefix=METRIC_PREFIX):
+        self.prefix = prefix
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} sudah terdaftar")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=(), in_summary=True):
+        return self._register(Counter(self, self.prefix + name, help, labelnames, in_summary))
+
+    def histogram(self, name, help, labelnames=(), in_summary=True, buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, self.prefix + name, help, labelnames, in_summary, buckets))
+
+    def gauge(self, name, help, fn, labelnames=()):
+        return self._register(Gauge(self, self.prefix + name, help, fn, labelnames))
+
+    def snapshot(self):
+        """
+        {nama metric: {tuple label: nilai}}; nilai histogram berupa tuple (bucket..., total).
+        """
+        with self._lock:
+            return {name: metric._state() for name, metric in self._metrics.items() if metric.kind != 'gauge'}
+
+    @staticmethod
+    def diff(after, before):
+        delta = {}
+        for name, values in after.items():
+            old = before.get(name, {})
+            changed = {}
+            for key, value in values.items():
+                previous = old.get(key)
+                if isinstance(value, tuple):
+                    value = tuple(a - b for a, b in zip(value, previous)) if previous else value
+                    if any(value):
+                        changed[key] = value
+                elif value - (previous or 0):
+                    changed[key] = value - (previous or 0)
+            if changed:
+                delta[name] = changed
+        return delta
+
+    def merge(self, delta):
+        """
+        Menambahkan delta (hasil diff, mis. dari proses worker) ke metric di registry ini.
+        """
+        with self._lock:
+            for name, values in delta.items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                for key, value in values.items():
+                    if isinstance(value, tuple):
+                        state = metric._values.setdefault(key, [0] * (len(metric.buckets) + 1) + [0.0])
+                        for i, v in enumerate(value):
+                            state[i] += v
+                    else:
+                        metric._values[key] = metric._values.get(key, 0) + value
+
+    @contextmanager
+    def collect(self):
+        """
+        Mengumpulkan delta metric selama blok berjalan ke dict yang di-yield.
+        """
+        delta = {}
+        before = self.snapshot()
+        try:
+            yield delta
+        finally:
+            delta.update(self.diff(self.snapshot(), before))
+
+    def summary_since(self, before):
+        """
+        Ringkasan metric (in_summary) yang berubah sejak snapshot `before`, dalam bentuk JSON:
+        counter -> nilai (atau {label: nilai}), histogram -> {label: {'seconds', 'count'}}.
+        Nama tanpa prefix dan akhiran _total/_seconds.
+        """
+        delta = self.diff(self.snapshot(), before)
+        summary = {}
+        for name, values in delta.items():
+            metric = self._metrics[name]
+            if not metric.in_summary:
+                continue
+            short = name[len(self.prefix):] if name.startswith(self.prefix) else name
+            for suffix in ('_total', '_seconds'):
+                if short.endswith(suffix):
+                    short = short[:-len(suffix)]
+            entries = {}
+            for key, value in values.items():
+                if isinstance(value, tuple):
+                    value = {'seconds': round(value[-1], 6), 'count': int(sum(value[:-1]))}
+                entries[','.join(key)] = value
+            summary[short] = entries.get('', entries) if not metric.labelnames else entries
+        return summary
+
+    def render(self):
+        """
+        Semua metric dalam format teks Prometheus (exposition format 0.0.4).
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            if metric.kind == 'gauge':
+                lines.extend(metric._render())
+                continue
+            with self._lock:
+                lines.extend(metric._render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# --- Metric pipeline ---
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'stage_seconds', 'Durasi tahap pipeline analisis', ('stage',))
+GITHUB_REQUEST_SECONDS = REGISTRY.histogram(
+    'github_request_seconds', 'Latensi request ke GitHub API dan unduhan raw/arsip', ('kind',))
+GITHUB_REQUESTS = REGISTRY.counter(
+    'github_requests_total', 'Request ke GitHub API dan unduhan raw/arsip per status HTTP', ('kind', 'status'))
+DOWNLOADED_BYTES = REGISTRY.counter(
+    'downloaded_bytes_total', 'Byte yang diunduh', ('kind',))
+FILES = REGISTRY.counter(
+    'files_total', 'File per hasil ingest/fingerprint', ('result',))
+TOKENS = REGISTRY.counter('tokens_total', 'Token hasil tokenize_source')
+KGRAMS = REGISTRY.counter('kgrams_total', 'K-gram yang di-hash')
+FINGERPRINTS = REGISTRY.counter('fingerprints_total', 'Fingerprint hasil winnowing')
+PAIRS_COMPARED = REGISTRY.counter(
+    'pairs_compared_total', 'Pasangan file yang dibandingkan (termasuk yang dipangkas indeks)', ('comparison',))
+FINGERPRINT_CACHE = REGISTRY.counter(
+    'fingerprint_cache_total', 'Pencarian fingerprint di cache memori dan FingerprintStore', ('cache', 'result'))
+ANALYSES = REGISTRY.counter('analyses_total', 'Analisis yang dijalankan per status', ('status',), in_summary=False)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_seconds', 'Latensi request HTTP per endpoint', ('endpoint', 'method', 'status'), in_summary=False)
+
+
+def stage(name):
+    """
+    Context manager yang mencatat durasi satu tahap ke STAGE_SECONDS.
+    """
+    return STAGE_SECONDS.time(stage=name)
+
+
+# --- Profiling opsional per analisis/job ---
+
+class SamplingProfiler:
+    """
+    Profiler sampling sederhana: thread latar mengambil stack thread target setiap `interval`
+    detik lewat sys._current_frames(). Hasilnya dalam format "folded stacks" (satu baris per
+    stack: frame;frame;frame jumlah), bisa dibaca flamegraph.pl atau speedscope.
+    """
+    def __init__(self, thread_ids=None, interval=SAMPLING_INTERVAL):
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.samples = _Tally()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile(name, mode=None, directory=None):
+    """
+    Jika `mode` ('cprofile' atau 'sampling') diberikan, blok dijalankan di bawah profiler dan hasilnya
+    ditulis ke `directory`/`name`.prof (cProfile, baca dengan pstats/snakeviz) atau .folded (sampling).
+    cProfile hanya melihat thread pemanggil; sampling melihat semua thread di proses ini.
+    Proses worker (ANALYSIS_WORKERS > 1) tidak ikut diprofil.
+    Yield path file hasil, atau None jika profiling tidak aktif.
+    """
+    if not mode:
+        yield None
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Mode profiling tidak dikenal: {mode}")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.{'prof' if mode == 'cprofile' else 'folded'}")
+    profiler = cProfile.Profile() if mode == 'cprofile' else SamplingProfiler()
+    if mode == 'cprofile':
+        profiler.enable()
+    else:
+        profiler.start()
+    try:
+        yield path
+    finally:
+        if mode == 'cprofile':
+            profiler.disable()
+            profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            profiler.dump(path)
+        print(f"Profil {mode} ditulis ke {path}")
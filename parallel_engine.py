@@ -0,0 +1,182 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+from languages import language_for_path, partition_by_family
+
+from similarity_checker import (
+    FileFingerprint, compute_fingerprint, fingerprint_file, hash_file_content,
+    keywords_key, fingerprint_key, DEFAULT_HASH_MODE,
+)
+from fingerprint_index import FingerprintIndex, compare_corpus
+from batch_scoring import BatchScorer, HAVE_NUMPY
+
+# Di bawah jumlah ini overhead membuat proses lebih besar daripada manfaatnya
+PARALLEL_MIN_FILES = 64
+PARALLEL_MIN_PAIRS = 10_000
+
+
+def resolve_workers(workers):
+    """
+    workers <= 0 berarti pakai semua core.
+    """
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# --- Fingerprinting paralel ---
+
+def _fingerprint_worker(task):
+    path, content_hash, k, w, lang_keywords, hash_mode = task
+    with metrics.REGISTRY.collect() as delta:
+        fingerprint = compute_fingerprint(path, k, w, lang_keywords, content_hash=content_hash, hash_mode=hash_mode)
+    # Dikirim balik sebagai buffer ringkas, bukan set tuple yang di-pickle; metric worker
+    # digabung ke registry proses utama
+    return fingerprint.pack(), delta
+
+
+def fingerprint_paths(paths, k=5, w=10, lang_keywords=None, hash_mode=DEFAULT_HASH_MODE,
+                      workers=1, cache=None, store=None, progress=None):
+    """
+    Menghitung FileFingerprint untuk setiap path (urutan output = urutan input).
+    Cache dan store diperiksa di proses utama; hanya file yang belum ada yang dikirim ke
+    ProcessPoolExecutor. Jalur serial dipakai jika workers <= 1 atau jumlah file kecil.
+    `progress(jumlah_selesai)` dipanggil setiap kali satu file selesai.
+    """
+    workers = resolve_workers(workers)
+    if workers <= 1 or len(paths) < PARALLEL_MIN_FILES:
+        results = []
+        for p in paths:
+            results.append(fingerprint_file(p, k, w, lang_keywords, cache, store, hash_mode))
+            if progress is not None:
+                progress(len(results))
+        return results
+
+    kw_key = keywords_key(lang_keywords)
+    results = [None] * len(paths)
+    pending = [] # (indeks, path, content_hash)
+    for i, path in enumerate(paths):
+        content_hash = hash_file_content(path)
+        key = fingerprint_key(path, content_hash, k, w, kw_key, hash_mode)
+        if cache is not None:
+            if key in cache:
+                metrics.FINGERPRINT_CACHE.inc(cache='memory', result='hit')
+                results[i] = cache[key]
+                continue
+            metrics.FINGERPRINT_CACHE.inc(cache='memory', result='miss')
+        language = language_for_path(path).name
+        stored = store.get(content_hash, k, w, kw_key, hash_mode, language) if store is not None else None
+        if store is not None:
+            metrics.FINGERPRINT_CACHE.inc(cache='store', result='miss' if stored is None else 'hit')
+        if stored is not None:
+            results[i] = FileFingerprint.from_packed(path, content_hash, k, w, kw_key, hash_mode, stored)
+        else:
+            pending.append((i, path, content_hash))
+
+    done = len(paths) - len(pending)
+    if progress is not None:
+        progress(done)
+    if pending:
+        tasks = [(path, content_hash, k, w, lang_keywords, hash_mode) for _, path, content_hash in pending]
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            packed_results = executor.map(_fingerprint_worker, tasks, chunksize=chunksize)
+            for (i, path, content_hash), (packed, delta) in zip(pending, packed_results):
+                metrics.REGISTRY.merge(delta)
+                if store is not None:
+                    store.put(content_hash, k, w, kw_key, packed, hash_mode, language_for_path(path).name)
+                results[i] = FileFingerprint.from_packed(path, content_hash, k, w, kw_key, hash_mode, packed)
+                done += 1
+                if progress is not None:
+                    progress(done)
+
+    if cache is not None:
+        for fingerprint in results:
+            cache[fingerprint.key] = fingerprint
+    return results
+
+
+# --- Perbandingan paralel ---
+
+_worker_index = None
+_worker_scorer = None
+_worker_top_k = None
+_worker_min_score = 0.0
+
+def _unpacked_fingerprints(packed):
+    winnowed, _ = FileFingerprint.unpack(packed)
+    return list(zip(*winnowed[:3]))
+
+def _init_compare_worker(reference_buffers, top_k=None, min_score=0.0):
+    # Setiap proses worker membangun indeks referensinya sendiri satu kali, ditambah BatchScorer
+    # untuk skor top-k seperti compare_corpus di jalur serial
+    global _worker_index, _worker_scorer, _worker_top_k, _worker_min_score
+    _worker_top_k, _worker_min_score = top_k, min_score
+    references = [(file_id, _unpacked_fingerprints(packed)) for file_id, packed in reference_buffers]
+    _worker_index = FingerprintIndex()
+    for file_id, fingerprints in references:
+        _worker_index.add(file_id, fingerprints)
+    _worker_scorer = BatchScorer(references) if HAVE_NUMPY and (top_k or min_score) else None
+
+def _compare_worker(source_chunk):
+    results = []
+    for source_id, packed in source_chunk:
+        fingerprints = _unpacked_fingerprints(packed)
+        if _worker_scorer is not None:
+            scored = _worker_scorer.top_k(fingerprints, _worker_top_k or None, _worker_min_score)
+            results.append((source_id, _worker_index.match_results(fingerprints, scored)))
+        elif _worker_top_k or _worker_min_score:
+            results.append((source_id, _worker_index.query_top_k(fingerprints, _worker_top_k or None, _worker_min_score)))
+        else:
+            results.append((source_id, _worker_index.query(fingerprints)))
+    return results
+
+
+def compare_corpus_parallel(sources, references, workers=1, chunk_size=None, top_k=None, min_score=0.0):
+    """
+    Sama dengan fingerprint_index.compare_corpus, tetapi file sumber dibagi ke beberapa
+    proses worker. Setiap worker menerima buffer fingerprint referensi sekali (lewat initializer)
+    dan, seperti compare_corpus, menghitung skor top-k lewat BatchScorer bila NumPy terpasang.
+    Hasil dan urutannya identik dengan jalur serial.
+    """
+    workers = resolve_workers(workers)
+    if workers <= 1 or len(sources) * len(references) < PARALLEL_MIN_PAIRS or len(sources) < 2:
+        yield from compare_corpus(sources, references, top_k, min_score)
+        return
+
+    reference_buffers = [(file_id, fp.pack()) for file_id, fp in references]
+    source_buffers = [(source_id, fp.pack()) for source_id, fp in sources]
+    if chunk_size is None:
+        chunk_size = max(1, len(source_buffers) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_compare_worker,
+                             initargs=(reference_buffers, top_k, min_score)) as executor:
+        # map() menjaga urutan chunk, sehingga output deterministik
+        for chunk_results in executor.map(_compare_worker, _chunks(source_buffers, chunk_size)):
+            yield from chunk_results
+
+
+def compare_corpus_by_language(sources, references, workers=1, chunk_size=None, top_k=None, min_score=0.0):
+    """
+    compare_corpus_parallel yang dijalankan per keluarga bahasa (languages.py): setiap file sumber
+    hanya dibandingkan dengan referensi dari keluarga yang sama, sehingga pasangan lintas bahasa
+    dipangkas sebelum indeks dibangun.
+    Menghasilkan (source_id, list hasil query, jumlah referensi yang kompatibel), dikelompokkan
+    per keluarga sesuai urutan kemunculan pertama di `sources`.
+    """
+    reference_families = partition_by_family(references, lambda item: item[1].path)
+    for family, family_sources in partition_by_family(sources, lambda item: item[1].path).items():
+        family_references = reference_families.get(family, [])
+        if not family_references:
+            for source_id, _ in family_sources:
+                yield source_id, [], 0
+            continue
+        for source_id, matches in compare_corpus_parallel(family_sources, family_references, workers,
+                                                          chunk_size, top_k, min_score):
+            yield source_id, matches, len(family_references)
@@ -1,91 +1,191 @@
+import io
 import os
 import re
+import sys
+import time
+import struct
 import hashlib
+from array import array
+from bisect import bisect_left, insort
+from collections import deque
 
-# Fungsi preprocess_code akan diubah untuk mengembalikan token dengan informasi baris
-def preprocess_code(path, lang_keywords=None):
+import metrics
+from languages import DEFAULT_KEYWORDS, DIRECTIVE_PARTS, GENERIC, language_for_path, compatible
+
+STRING_TOKEN = 'STRING_LITERAL'
+
+class TokenStream:
     """
-    Membaca file kode, menghapus komentar, menormalisasi, mengganti identifier,
-    dan mengembalikan LIST dari (token, nomor_baris_asli).
+    Representasi token yang ringkas: id token hasil intern_token di array('I') dan nomor baris
+    di array('I') paralel, bukan list tuple. Baris asli tidak disimpan sebagai string; yang
+    disimpan hanya offset byte awal setiap baris di file (line_offsets, diisi bila bytes file
+    tersedia), sehingga teks satu baris bisa dibaca ulang dari file bila perlu.
+    Iterasi tetap menghasilkan (token_id, nomor_baris) agar kompatibel dengan kode lama.
     """
-    lines = []
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            lines = f.readlines() # Baca per baris
-    except Exception as e:
-        print(f"Error membaca file {path}: {e}")
-        return [], [] # Mengembalikan list token kosong dan list baris asli kosong
+    __slots__ = ('ids', 'lines', 'line_offsets')
 
-    # Tokenizer yang menyimpan info baris
-    normalized_tokens_with_lines = []
-    
-    # Daftar keyword bahasa yang umum (sama seperti sebelumnya)
-    default_keywords = set([
-        'if', 'else', 'for', 'while', 'do', 'return', 'function', 'var', 'const', 'let', 'class',
-        'public', 'private', 'protected', 'static', 'void', 'int', 'float', 'double', 'char', 'bool',
-        'true', 'false', 'null', 'this', 'super', 'new', 'import', 'export', 'default', 'try', 'catch', 'finally',
-        'async', 'await', 'break', 'continue', 'switch', 'case', 'default', 'in', 'of', 'typeof', 'instanceof',
-        'def', 'class', 'import', 'from', 'as', 'with', 'open', 'lambda', 'yield', 'None', 'True', 'False',
-        'and', 'or', 'not',
-    ])
-    
-    if lang_keywords:
-        combined_keywords = default_keywords.union(set(lang_keywords))
-    else:
-        combined_keywords = default_keywords
+    def __init__(self, ids=None, lines=None, line_offsets=None):
+        self.ids = ids if ids is not None else array('I')
+        self.lines = lines if lines is not None else array('I')
+        self.line_offsets = line_offsets if line_offsets is not None else array('Q')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return zip(self.ids, self.lines)
+
+    def __getitem__(self, i):
+        return self.ids[i], self.lines[i]
+
+    @property
+    def nbytes(self):
+        return sum(arr.itemsize * len(arr) for arr in (self.ids, self.lines, self.line_offsets))
 
-    # Identifier mapping untuk normalisasi
+    def line_span(self, line):
+        """
+        Rentang byte [start, end) untuk nomor baris (mulai dari 1), termasuk newline-nya.
+        end None berarti sampai akhir file.
+        """
+        start = self.line_offsets[line - 1]
+        end = self.line_offsets[line] if line < len(self.line_offsets) else None
+        return start, end
+
+def line_offsets(data):
+    """
+    Offset byte awal setiap baris di `data` (bytes) sebagai array('Q'); baris 1 selalu di offset 0.
+    """
+    offsets = array('Q', [0])
+    pos = data.find(b'\n')
+    while pos != -1:
+        offsets.append(pos + 1)
+        pos = data.find(b'\n', pos + 1)
+    return offsets
+
+def tokenize_source(text, lang_keywords=None, language=GENERIC):
+    """
+    Tokenizer satu lintasan: menghapus komentar, mengganti string literal dengan STRING_LITERAL,
+    menormalisasi identifier non-keyword menjadi VAR_n (urutan kemunculan pertama),
+    dan langsung menghasilkan TokenStream berisi (token_id, nomor_baris) (lihat intern_token).
+    Tanda baca dilewati, sama seperti tokenisasi sebelumnya yang hanya mengambil [a-zA-Z0-9_]+.
+    Aturan komentar/string dan tabel keyword diambil dari `language` (lihat languages.py);
+    direktif preprocessor C menjadi token '#include', '#define', ... beserta nama header-nya.
+    """
+    keywords = language.keywords.union(lang_keywords) if lang_keywords else language.keywords
+    string_id = intern_token(STRING_TOKEN)
+    identifier_ids = {} # identifier asli -> id token (keyword atau VAR_n)
+    generic_id_counter = 0
+    ids, lines = array('I'), array('I')
+    add_id, add_line = ids.append, lines.append
+    line = 1
+
+    for m in language.lexer.finditer(text):
+        kind = m.lastgroup
+        if kind == 'identifier':
+            word = m.group()
+            token_id = identifier_ids.get(word)
+            if token_id is None:
+                if word in keywords:
+                    token_id = intern_token(word)
+                else:
+                    token_id = intern_token(f'VAR_{generic_id_counter}')
+                    generic_id_counter += 1
+                identifier_ids[word] = token_id
+            add_id(token_id)
+            add_line(line)
+        elif kind == 'newline':
+            line += 1
+        elif kind == 'space' or kind == 'punct':
+            continue
+        elif kind == 'number':
+            add_id(intern_token(m.group()))
+            add_line(line)
+        elif kind == 'string':
+            add_id(string_id)
+            add_line(line)
+            line += m.group().count('\n')
+        elif kind == 'directive':
+            name, header = DIRECTIVE_PARTS.search(m.group()).groups()
+            add_id(intern_token('#' + name))
+            add_line(line)
+            if header:
+                add_id(intern_token(header))
+                add_line(line)
+        else: # comment
+            line += m.group().count('\n')
+    return TokenStream(ids, lines)
+
+def legacy_tokenize_source(text, lang_keywords=None):
+    """
+    Tokenizer lama (sebelum lexer per bahasa), dipakai oleh hash_mode='sha1' agar skornya sama
+    dengan versi lama: per baris, komentar `//` dan `#` dihapus, string satu baris diganti
+    STRING_LITERAL, identifier non-keyword diganti VAR_n lewat re.sub, lalu diambil [a-zA-Z0-9_]+.
+    Keyword-nya DEFAULT_KEYWORDS untuk semua bahasa. Menghasilkan TokenStream seperti tokenize_source.
+    """
+    keywords = DEFAULT_KEYWORDS.union(lang_keywords) if lang_keywords else DEFAULT_KEYWORDS
     identifier_map = {}
     generic_id_counter = 0
-    
-    for line_num, original_line in enumerate(lines, 1): # Mulai dari baris 1
-        processed_line = original_line # Ini akan kita modifikasi
-        
-        # 1. Hapus komentar pada baris ini
+    ids, lines = array('I'), array('I')
+    # Baris dipisah seperti open(..., 'r').readlines() versi lama (universal newline)
+    for line_num, processed_line in enumerate(io.StringIO(text, newline=None), 1):
         processed_line = re.sub(r'//[^\n]*', '', processed_line)
         processed_line = re.sub(r'#[^\n]*', '', processed_line)
+        processed_line = re.sub(r'"[^"]*"', STRING_TOKEN, processed_line)
+        processed_line = re.sub(r"'[^']*'", STRING_TOKEN, processed_line)
+        processed_line = re.sub(r'`[^`]*`', STRING_TOKEN, processed_line)
 
-        # 2. Hapus string literals
-        processed_line = re.sub(r'"[^"]*"', 'STRING_LITERAL', processed_line)
-        processed_line = re.sub(r"'[^']*'", 'STRING_LITERAL', processed_line)
-        processed_line = re.sub(r'`[^`]*`', 'STRING_LITERAL', processed_line)
-
-        # 3. Normalisasi Identifier (sementara hanya pada processed_line)
-        # Kumpulkan semua kata/potensi identifier di baris ini
-        current_line_words = re.findall(r'[a-zA-Z_][a-zA-Z0-9_]*', processed_line)
-        
-        # Buat pemetaan lokal untuk baris ini dan terapkan
         line_replacements = []
-        for word in current_line_words:
-            if word not in combined_keywords: # Jika ini bukan keyword
-                if word not in identifier_map: # Jika identifier baru ditemukan
+        for word in re.findall(r'[a-zA-Z_][a-zA-Z0-9_]*', processed_line):
+            if word not in keywords:
+                if word not in identifier_map:
                     identifier_map[word] = f'VAR_{generic_id_counter}'
                     generic_id_counter += 1
                 line_replacements.append((word, identifier_map[word]))
-        
-        # Terapkan penggantian pada processed_line, urutkan dari yang terpanjang ke terpendek
         line_replacements.sort(key=lambda x: len(x[0]), reverse=True)
-        temp_processed_line = processed_line
         for original_id, generic_id in line_replacements:
-            temp_processed_line = re.sub(r'\b' + re.escape(original_id) + r'\b', generic_id, temp_processed_line)
-        processed_line = temp_processed_line
+            processed_line = re.sub(r'\b' + re.escape(original_id) + r'\b', generic_id, processed_line)
 
-        # 4. Normalisasi spasi
-        processed_line = re.sub(r'[\s]+', ' ', processed_line).strip() # strip() untuk buang spasi di awal/akhir baris
+        for token in re.findall(r'[a-zA-Z0-9_]+', processed_line):
+            ids.append(intern_token(token))
+            lines.append(line_num)
+    return TokenStream(ids, lines)
 
-        # 5. Tokenisasi akhir dan simpan dengan nomor baris
-        if processed_line: # Hanya proses jika baris tidak kosong setelah normalisasi
-            tokens_in_line = re.findall(r'[a-zA-Z0-9_]+', processed_line)
-            for token in tokens_in_line:
-                normalized_tokens_with_lines.append((token, line_num)) # Simpan (token, line_num)
-    
-    # Mengembalikan list token yang dinormalisasi dengan info baris asli, dan list baris asli
-    return normalized_tokens_with_lines, lines
+def read_source_bytes(path):
+    """
+    Membaca isi file sebagai bytes. Mengembalikan None jika gagal.
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError as e:
+        print(f"Error membaca file {path}: {e}")
+        return None
+
+def read_source(path):
+    """
+    Membaca isi file sebagai teks UTF-8. Mengembalikan None jika gagal.
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode("utf-8")
+    except Exception as e:
+        print(f"Error membaca file {path}: {e}")
+        return None
 
+def preprocess_code(path, lang_keywords=None):
+    """
+    Membaca file kode, menghapus komentar, menormalisasi, mengganti identifier,
+    dan mengembalikan TokenStream (id token, nomor baris asli, offset byte setiap baris).
+    Teks token bisa diambil dengan token_string(id); baris asli tidak disimpan sebagai string.
+    """
+    data = read_source_bytes(path)
+    text = _decode_source(path, data) if data is not None else None
+    if text is None:
+        return TokenStream()
+    tokens = tokenize_source(text, lang_keywords, language_for_path(path))
+    tokens.line_offsets = line_offsets(data)
+    return tokens
 
-# Fungsi-fungsi lainnya (generate_k_grams, hash_k_gram, winnowing, calculate_moss_similarity) tetap sama,
-# TAPI generate_k_grams dan winnowing akan perlu diubah agar membawa informasi baris.
-# Mari kita perbaiki mereka secara berurutan.
 
 def generate_k_grams(tokens_with_lines, k):
     """
@@ -109,41 +209,160 @@ def hash_k_gram(k_gram_tuple):
     s = str(k_gram_tuple).encode('utf-8')
     return int(hashlib.sha1(s).hexdigest(), 16)
 
+# --- Rolling hash (Karp-Rabin) untuk k-gram ---
+# Setiap token diinternir menjadi id integer. Hash k-gram dihitung secara bergulir (O(1) per posisi)
+# dari kunci 64-bit per token, tanpa membangun tuple k-gram.
+HASH_MODES = ('rolling', 'sha1')
+DEFAULT_HASH_MODE = 'rolling'
+ROLLING_HASH_BASE = 0x100000001B3 # Basis ganjil (prima FNV-64)
+_MASK64 = (1 << 64) - 1
+
+_token_ids = {}     # token -> id
+_token_strings = [] # id -> token
+_token_keys = []    # id -> kunci 64-bit, stabil antar proses karena diturunkan dari isi token
+
+def intern_token(token):
+    """
+    Mengembalikan id integer untuk token. Id bersifat lokal per proses,
+    tetapi kunci hash-nya (_token_keys) sama di semua proses.
+    """
+    token_id = _token_ids.get(token)
+    if token_id is None:
+        token_id = len(_token_strings)
+        _token_ids[token] = token_id
+        _token_strings.append(token)
+        digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+        _token_keys.append(int.from_bytes(digest, 'little'))
+    return token_id
+
+def token_string(token_id):
+    return _token_strings[token_id]
+
+def rolling_hash_k_grams(token_ids, k):
+    """
+    Menghitung hash Karp-Rabin 64-bit untuk setiap k-gram dari list id token.
+    Output: list hash dengan panjang len(token_ids) - k + 1.
+    """
+    n = len(token_ids)
+    if n < k:
+        return []
+    keys = [_token_keys[t] for t in token_ids]
+    top = pow(ROLLING_HASH_BASE, k - 1, 1 << 64) # Bobot token paling kiri di jendela
+    base = ROLLING_HASH_BASE
+
+    h = 0
+    for i in range(k):
+        h = (h * base + keys[i]) & _MASK64
+    hashes = [h]
+    for i in range(k, n):
+        h = ((h - keys[i - k] * top) * base + keys[i]) & _MASK64
+        hashes.append(h)
+    return hashes
+
+def hash_k_grams(tokens_with_lines, k, hash_mode=DEFAULT_HASH_MODE):
+    """
+    Menghasilkan k-gram yang sudah di-hash dari daftar (token, nomor_baris).
+    hash_mode 'rolling' memakai Karp-Rabin; 'sha1' memakai generate_k_grams + hash_k_gram
+    (skor kompatibel dengan versi sebelumnya).
+    Output: list of (hash_value, start_line, end_line)
+    """
+    if hash_mode == 'sha1':
+        return [(hash_k_gram(kgt), sl, el) for kgt, sl, el in generate_k_grams(tokens_with_lines, k)]
+    if hash_mode != 'rolling':
+        raise ValueError(f"hash_mode tidak dikenal: {hash_mode}")
+
+    hashes = rolling_hash_k_grams([intern_token(t) for t, _ in tokens_with_lines], k)
+    return [(h, tokens_with_lines[i][1], tokens_with_lines[i + k - 1][1]) for i, h in enumerate(hashes)]
+
+def sha1_k_gram_hashes(token_ids, k):
+    """
+    Hash SHA-1 penuh (160 bit, sama dengan hash_k_gram) untuk setiap k-gram dari list id token.
+    """
+    tokens = [token_string(t) for t in token_ids]
+    return [hash_k_gram(tuple(tokens[i:i + k])) for i in range(len(tokens) - k + 1)]
+
+def sha1_key(full_hash):
+    """
+    64 bit teratas hash SHA-1 penuh, nilai fingerprint yang disimpan pada mode 'sha1'.
+    """
+    return full_hash >> 96
+
+def hash_k_gram_arrays(token_ids_with_lines, k, hash_mode=DEFAULT_HASH_MODE):
+    """
+    Versi hash_k_grams untuk output tokenize_source (TokenStream atau iterable (token_id, nomor_baris)), dengan output
+    array paralel yang ringkas: (array('Q') hash, array('I') start_line, array('I') end_line).
+    Pada mode 'sha1' hanya 64 bit teratas SHA-1 yang disimpan (sha1_key); compute_fingerprint
+    menjalankan winnowing atas nilai penuhnya, lihat winnow(keys=...).
+    """
+    n = len(token_ids_with_lines) - k + 1
+    if n <= 0:
+        return array('Q'), array('I'), array('I')
+
+    if isinstance(token_ids_with_lines, TokenStream):
+        ids, lines = token_ids_with_lines.ids, token_ids_with_lines.lines
+    else:
+        ids = array('I', (t for t, _ in token_ids_with_lines))
+        lines = array('I', (line for _, line in token_ids_with_lines))
+
+    if hash_mode == 'sha1':
+        hashes = array('Q', map(sha1_key, sha1_k_gram_hashes(ids, k)))
+    elif hash_mode == 'rolling':
+        hashes = array('Q', rolling_hash_k_grams(ids, k))
+    else:
+        raise ValueError(f"hash_mode tidak dikenal: {hash_mode}")
+
+    return hashes, lines[:n], lines[k - 1:]
+
+def winnow_positions(hashes, w):
+    """
+    Winnowing O(n) dengan deque monoton: untuk setiap jendela berukuran w dipilih
+    posisi hash minimum (paling kanan jika ada yang sama). Posisi yang sama tidak dipancarkan
+    ulang selama masih berada di dalam jendela.
+    Output: array('I') berisi posisi k-gram yang terpilih, terurut naik.
+    """
+    n = len(hashes)
+    positions = array('I')
+    if w <= 0 or n < w:
+        return positions
+
+    window = deque() # Indeks dengan hash yang naik tegas dari depan ke belakang
+    last_selected = -1
+    for i in range(n):
+        h = hashes[i]
+        # Buang kandidat di belakang yang >= h: h lebih kecil atau sama tapi lebih kanan
+        while window and hashes[window[-1]] >= h:
+            window.pop()
+        window.append(i)
+        if window[0] <= i - w:
+            window.popleft()
+        if i >= w - 1:
+            min_pos = window[0]
+            if min_pos != last_selected:
+                positions.append(min_pos)
+                last_selected = min_pos
+    return positions
+
+def winnow(hashes, starts, ends, w, keys=None):
+    """
+    Menerapkan winnowing pada array paralel hasil hash_k_gram_arrays.
+    `keys` (opsional, sejajar dengan hashes) adalah nilai yang dibandingkan saat memilih minimum,
+    mis. hash SHA-1 penuh pada mode 'sha1' agar pilihan (termasuk tie) sama dengan versi lama.
+    Output: (array('Q') hash, array('I') start_line, array('I') end_line, array('I') posisi k-gram)
+    """
+    positions = winnow_positions(hashes if keys is None else keys, w)
+    return (array('Q', (hashes[p] for p in positions)),
+            array('I', (starts[p] for p in positions)),
+            array('I', (ends[p] for p in positions)),
+            positions)
+
 def winnowing(hashed_k_grams_info, w):
     """
     Menerapkan algoritma Winnowing untuk memilih fingerprint.
     Input: list of (hash_value, start_line, end_line)
     Output: set of (hash_value, start_line, end_line) - fingerprints
     """
-    if not hashed_k_grams_info:
-        return set()
-
-    fingerprints = set()
-    n = len(hashed_k_grams_info)
-
-    # Inisialisasi jendela pertama
-    window = hashed_k_grams_info[0:w]
-    if not window:
-        return set()
-
-    # Fungsi pembantu untuk mendapatkan indeks hash minimum di jendela
-    def get_min_hash_index(current_window):
-        min_val = float('inf')
-        min_idx_in_window = -1
-        for i, (hash_val, _, _) in enumerate(current_window):
-            if hash_val <= min_val: # Pilih yang paling kanan jika ada duplikat
-                min_val = hash_val
-                min_idx_in_window = i
-        return min_idx_in_window
-
-    # Iterasi melalui jendela
-    for i in range(n - w + 1):
-        current_window = hashed_k_grams_info[i : i + w]
-        min_idx = get_min_hash_index(current_window)
-        # Tambahkan hash minimum ke set fingerprint, beserta info barisnya
-        fingerprints.add(current_window[min_idx])
-    
-    return fingerprints
+    hashes = [h for h, _, _ in hashed_k_grams_info]
+    return {hashed_k_grams_info[p] for p in winnow_positions(hashes, w)}
 
 def calculate_moss_similarity(fingerprints_a, fingerprints_b):
     """
@@ -187,100 +406,348 @@ def merge_overlapping_segments(segments):
     merged.append(current_merge) # Tambahkan yang terakhir
     return merged
 
-def get_similar_blocks(path_a, path_b, k=5, w=10, lang_keywords=None):
+_PACK_HEADER = struct.Struct('<II') # (jumlah fingerprint, jumlah token)
+
+class FileFingerprint:
     """
-    Mendeteksi blok kode yang mirip antara dua file menggunakan pendekatan MOSS-like.
-    Mengembalikan skor kemiripan dan daftar blok yang mirip.
+    Hasil fingerprinting satu file yang dihitung sekali lalu dipakai ulang
+    untuk semua pasangan perbandingan dalam satu analisis.
+    Menyimpan token (TokenStream), k-gram yang sudah di-hash, dan fingerprint hasil winnowing
+    sebagai array paralel (hash, start_line, end_line, posisi k-gram).
     """
-    
-    tokens_with_lines_a, original_lines_a = preprocess_code(path_a, lang_keywords)
-    tokens_with_lines_b, original_lines_b = preprocess_code(path_b, lang_keywords)
-
-    if not tokens_with_lines_a or not tokens_with_lines_b:
-        return 0.0, [] # No similarity if either is empty
-
-    k_grams_info_a = generate_k_grams(tokens_with_lines_a, k)
-    k_grams_info_b = generate_k_grams(tokens_with_lines_b, k)
-    
-    if not k_grams_info_a or not k_grams_info_b:
-        return 0.0, []
+    def __init__(self, path, content_hash, k, w, keywords_key, hash_mode, tokens_with_lines, hashed_k_grams,
+                 winnowed, token_count):
+        self.path = path
+        self.content_hash = content_hash
+        self.k = k
+        self.w = w
+        self.keywords_key = keywords_key
+        self.hash_mode = hash_mode
+        self.tokens_with_lines = tokens_with_lines
+        self.hashed_k_grams = hashed_k_grams
+        self.fp_hashes, self.fp_starts, self.fp_ends, self.fp_positions = winnowed
+        self.token_count = token_count
+        # Set hash saja, dipakai untuk Jaccard dan pencarian fingerprint bersama
+        self.hashes = frozenset(self.fp_hashes)
+
+    @property
+    def key(self):
+        return fingerprint_key(self.path, self.content_hash, self.k, self.w, self.keywords_key, self.hash_mode)
+
+    @property
+    def language(self):
+        return language_for_path(self.path)
+
+    @property
+    def fingerprints(self):
+        """
+        Fingerprint dalam bentuk list (hash_value, start_line, end_line).
+        """
+        return list(zip(self.fp_hashes, self.fp_starts, self.fp_ends))
+
+    def pack(self):
+        """
+        Mengemas fingerprint menjadi buffer bytes ringkas (little-endian) untuk disimpan
+        atau dikirim antar proses.
+        """
+        parts = [_PACK_HEADER.pack(len(self.fp_hashes), self.token_count)]
+        for arr in (self.fp_hashes, self.fp_starts, self.fp_ends, self.fp_positions):
+            if sys.byteorder != 'little':
+                arr = array(arr.typecode, arr)
+                arr.byteswap()
+            parts.append(arr.tobytes())
+        return b''.join(parts)
+
+    @staticmethod
+    def unpack(data):
+        """
+        Kebalikan dari pack(). Mengembalikan (winnowed, token_count).
+        """
+        count, token_count = _PACK_HEADER.unpack_from(data)
+        offset = _PACK_HEADER.size
+        winnowed = []
+        for typecode in ('Q', 'I', 'I', 'I'):
+            arr = array(typecode)
+            end = offset + count * arr.itemsize
+            arr.frombytes(data[offset:end])
+            if sys.byteorder != 'little':
+                arr.byteswap()
+            winnowed.append(arr)
+            offset = end
+        return tuple(winnowed), token_count
+
+    @classmethod
+    def from_packed(cls, path, content_hash, k, w, kw_key, hash_mode, data):
+        """
+        Membangun FileFingerprint dari buffer pack(). Token dan k-gram tidak tersedia.
+        """
+        winnowed, token_count = cls.unpack(data)
+        return cls(path, content_hash, k, w, kw_key, hash_mode, None, None, winnowed, token_count)
+
+    def without(self, blocked):
+        """
+        Salinan FileFingerprint tanpa fingerprint yang hash-nya ada di `blocked` (mis. boilerplate).
+        Token dan k-gram tetap dipakai bersama dengan objek asal.
+        """
+        keep = [i for i, h in enumerate(self.fp_hashes) if h not in blocked]
+        winnowed = tuple(array(arr.typecode, [arr[i] for i in keep])
+                         for arr in (self.fp_hashes, self.fp_starts, self.fp_ends, self.fp_positions))
+        return FileFingerprint(self.path, self.content_hash, self.k, self.w, self.keywords_key, self.hash_mode,
+                               self.tokens_with_lines, self.hashed_k_grams, winnowed, self.token_count)
+
+
+def keywords_key(lang_keywords):
+    """
+    Bentuk kanonik (hashable) dari set keyword tambahan.
+    """
+    return frozenset(lang_keywords) if lang_keywords else frozenset()
 
-    # Map hash to (k-gram_tuple, start_line, end_line) for easy lookup after winnowing
-    # This also helps to get the original k-gram info back
-    hashed_k_grams_a = []
-    for kgt, sl, el in k_grams_info_a:
-        hashed_k_grams_a.append((hash_k_gram(kgt), sl, el))
+def fingerprint_key(path, content_hash, k, w, kw_key, hash_mode=DEFAULT_HASH_MODE):
+    return (path, content_hash, k, w, kw_key, hash_mode)
 
-    hashed_k_grams_b = []
-    for kgt, sl, el in k_grams_info_b:
-        hashed_k_grams_b.append((hash_k_gram(kgt), sl, el))
+def hash_file_content(path):
+    """
+    Menghitung SHA-1 dari isi file (bytes). Mengembalikan None jika file tidak bisa dibaca.
+    """
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError as e:
+        print(f"Error membaca file {path}: {e}")
+        return None
 
+def _decode_source(path, data):
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        print(f"Error membaca file {path}: {e}")
+        return None
 
-    fingerprints_a = winnowing(hashed_k_grams_a, w)
-    fingerprints_b = winnowing(hashed_k_grams_b, w)
+def compute_fingerprint(path, k=5, w=10, lang_keywords=None, content_hash=None, hash_mode=DEFAULT_HASH_MODE, data=None):
+    """
+    Menjalankan tokenize_source, hashing k-gram dan winnowing untuk satu file.
+    Jika `data` (bytes) diberikan, isi file diambil dari sana dan path hanya dipakai sebagai nama.
+    File dibaca sekali; hash isi dan offset baris dihitung dari bytes yang sama.
+    """
+    clock = time.perf_counter
+    started = clock()
+    if data is None:
+        data = read_source_bytes(path)
+    if content_hash is None and data is not None:
+        content_hash = hashlib.sha1(data).hexdigest()
+    text = _decode_source(path, data) if data is not None else None
+
+    read_done = clock()
+    if text is None:
+        tokens = TokenStream()
+    elif hash_mode == 'sha1':
+        # Mode kompatibilitas: tokenizer dan hash versi lama, skor sama dengan sebelum rolling hash
+        tokens = legacy_tokenize_source(text, lang_keywords)
+    else:
+        tokens = tokenize_source(text, lang_keywords, language_for_path(path))
+    if text is not None:
+        tokens.line_offsets = line_offsets(data)
+    tokenize_done = clock()
+    if hash_mode == 'sha1':
+        full_hashes = sha1_k_gram_hashes(tokens.ids, k)
+        n = len(full_hashes)
+        hashed_k_grams = (array('Q', map(sha1_key, full_hashes)), tokens.lines[:n], tokens.lines[k - 1:])
+        hash_done = clock()
+        winnowed = winnow(*hashed_k_grams, w, keys=full_hashes)
+    else:
+        hashed_k_grams = hash_k_gram_arrays(tokens, k, hash_mode)
+        hash_done = clock()
+        winnowed = winnow(*hashed_k_grams, w)
+
+    observe = metrics.STAGE_SECONDS.observe
+    observe(read_done - started, stage='read')
+    observe(tokenize_done - read_done, stage='tokenize')
+    observe(hash_done - tokenize_done, stage='hash')
+    observe(clock() - hash_done, stage='winnow')
+    metrics.FILES.inc(result='fingerprinted' if text is not None else 'unreadable')
+    metrics.TOKENS.inc(len(tokens))
+    metrics.KGRAMS.inc(len(hashed_k_grams[0]))
+    metrics.FINGERPRINTS.inc(len(winnowed[0]))
+
+    return FileFingerprint(path, content_hash, k, w, keywords_key(lang_keywords), hash_mode,
+                           tokens, hashed_k_grams, winnowed, len(tokens))
+
+def fingerprint_file(path, k=5, w=10, lang_keywords=None, cache=None, store=None, hash_mode=DEFAULT_HASH_MODE, data=None):
+    """
+    Mengembalikan FileFingerprint untuk path. Jika `cache` (dict) diberikan, hasil
+    dipakai ulang selama path, hash isi file, k, w, set keyword dan hash_mode sama.
+    Jika `store` (FingerprintStore) diberikan, fingerprint dimuat dari disk bila sudah ada
+    dan disimpan ke sana setelah dihitung.
+    Jika `data` (bytes) diberikan, isi file tidak dibaca ulang dari disk.
+    """
+    if cache is None and store is None:
+        return compute_fingerprint(path, k, w, lang_keywords, hash_mode=hash_mode, data=data)
+
+    content_hash = hashlib.sha1(data).hexdigest() if data is not None else hash_file_content(path)
+    kw_key = keywords_key(lang_keywords)
+    key = fingerprint_key(path, content_hash, k, w, kw_key, hash_mode)
+    if cache is not None:
+        if key in cache:
+            metrics.FINGERPRINT_CACHE.inc(cache='memory', result='hit')
+            return cache[key]
+        metrics.FINGERPRINT_CACHE.inc(cache='memory', result='miss')
+
+    fingerprint = None
+    language = language_for_path(path).name
+    if store is not None:
+        stored = store.get(content_hash, k, w, kw_key, hash_mode, language)
+        metrics.FINGERPRINT_CACHE.inc(cache='store', result='miss' if stored is None else 'hit')
+        if stored is not None:
+            # Dari store hanya fingerprint yang tersedia; token dan k-gram tidak disimpan
+            fingerprint = FileFingerprint.from_packed(path, content_hash, k, w, kw_key, hash_mode, stored)
+
+    if fingerprint is None:
+        fingerprint = compute_fingerprint(path, k, w, lang_keywords, content_hash=content_hash,
+                                          hash_mode=hash_mode, data=data)
+        if store is not None:
+            store.put(content_hash, k, w, kw_key, fingerprint.pack(), hash_mode, language)
+
+    if cache is not None:
+        cache[key] = fingerprint
+    return fingerprint
+
+def compare_fingerprints(fp_a, fp_b):
+    """
+    Membandingkan dua FileFingerprint yang sudah dihitung sebelumnya.
+    Hanya melakukan operasi set, tanpa tokenisasi ulang.
+    Mengembalikan (skor_kemiripan, blok_mirip_a, blok_mirip_b).
+    """
+    common_hashes = fp_a.hashes & fp_b.hashes
+    union_size = len(fp_a.hashes) + len(fp_b.hashes) - len(common_hashes)
+    if not union_size:
+        return 0.0, [], []
+    overall_similarity = len(common_hashes) / union_size
 
-    # Calculate overall similarity score
-    overall_similarity = calculate_moss_similarity(fingerprints_a, fingerprints_b)
+    if not common_hashes:
+        return overall_similarity, [], []
 
-    # Find common fingerprints and map them back to original line numbers
-    common_fingerprints_hashes = {fp[0] for fp in fingerprints_a}.intersection({fp[0] for fp in fingerprints_b})
-    
-    # Store all segments from common fingerprints
-    segments_a = []
-    segments_b = []
-
-    for fp_hash, start_line, end_line in fingerprints_a:
-        if fp_hash in common_fingerprints_hashes:
-            segments_a.append({'start': start_line, 'end': end_line})
-
-    for fp_hash, start_line, end_line in fingerprints_b:
-        if fp_hash in common_fingerprints_hashes:
-            segments_b.append({'start': start_line, 'end': end_line})
-
-    # Merge overlapping segments to get consolidated blocks
-    merged_blocks_a = merge_overlapping_segments(segments_a)
-    merged_blocks_b = merge_overlapping_segments(segments_b)
-
-    # For simplicity, we assume one-to-one mapping of merged blocks.
-    # A more advanced approach would try to align blocks more accurately.
-    # For initial implementation, we can just return blocks from A and B that are common.
-    # The output format for frontend could be simplified to a list of blocks per file.
-    
-    # For now, let's just return the merged blocks for A and B.
-    # This doesn't directly tell you which block in A maps to which in B,
-    # but tells you *where* similar code exists in each file.
-    
-    # A more practical output would be a list of dicts:
-    # [{'fileA_lines': [start_A, end_A], 'fileB_lines': [start_B, end_B]}]
-    # This mapping is complex to get precisely from Winnowing directly.
-    # For simplicity, let's return common fingerprints as raw data for now,
-    # and Frontend can highlight all lines touched by these common fingerprints.
-    
-    # Let's refine the return value for `get_similar_blocks`
-    # Return a list of {"fileA": [start_line_A, end_line_A], "fileB": [start_line_B, end_line_B]}
-    # For MOSS, often it's about what percentage of A is similar to B, and vice-versa.
+    # Kumpulkan rentang baris dari fingerprint yang hash-nya sama di kedua file, lalu gabungkan.
+    # Ini belum memetakan blok di A ke blok di B, hanya *di mana* kode mirip berada pada tiap file.
+    similar_ranges_a = [{'start': sl, 'end': el}
+                        for h, sl, el in zip(fp_a.fp_hashes, fp_a.fp_starts, fp_a.fp_ends) if h in common_hashes]
+    similar_ranges_b = [{'start': sl, 'end': el}
+                        for h, sl, el in zip(fp_b.fp_hashes, fp_b.fp_starts, fp_b.fp_ends) if h in common_hashes]
 
-    # Simpler approach: Collect all common k-gram ranges from A and B, then merge them.
-    # The frontend will then highlight these merged ranges.
-    
-    final_similar_ranges_a = []
-    final_similar_ranges_b = []
+    merged_ranges_a = merge_overlapping_segments(similar_ranges_a)
+    merged_ranges_b = merge_overlapping_segments(similar_ranges_b)
 
-    # Iterate through fingerprints of A and B, if their hash is common, add their line range
-    for fp_hash_a, start_line_a, end_line_a in fingerprints_a:
-        if fp_hash_a in common_fingerprints_hashes:
-            final_similar_ranges_a.append({'start': start_line_a, 'end': end_line_a})
+    return overall_similarity, merged_ranges_a, merged_ranges_b
 
-    for fp_hash_b, start_line_b, end_line_b in fingerprints_b:
-        if fp_hash_b in common_fingerprints_hashes:
-            final_similar_ranges_b.append({'start': start_line_b, 'end': end_line_b})
+def _diagonal_chains(fp_a, fp_b, max_gap):
+    """
+    Merangkai fingerprint bersama menjadi rantai di sepanjang diagonal (posisi_b - posisi_a).
+    Fingerprint A dibaca urut posisi, jadi setiap kecocokan hanya disambung ke ujung rantai di
+    diagonal yang sama bila jaraknya <= max_gap k-gram. Biaya O(jumlah kecocokan).
+    Rantai: [pos_a_awal, pos_a_akhir, pos_b_awal, pos_b_akhir, idx_a_awal, idx_a_akhir,
+             idx_b_awal, idx_b_akhir, jumlah_fingerprint]
+    """
+    occurrences_b = {}
+    for j, h in enumerate(fp_b.fp_hashes):
+        occurrences_b.setdefault(h, []).append(j)
+
+    chains = []
+    open_chains = {}    # diagonal -> indeks rantai yang masih bisa diperpanjang
+    for i, h in enumerate(fp_a.fp_hashes):
+        js = occurrences_b.get(h)
+        if not js:
+            continue
+        pos_a = fp_a.fp_positions[i]
+        for j in js:
+            pos_b = fp_b.fp_positions[j]
+            diagonal = pos_b - pos_a
+            c = open_chains.get(diagonal)
+            if c is not None and pos_a - chains[c][1] <= max_gap:
+                chain = chains[c]
+                chain[1], chain[3], chain[5], chain[7] = pos_a, pos_b, i, j
+                chain[8] += 1
+            else:
+                open_chains[diagonal] = len(chains)
+                chains.append([pos_a, pos_a, pos_b, pos_b, i, i, j, j, 1])
+    return chains
+
+def _overlaps(taken, start, end):
+    """
+    taken: list interval (start, end) yang terurut dan saling lepas.
+    """
+    i = bisect_left(taken, (start,))
+    if i < len(taken) and taken[i][0] <= end:
+        return True
+    return i > 0 and taken[i - 1][1] >= start
 
-    # Merge these ranges
-    merged_ranges_a = merge_overlapping_segments(final_similar_ranges_a)
-    merged_ranges_b = merge_overlapping_segments(final_similar_ranges_b)
+def align_blocks(fp_a, fp_b, max_gap=None, min_fingerprints=1):
+    """
+    Memasangkan blok mirip di A dengan blok padanannya di B ("A baris 10-40 <-> B baris 3-33").
+    Fingerprint bersama dirangkai per diagonal posisi k-gram (lihat _diagonal_chains), lalu
+    rantai dipilih secara greedy dari yang terpanjang (gaya greedy string tiling): rantai yang
+    rentang tokennya menimpa tile yang sudah dipilih di A atau di B dilewati. Tanpa diff kuadratik:
+    O(m log m) untuk m kecocokan.
+    Cakupan dihitung dari jumlah token yang tercakup tile dibagi jumlah token file, sehingga
+    asimetris: coverage_a adalah persentase isi A yang ditemukan di B, dan sebaliknya.
+    Mengembalikan {'pairs': [...], 'coverage_a': float, 'coverage_b': float}; pairs terurut
+    menurut baris awal di A.
+    """
+    if max_gap is None:
+        # Winnowing menjamin satu fingerprint per jendela w, jadi salinan utuh tidak punya celah > w
+        max_gap = fp_a.w + fp_a.k
+    k = fp_a.k
+
+    chains = _diagonal_chains(fp_a, fp_b, max_gap)
+    chains.sort(key=lambda c: (-(c[1] - c[0]), -c[8], c[0], c[2]))
+
+    taken_a, taken_b, pairs = [], [], []
+    tokens_a = tokens_b = 0
+    for pos_a0, pos_a1, pos_b0, pos_b1, ia0, ia1, ib0, ib1, count in chains:
+        if count < min_fingerprints:
+            continue
+        span_a = (pos_a0, pos_a1 + k - 1)
+        span_b = (pos_b0, pos_b1 + k - 1)
+        if _overlaps(taken_a, *span_a) or _overlaps(taken_b, *span_b):
+            continue
+        insort(taken_a, span_a)
+        insort(taken_b, span_b)
+        tokens = pos_a1 - pos_a0 + k
+        tokens_a += tokens
+        tokens_b += tokens
+        pairs.append({
+            'a': {'start': fp_a.fp_starts[ia0], 'end': fp_a.fp_ends[ia1]},
+            'b': {'start': fp_b.fp_starts[ib0], 'end': fp_b.fp_ends[ib1]},
+            'tokens': tokens,
+            'fingerprints': count,
+            'coverage_a': tokens / fp_a.token_count if fp_a.token_count else 0.0,
+            'coverage_b': tokens / fp_b.token_count if fp_b.token_count else 0.0,
+        })
+
+    pairs.sort(key=lambda p: (p['a']['start'], p['b']['start']))
+    return {
+        'pairs': pairs,
+        'coverage_a': min(1.0, tokens_a / fp_a.token_count) if fp_a.token_count else 0.0,
+        'coverage_b': min(1.0, tokens_b / fp_b.token_count) if fp_b.token_count else 0.0,
+    }
 
-    # Return the overall similarity score and the merged line ranges for each file
-    return overall_similarity, merged_ranges_a, merged_ranges_b
+def get_similar_blocks(path_a, path_b, k=5, w=10, lang_keywords=None, cache=None, store=None, hash_mode=DEFAULT_HASH_MODE,
+                       fingerprint_filter=None):
+    """
+    Mendeteksi blok kode yang mirip antara dua file menggunakan pendekatan MOSS-like.
+    Mengembalikan skor kemiripan dan daftar blok yang mirip pada tiap file.
+    Berikan `cache` (dict) yang sama antar pemanggilan agar tiap file hanya diproses sekali,
+    dan `store` (FingerprintStore) agar fingerprint bertahan antar analisis.
+    hash_mode='sha1' memakai tokenizer dan hash SHA-1 versi lama, sehingga skornya sama dengan
+    versi sebelum rolling hash; pasangan lintas keluarga bahasa tetap tidak dibandingkan.
+    `fingerprint_filter` (FingerprintFilter) membuang fingerprint boilerplate sebelum dibandingkan.
+    """
+    if not compatible(path_a, path_b):
+        # Bahasa yang berbeda keluarga tidak dibandingkan
+        return 0.0, [], []
+    fp_a = fingerprint_file(path_a, k, w, lang_keywords, cache, store, hash_mode)
+    fp_b = fingerprint_file(path_b, k, w, lang_keywords, cache, store, hash_mode)
+    if fingerprint_filter is not None:
+        fp_a, fp_b = fingerprint_filter.apply(fp_a), fingerprint_filter.apply(fp_b)
+    return compare_fingerprints(fp_a, fp_b)
 
 
 # Untuk pengujian mandiri (tetap sama, tapi output lebih banyak)
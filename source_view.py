@@ -0,0 +1,109 @@
+import os
+import mmap
+import threading
+from collections import OrderedDict
+
+from similarity_checker import line_offsets
+
+
+# File lebih besar dari ini tidak ditampilkan sama sekali di viewer
+MAX_VIEW_BYTES = 64 * 1024 * 1024
+# Baris yang lebih panjang dari ini (mis. file minified) dipotong
+MAX_LINE_BYTES = 2000
+# Jumlah baris maksimum per request range
+MAX_RANGE_LINES = 2000
+# Batas /get_code_content lama yang mengirim seluruh isi file sekaligus
+MAX_FULL_CONTENT_BYTES = 2 * 1024 * 1024
+# Jumlah indeks baris yang disimpan di memori
+LINE_INDEX_CACHE_SIZE = 64
+
+
+class SourceTooLarge(Exception):
+    def __init__(self, path, size, limit):
+        super().__init__(f"File {os.path.basename(path)} terlalu besar untuk ditampilkan ({size} byte, batas {limit} byte).")
+        self.size = size
+        self.limit = limit
+
+
+class LineIndex:
+    """
+    Indeks offset byte setiap baris satu file, dibangun sekali lewat mmap tanpa membaca file ke
+    memori Python. Baris dibaca per rentang (read_lines), juga lewat mmap.
+    Versi file dikenali dari (ukuran, mtime); etag berubah bila file berubah.
+    """
+    __slots__ = ('path', 'size', 'mtime_ns', 'offsets')
+
+    def __init__(self, path, size, mtime_ns, offsets):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, path, max_bytes=MAX_VIEW_BYTES):
+        st = os.stat(path)
+        if st.st_size > max_bytes:
+            raise SourceTooLarge(path, st.st_size, max_bytes)
+        if st.st_size == 0:
+            return cls(path, 0, st.st_mtime_ns, line_offsets(b''))
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offsets = line_offsets(mm)
+        return cls(path, st.st_size, st.st_mtime_ns, offsets)
+
+    @property
+    def line_count(self):
+        # Newline di akhir file tidak membuka baris baru
+        if self.size and self.offsets[-1] == self.size:
+            return len(self.offsets) - 1
+        return len(self.offsets)
+
+    @property
+    def etag(self):
+        return f"{self.size:x}-{self.mtime_ns:x}"
+
+    def read_lines(self, start, end, max_line_bytes=MAX_LINE_BYTES):
+        """
+        Membaca baris start..end (inklusif, mulai dari 1).
+        Mengembalikan (list teks baris, list nomor baris yang dipotong karena terlalu panjang).
+        """
+        start = max(1, start)
+        end = min(end, self.line_count)
+        if self.size == 0 or end < start:
+            return [], []
+        lines, truncated = [], []
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in range(start, end + 1):
+                begin = self.offsets[line - 1]
+                stop = self.offsets[line] if line < len(self.offsets) else self.size
+                raw = mm[begin:min(stop, begin + max_line_bytes + 2)].rstrip(b'\r\n')
+                if len(raw) > max_line_bytes:
+                    raw = raw[:max_line_bytes]
+                    truncated.append(line)
+                lines.append(raw.decode('utf-8', errors='replace'))
+        return lines, truncated
+
+
+class LineIndexCache:
+    """
+    Cache LRU LineIndex per path. Entri dibangun ulang bila ukuran atau mtime file berubah.
+    """
+    def __init__(self, max_entries=LINE_INDEX_CACHE_SIZE, max_bytes=MAX_VIEW_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        st = os.stat(path)
+        with self._lock:
+            index = self._entries.get(path)
+            if index is not None and index.size == st.st_size and index.mtime_ns == st.st_mtime_ns:
+                self._entries.move_to_end(path)
+                return index
+        index = LineIndex.build(path, self.max_bytes)
+        with self._lock:
+            self._entries[path] = index
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
@@ -0,0 +1,72 @@
+"""
+Server HTTP lokal (http.server di 127.0.0.1, port acak) sebagai pengganti GitHub API, raw
+content dan host arsip di pengujian. Setiap request diteruskan ke `handler(request)` yang
+mengembalikan (status, headers, body); body boleh berupa list potongan bytes yang dikirim
+satu per satu dengan jeda `chunk_delay`, untuk mensimulasikan unduhan lambat.
+"""
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class LocalServer:
+    def __init__(self, handler, chunk_delay=0.0):
+        self.handler = handler
+        self.chunk_delay = chunk_delay
+        self.requests = []          # path setiap request, sesuai urutan kedatangan
+        self.active = 0             # request yang sedang dilayani (termasuk pengiriman body)
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._request_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def hits(self, path):
+        with self._lock:
+            return sum(1 for p in self.requests if p == path)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
+
+    def _request_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append(self.path)
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    status, headers, body = server.handler(self)
+                    chunks = body if isinstance(body, list) else [body]
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Length', str(sum(len(c) for c in chunks)))
+                    self.end_headers()
+                    for i, chunk in enumerate(chunks):
+                        if i and server.chunk_delay:
+                            threading.Event().wait(server.chunk_delay)
+                        self.wfile.write(chunk)
+                        self.wfile.flush()
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+        return Handler
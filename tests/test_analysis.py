@@ -0,0 +1,95 @@
+"""
+Pengujian run_analysis dengan scraping inkremental terhadap server HTTP lokal: file dan manifest
+dari repo yang tidak diminta lagi harus dihapus dan tidak ikut dibandingkan.
+
+Jalankan dari root repo:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import github_scraper
+from analysis import run_analysis
+from github_scraper import MANIFEST_DIR
+from tests.local_server import LocalServer
+
+CODE = b'def total(items):\n    s = 0\n    for x in items:\n        s += x\n    return s\n'
+REPOS = {
+    'alice/tugas': {'main.py': CODE, 'util.py': b'def helper(a, b):\n    return a * b + 1\n'},
+    'bob/tugas': {'main.py': CODE},
+    'carol/tugas': {'main.py': CODE + b'\nprint(total([1, 2]))\n'},
+}
+
+
+def handler(req):
+    parts = req.path.split('?')[0].strip('/').split('/')
+    if parts[0] == 'repos' and len(parts) == 3 and '/'.join(parts[1:3]) in REPOS:
+        return 200, {}, b'{"default_branch": "main"}'
+    if parts[0] == 'repos' and parts[3:5] == ['git', 'trees']:
+        files = REPOS.get('/'.join(parts[1:3]))
+        if files is None:
+            return 404, {}, b''
+        tree = [{'path': path, 'type': 'blob', 'sha': f'sha-{len(data)}-{path}', 'size': len(data)}
+                for path, data in files.items()]
+        return 200, {}, json.dumps({'tree': tree}).encode()
+    files = REPOS.get('/'.join(parts[:2]), {})
+    if len(parts) == 4 and parts[2] == 'main' and parts[3] in files:
+        return 200, {}, files[parts[3]]
+    return 404, {}, b''
+
+
+class IncrementalAnalysisTest(unittest.TestCase):
+    def setUp(self):
+        github_scraper._host_semaphores.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.student_dir = os.path.join(self.tmp.name, 'mahasiswa')
+        self.github_dir = os.path.join(self.tmp.name, 'github')
+        os.makedirs(self.student_dir)
+        os.makedirs(self.github_dir)
+
+    def analyse(self, students, references=()):
+        urls = [f'https://github.com/{repo}' for repo in students]
+        reference_urls = [f'https://github.com/{repo}' for repo in references]
+        return run_analysis(urls, reference_urls, self.student_dir, self.github_dir, k=3, w=4, incremental=True)
+
+    def listing(self, directory):
+        files = sorted(f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f)))
+        manifests = sorted(os.listdir(os.path.join(directory, MANIFEST_DIR)))
+        return files, manifests
+
+    def compared_files(self, result):
+        rows = result['mh_vs_gh_results'] + result.get('mh_vs_mh_results', [])
+        return {name for row in rows for name in (row['source_file'], row['compared_file'])}
+
+    def test_removed_student_is_pruned(self):
+        with LocalServer(handler) as server, \
+                mock.patch.object(github_scraper, 'GITHUB_RAW_URL', server.url), \
+                mock.patch.object(github_scraper, '_client', github_scraper.GitHubClient(api_url=server.url)):
+            first = self.analyse(['alice/tugas', 'bob/tugas', 'carol/tugas'], ['carol/tugas'])
+            self.assertIn('bob_tugas_main.py', self.compared_files(first))
+
+            second = self.analyse(['alice/tugas', 'carol/tugas'])
+            hits = server.hits('/alice/tugas/main/main.py')
+
+        self.assertEqual(self.listing(self.student_dir), (
+            ['alice_tugas_main.py', 'alice_tugas_util.py', 'carol_tugas_main.py'],
+            ['alice_tugas.json', 'carol_tugas.json'],
+        ))
+        # Tanpa repo pembanding, folder github ikut dikosongkan seperti clear_directory
+        self.assertEqual(self.listing(self.github_dir), ([], []))
+        compared = self.compared_files(second)
+        self.assertTrue(compared)
+        self.assertFalse(any(name.startswith('bob_') for name in compared))
+        # File repo yang masih diminta tidak diunduh ulang
+        self.assertEqual(hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
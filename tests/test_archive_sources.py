@@ -0,0 +1,121 @@
+"""
+Pengujian sumber arsip pada mode ingest 'archive': arsip yang disajikan server HTTP lokal,
+pembatasan URL langsung (allowlist host, alamat non-publik, tujuan redirect) dan path lokal.
+
+Jalankan dari root repo:
+    python -m unittest discover tests
+"""
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis import AnalysisError, ArchiveUrlPolicy, ingest_archives, resolve_archive_source, run_analysis
+from similarity_checker import fingerprint_file
+from tests.local_server import LocalServer
+
+SOURCE = b'''def total(items):
+    result = 0
+    for item in items:
+        if item > 0:
+            result += item * 2
+    return result
+
+def average(items):
+    count = len(items)
+    return total(items) / count if count else 0
+'''
+
+
+def make_tarball(files, top='repo-main'):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(f"{top}/{name}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+class ArchiveSourceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.archives = {
+            '/student.tar.gz': make_tarball({'src/stats.py': SOURCE, 'README.md': b'# tugas'}),
+            '/reference.tar.gz': make_tarball({'lib/stats.py': SOURCE, 'lib/other.py': b'print("halo")\n'}),
+        }
+
+    def handler(self, req):
+        if req.path == '/redirect.tar.gz':
+            port = req.server.server_address[1]
+            return 302, {'Location': f"http://localhost:{port}/student.tar.gz"}, b''
+        if req.path in self.archives:
+            return 200, {'Content-Type': 'application/gzip'}, self.archives[req.path]
+        return 404, {}, b''
+
+    def directory(self, name):
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def ingest(self, url, policy):
+        return ingest_archives([url], self.directory('out'), 'uji',
+                               lambda path, data: fingerprint_file(path, data=data), url_policy=policy)
+
+    def test_locally_served_archive(self):
+        policy = ArchiveUrlPolicy(hosts=('127.0.0.1',), allow_private=True)
+        with LocalServer(self.handler) as server:
+            fingerprints = self.ingest(f"{server.url}/student.tar.gz", policy)
+        self.assertEqual([os.path.basename(fp.path) for fp in fingerprints], ['student_repo-main_src_stats.py'])
+
+    def test_host_not_in_allowlist(self):
+        with LocalServer(self.handler) as server:
+            with self.assertRaises(AnalysisError):
+                self.ingest(f"{server.url}/student.tar.gz", ArchiveUrlPolicy())
+        self.assertEqual(server.requests, [])
+
+    def test_private_address_rejected(self):
+        with LocalServer(self.handler) as server:
+            with self.assertRaises(AnalysisError) as ctx:
+                self.ingest(f"{server.url}/student.tar.gz", ArchiveUrlPolicy(hosts=('127.0.0.1',)))
+        self.assertIn('non-publik', ctx.exception.message)
+        self.assertEqual(server.requests, [])
+
+    def test_redirect_target_is_checked(self):
+        policy = ArchiveUrlPolicy(hosts=('127.0.0.1',), allow_private=True)
+        with LocalServer(self.handler) as server:
+            with self.assertRaises(AnalysisError):
+                self.ingest(f"{server.url}/redirect.tar.gz", policy)
+        self.assertEqual(server.requests, ['/redirect.tar.gz'])
+
+    def test_non_http_scheme_rejected(self):
+        policy = ArchiveUrlPolicy(hosts=('127.0.0.1',), allow_private=True)
+        with self.assertRaises(AnalysisError):
+            policy.check('ftp://127.0.0.1/a.tar.gz')
+
+    def test_local_path_outside_root(self):
+        root = self.directory('corpora')
+        with self.assertRaises(AnalysisError):
+            resolve_archive_source('../out', root)
+
+    def test_run_analysis_with_served_archives(self):
+        policy = ArchiveUrlPolicy(hosts=('127.0.0.1',), allow_private=True)
+        with LocalServer(self.handler) as server:
+            result = run_analysis(
+                [f"{server.url}/student.tar.gz"], [f"{server.url}/reference.tar.gz"],
+                self.directory('mahasiswa'), self.directory('github'),
+                ingest_mode='archive', compare_students=False, archive_url_policy=policy,
+            )
+        rows = result['mh_vs_gh_results']
+        self.assertEqual(rows[0]['source_file'], 'student_repo-main_src_stats.py')
+        self.assertEqual(rows[0]['compared_file'], 'reference_repo-main_lib_stats.py')
+        self.assertEqual(rows[0]['score'], 100.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
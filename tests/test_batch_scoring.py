@@ -0,0 +1,124 @@
+"""
+Pengujian BatchScorer: fallback Python murni (selalu dijalankan) dan jalur NumPy (dilewati jika
+numpy tidak terpasang) harus memberi K teratas yang sama dengan FingerprintIndex.query_top_k.
+Karena numpy opsional, compare_corpus dan worker compare_corpus_parallel juga diuji dengan
+HAVE_NUMPY=False.
+
+Jalankan dari root repo:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import random
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_scoring
+import fingerprint_index
+import parallel_engine
+from batch_scoring import BatchScorer, HAVE_NUMPY
+from fingerprint_index import FingerprintIndex, compare_corpus
+from tests.test_fingerprint_index import copied_corpus, file_fingerprint, random_index
+
+OPTIONS = [(None, 0.0), (1, 0.0), (3, 0.0), (1000, 0.0), (None, 0.2), (5, 0.1), (2, 1 / 3)]
+
+
+def corpora():
+    rng = random.Random(25)
+    for _ in range(5):
+        yield random_index(rng, rng.randrange(1, 50))
+        yield copied_corpus(rng, files=40)
+
+
+def index_top_k(index, query, k, min_score):
+    return [(r['file_id'], r['score'], r['shared']) for r in index.query_top_k(query, k, min_score)]
+
+
+class BatchScorerChecks:
+    use_numpy = False
+
+    def scorer(self, corpus):
+        return BatchScorer(list(corpus.items()), use_numpy=self.use_numpy)
+
+    def test_top_k_matches_index(self):
+        rng = random.Random(1)
+        for n, (index, corpus) in enumerate(corpora()):
+            scorer = self.scorer(corpus)
+            queries = [corpus[file_id] for file_id in rng.sample(list(corpus), min(5, len(corpus)))]
+            queries.append([(h, 1, 1) for h in rng.sample(range(120), 20)])
+            for query in queries:
+                for k, min_score in OPTIONS:
+                    with self.subTest(corpus=n, k=k, min_score=min_score):
+                        self.assertEqual(scorer.top_k(query, k, min_score), index_top_k(index, query, k, min_score))
+
+    def test_file_fingerprint_input(self):
+        index, corpus = random_index(random.Random(2), 20)
+        references = [(file_id, file_fingerprint(file_id, fps)) for file_id, fps in corpus.items()]
+        scorer = BatchScorer(references, use_numpy=self.use_numpy)
+        query = file_fingerprint('q', corpus['f003'])
+        self.assertEqual(scorer.top_k(query, 5), index_top_k(index, corpus['f003'], 5, 0.0))
+
+    def test_empty_inputs(self):
+        scorer = BatchScorer([], use_numpy=self.use_numpy)
+        self.assertEqual(scorer.top_k([(1, 1, 1)], 3), [])
+        scorer = self.scorer({'a': [(1, 1, 1)]})
+        self.assertEqual(scorer.top_k([], 3), [])
+        self.assertEqual(scorer.top_k([(1, 1, 1)], 0), [])
+
+
+class PythonFallbackTest(BatchScorerChecks, unittest.TestCase):
+    use_numpy = False
+
+
+@unittest.skipUnless(HAVE_NUMPY, "numpy tidak terpasang")
+class NumpyTest(BatchScorerChecks, unittest.TestCase):
+    use_numpy = True
+
+
+class WithoutNumpyTest(unittest.TestCase):
+    def setUp(self):
+        index, corpus = copied_corpus(random.Random(3), files=40)
+        self.references = [(file_id, file_fingerprint(file_id, fps)) for file_id, fps in corpus.items()]
+        self.sources = self.references[:15]
+
+    def test_use_numpy_requires_numpy(self):
+        with mock.patch.object(batch_scoring, 'HAVE_NUMPY', False):
+            with self.assertRaises(RuntimeError):
+                BatchScorer(self.references, use_numpy=True)
+            self.assertFalse(BatchScorer(self.references).use_numpy)
+
+    def test_compare_corpus_without_numpy(self):
+        for top_k, min_score in ((3, 0.0), (None, 0.2), (2, 0.1)):
+            with self.subTest(top_k=top_k, min_score=min_score):
+                expected = list(compare_corpus(self.sources, self.references, top_k, min_score))
+                with mock.patch.object(fingerprint_index, 'HAVE_NUMPY', False), \
+                        mock.patch.object(fingerprint_index, 'BatchScorer', side_effect=AssertionError('numpy')):
+                    actual = list(compare_corpus(self.sources, self.references, top_k, min_score))
+                self.assertEqual(actual, expected)
+                self.assertTrue(any(matches for _, matches in actual))
+
+    def test_compare_worker_with_and_without_numpy(self):
+        buffers = [(file_id, fp.pack()) for file_id, fp in self.references]
+        chunk = [(source_id, fp.pack()) for source_id, fp in self.sources]
+        saved = (parallel_engine._worker_index, parallel_engine._worker_scorer,
+                 parallel_engine._worker_top_k, parallel_engine._worker_min_score)
+        self.addCleanup(self.restore_worker, saved)
+
+        expected = list(compare_corpus(self.sources, self.references, 3, 0.1))
+        for have_numpy in (False, HAVE_NUMPY):
+            with self.subTest(have_numpy=have_numpy):
+                with mock.patch.object(parallel_engine, 'HAVE_NUMPY', have_numpy):
+                    parallel_engine._init_compare_worker(buffers, 3, 0.1)
+                self.assertEqual(parallel_engine._worker_scorer is not None, have_numpy)
+                self.assertEqual(parallel_engine._compare_worker(chunk), expected)
+
+    @staticmethod
+    def restore_worker(saved):
+        (parallel_engine._worker_index, parallel_engine._worker_scorer,
+         parallel_engine._worker_top_k, parallel_engine._worker_min_score) = saved
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,268 @@
+"""
+Pengujian FingerprintIndex: add/remove dan simpan/muat indeks, self_join dibandingkan loop N^2
+compare_fingerprints, klaster union-find, serta query_top_k (rarest-first
+dengan batas atas skor) yang harus sama dengan query() yang disaring min_score lalu dipotong k,
+pada indeks acak dengan banyak skor yang sama.
+
+Jalankan dari root repo:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import gzip
+import json
+import random
+import tempfile
+import unittest
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fingerprint_index import FingerprintIndex, similarity_clusters
+from similarity_checker import FileFingerprint, compare_fingerprints
+
+
+def random_fingerprints(rng, pool, size):
+    """List (hash, start_line, end_line); hash diambil dari `pool` kecil agar banyak yang sama."""
+    fingerprints = set()
+    for h in rng.sample(range(pool), size):
+        start = rng.randrange(1, 200)
+        fingerprints.add((h, start, start + rng.randrange(3)))
+        if rng.random() < 0.1:
+            # Hash yang sama di dua lokasi dalam satu file
+            fingerprints.add((h, start + 50, start + 51))
+    return sorted(fingerprints)
+
+
+def random_index(rng, files, pool=120):
+    index = FingerprintIndex()
+    corpus = {}
+    for i in range(files):
+        if corpus and rng.random() < 0.2:
+            # Salinan persis file lain: skor sama persis (tie) untuk setiap query
+            fingerprints = corpus[rng.choice(list(corpus))]
+        else:
+            fingerprints = random_fingerprints(rng, pool, rng.randrange(1, 60))
+        corpus[f'f{i:03d}'] = fingerprints
+        index.add(f'f{i:03d}', fingerprints)
+    return index, corpus
+
+
+def copied_corpus(rng, files=80, size=60):
+    """
+    Korpus seperti benchmarks/bench_topk: hash umum (Zipf) dan hash unik, sebagian file menyalin
+    hash file lain. Hash salinan paling langka, jadi ambang skor ke-k naik di awal penelusuran
+    dan postings hash umum benar-benar dipangkas.
+    """
+    corpus = {}
+    for i in range(files):
+        source = corpus[rng.choice(list(corpus))] if corpus and rng.random() < 0.5 else None
+        fingerprints = set()
+        for line in range(size):
+            if source is not None and rng.random() < rng.choice((0.3, 0.6, 0.9)):
+                fingerprints.add(rng.choice(source))
+            elif rng.random() < 0.4:
+                fingerprints.add((int(rng.paretovariate(1.2)) % 40, line + 1, line + 2))
+            else:
+                fingerprints.add(((i + 1) << 32 | rng.randrange(1 << 20), line + 1, line + 2))
+        corpus[f'f{i:03d}'] = sorted(fingerprints)
+    index = FingerprintIndex()
+    for file_id, fingerprints in corpus.items():
+        index.add(file_id, fingerprints)
+    return index, corpus
+
+
+class QueryTopKTest(unittest.TestCase):
+    def expected(self, index, query, k, min_score):
+        results = [r for r in index.query(query) if r['score'] >= min_score]
+        return results if k is None else results[:k]
+
+    def test_matches_truncated_query_on_random_indexes(self):
+        rng = random.Random(14)
+        for trial in range(30):
+            index, corpus = random_index(rng, rng.randrange(5, 60))
+            # Query > 16 hash agar ambang skor ke-k ikut diperbarui di tengah penelusuran
+            queries = [random_fingerprints(rng, 120, rng.randrange(1, 80)), corpus[rng.choice(list(corpus))]]
+            for query in queries:
+                for k in (None, 1, 2, 5, 1000):
+                    for min_score in (0.0, 0.1, 0.25, 1 / 3, 0.5, 1.0):
+                        with self.subTest(trial=trial, k=k, min_score=min_score):
+                            self.assertEqual(index.query_top_k(query, k, min_score),
+                                             self.expected(index, query, k, min_score))
+
+    def test_matches_truncated_query_with_copied_files(self):
+        rng = random.Random(41)
+        for trial in range(10):
+            index, corpus = copied_corpus(rng)
+            for file_id in rng.sample(list(corpus), 10):
+                query = corpus[file_id]
+                for k in (1, 3, 10):
+                    for min_score in (0.0, 0.2):
+                        with self.subTest(trial=trial, query=file_id, k=k, min_score=min_score):
+                            self.assertEqual(index.query_top_k(query, k, min_score),
+                                             self.expected(index, query, k, min_score))
+
+    def test_ties_are_ordered_by_file_id(self):
+        index = FingerprintIndex()
+        shared = [(1, 1, 1), (2, 2, 2)]
+        for file_id in ('c', 'a', 'b', 'd'):
+            index.add(file_id, shared + ([(9, 9, 9)] if file_id == 'd' else []))
+        top = index.query_top_k(shared, 3)
+        self.assertEqual([(r['file_id'], r['score']) for r in top], [('a', 1.0), ('b', 1.0), ('c', 1.0)])
+
+    def test_k_larger_than_candidates(self):
+        index = FingerprintIndex()
+        index.add('a', [(1, 1, 1), (2, 2, 2)])
+        index.add('b', [(2, 3, 3), (3, 4, 4)])
+        index.add('c', [(7, 1, 1)])
+        query = [(1, 1, 1), (2, 2, 2)]
+        self.assertEqual(index.query_top_k(query, 10), index.query(query))
+        self.assertEqual([r['file_id'] for r in index.query_top_k(query, 10)], ['a', 'b'])
+
+    def test_empty_query_and_non_positive_k(self):
+        index, _ = random_index(random.Random(1), 10)
+        self.assertEqual(index.query_top_k([], 5), [])
+        self.assertEqual(index.query_top_k([(1, 1, 1)], 0), [])
+
+
+class IndexMaintenanceTest(unittest.TestCase):
+    def test_remove_drops_file_from_queries(self):
+        index, corpus = random_index(random.Random(3), 30)
+        query = corpus['f005']
+        self.assertIn('f005', [r['file_id'] for r in index.query(query)])
+
+        self.assertTrue(index.remove('f005'))
+        self.assertFalse(index.remove('f005'))
+        self.assertNotIn('f005', index)
+        self.assertEqual(len(index), 29)
+        for fingerprints in corpus.values():
+            self.assertNotIn('f005', [r['file_id'] for r in index.query(fingerprints)])
+            self.assertNotIn('f005', [r['file_id'] for r in index.query_top_k(fingerprints, 5)])
+
+    def test_remove_matches_index_built_without_file(self):
+        index, corpus = random_index(random.Random(4), 30)
+        index.remove('f010')
+        rebuilt = FingerprintIndex()
+        for file_id, fingerprints in corpus.items():
+            if file_id != 'f010':
+                rebuilt.add(file_id, fingerprints)
+        for fingerprints in corpus.values():
+            self.assertEqual(index.query(fingerprints), rebuilt.query(fingerprints))
+
+    def test_add_replaces_existing_file(self):
+        index = FingerprintIndex()
+        index.add('a', [(1, 1, 1), (2, 2, 2)])
+        index.add('a', [(3, 5, 6)])
+        self.assertEqual(index.query([(1, 1, 1), (2, 2, 2)]), [])
+        self.assertEqual(index.fingerprints_of('a'), [(3, 5, 6)])
+        self.assertEqual(len(index), 1)
+
+    def test_save_load_round_trip(self):
+        index, corpus = random_index(random.Random(5), 40)
+        index.remove('f007')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sub', 'index.json.gz')
+            index.save(path)
+            loaded = FingerprintIndex.load(path)
+
+        self.assertEqual(sorted(loaded.file_ids()), sorted(index.file_ids()))
+        for file_id in index.file_ids():
+            self.assertEqual(sorted(loaded.fingerprints_of(file_id)), sorted(index.fingerprints_of(file_id)))
+        for fingerprints in corpus.values():
+            self.assertEqual(loaded.query(fingerprints), index.query(fingerprints))
+            self.assertEqual(loaded.query_top_k(fingerprints, 3, 0.1), index.query_top_k(fingerprints, 3, 0.1))
+
+    def test_load_rejects_other_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'index.json.gz')
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                json.dump({'version': FingerprintIndex.FORMAT_VERSION + 1, 'files': {}}, f)
+            with self.assertRaises(ValueError):
+                FingerprintIndex.load(path)
+
+
+def file_fingerprint(file_id, fingerprints):
+    hashes, starts, ends = zip(*fingerprints) if fingerprints else ((), (), ())
+    winnowed = (array('Q', hashes), array('I', starts), array('I', ends), array('I', range(len(hashes))))
+    return FileFingerprint(f'{file_id}.py', None, 5, 10, frozenset(), 'rolling', None, None, winnowed, len(hashes))
+
+
+class SelfJoinTest(unittest.TestCase):
+    def brute_force(self, corpus, min_score=0.0, group_of=None):
+        ids = list(corpus)
+        fps = {file_id: file_fingerprint(file_id, corpus[file_id]) for file_id in ids}
+        pairs = {}
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:]:
+                if group_of is not None and group_of(a) == group_of(b):
+                    continue
+                score, blocks_a, blocks_b = compare_fingerprints(fps[a], fps[b])
+                if score > 0 and score >= min_score:
+                    pairs[(a, b)] = (score, blocks_a, blocks_b)
+        return pairs
+
+    def joined(self, index, min_score=0.0, group_of=None):
+        return {(p['file_a'], p['file_b']): (p['score'], p['blocks_a'], p['blocks_b'])
+                for p in index.self_join(min_score, group_of=group_of)}
+
+    def test_matches_all_pairs_comparison(self):
+        rng = random.Random(15)
+        for trial in range(10):
+            index, corpus = random_index(rng, rng.randrange(2, 40))
+            for min_score in (0.0, 0.2, 0.5):
+                with self.subTest(trial=trial, min_score=min_score):
+                    self.assertEqual(self.joined(index, min_score), self.brute_force(corpus, min_score))
+
+    def test_pairs_sorted_by_score(self):
+        index, _ = random_index(random.Random(16), 30)
+        pairs = index.self_join()
+        keys = [(-p['score'], p['file_a'], p['file_b']) for p in pairs]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_same_group_pairs_skipped(self):
+        index, corpus = random_index(random.Random(17), 30)
+        group_of = lambda file_id: int(file_id[1:]) % 3
+        joined = self.joined(index, group_of=group_of)
+        self.assertEqual(joined, self.brute_force(corpus, group_of=group_of))
+        self.assertTrue(all(group_of(a) != group_of(b) for a, b in joined))
+
+
+class SimilarityClustersTest(unittest.TestCase):
+    def test_union_find_groups(self):
+        pairs = [
+            {'file_a': 'a', 'file_b': 'b', 'score': 0.9},
+            {'file_a': 'c', 'file_b': 'b', 'score': 0.6},
+            {'file_a': 'd', 'file_b': 'e', 'score': 0.5},
+            {'file_a': 'e', 'file_b': 'f', 'score': 0.2},   # di bawah ambang: f tidak ikut
+            {'file_a': 'x', 'file_b': 'y', 'score': 0.5},
+        ]
+        self.assertEqual(similarity_clusters(pairs, 0.4), [
+            {'files': ['a', 'b', 'c'], 'max_score': 0.9, 'pairs': 2},
+            {'files': ['d', 'e'], 'max_score': 0.5, 'pairs': 1},
+            {'files': ['x', 'y'], 'max_score': 0.5, 'pairs': 1},
+        ])
+
+    def test_chain_merges_into_one_cluster(self):
+        pairs = [{'file_a': f'f{i}', 'file_b': f'f{i + 1}', 'score': 0.5} for i in range(10)]
+        random.Random(2).shuffle(pairs)
+        clusters = similarity_clusters(pairs)
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]['files'], sorted(f'f{i}' for i in range(11)))
+        self.assertEqual(clusters[0]['pairs'], 10)
+
+    def test_clusters_from_self_join(self):
+        index, corpus = random_index(random.Random(18), 25)
+        pairs = index.self_join(0.3)
+        clusters = similarity_clusters(pairs, 0.3)
+        # Setiap pasangan berada dalam tepat satu klaster, dan klaster saling lepas
+        seen = set()
+        for cluster in clusters:
+            self.assertTrue(seen.isdisjoint(cluster['files']))
+            seen.update(cluster['files'])
+        for p in pairs:
+            self.assertEqual(sum(1 for c in clusters if p['file_a'] in c['files'] and p['file_b'] in c['files']), 1)
+        self.assertEqual(sum(c['pairs'] for c in clusters), len(pairs))
+
+
+if __name__ == '__main__':
+    unittest.main()
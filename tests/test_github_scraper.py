@@ -0,0 +1,207 @@
+"""
+Pengujian request_with_retry dan GitHubClient terhadap server HTTP lokal: batas koneksi per
+host selama body dibaca, backoff 429/Retry-After, jumlah percobaan ulang yang terbatas,
+resolusi branch default, pencatatan rate limit dan scrape inkremental dengan filter ingest.
+
+Jalankan dari root repo:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import github_scraper
+from ingest_filter import IngestFilter
+from tests.local_server import LocalServer
+
+
+class ScraperTestCase(unittest.TestCase):
+    def setUp(self):
+        # Semaphore per host di-cache per host:port; server baru selalu memakai port baru,
+        # tetapi cache dikosongkan agar MAX_PER_HOST yang di-patch ikut berlaku
+        github_scraper._host_semaphores.clear()
+        patcher = mock.patch.object(github_scraper, 'RETRY_BACKOFF', 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+
+class RequestWithRetryTest(ScraperTestCase):
+    def test_per_host_limit_covers_streamed_body(self):
+        body = [b'x' * 1024] * 5
+
+        with mock.patch.object(github_scraper, 'MAX_PER_HOST', 3), \
+                LocalServer(lambda req: (200, {}, body), chunk_delay=0.02) as server:
+            downloads = [(f"{server.url}/f{i}.js", os.path.join(self.tmp.name, f"f{i}.js")) for i in range(16)]
+            results = github_scraper.download_many(downloads, max_workers=16)
+
+        self.assertTrue(all(status == 'downloaded' for status, _, _ in results))
+        self.assertEqual(len(server.requests), 16)
+        self.assertLessEqual(server.max_active, 3)
+        self.assertGreater(server.max_active, 1)
+
+    def test_host_slot_released_when_response_closed(self):
+        with mock.patch.object(github_scraper, 'MAX_PER_HOST', 1), \
+                LocalServer(lambda req: (200, {}, b'ok')) as server:
+            for _ in range(3):
+                with github_scraper.request_with_retry('GET', f"{server.url}/a", stream=True) as r:
+                    self.assertEqual(r.status_code, 200)
+            semaphore = github_scraper._host_semaphore(server.url)
+            self.assertTrue(semaphore.acquire(blocking=False))
+            semaphore.release()
+
+    def test_retry_after_on_429(self):
+        def handler(req):
+            if server.hits('/a') <= 2:
+                return 429, {'Retry-After': '1'}, b''
+            return 200, {}, b'ok'
+
+        with LocalServer(handler) as server:
+            started = time.monotonic()
+            response = github_scraper.request_with_retry('GET', f"{server.url}/a")
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(server.hits('/a'), 3)
+        self.assertGreaterEqual(elapsed, 2.0)
+
+    def test_retry_count_is_bounded(self):
+        with LocalServer(lambda req: (503, {}, b'')) as server:
+            response = github_scraper.request_with_retry('GET', f"{server.url}/a")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(server.hits('/a'), github_scraper.MAX_RETRIES + 1)
+
+    def test_deadline_stops_retry_wait(self):
+        with LocalServer(lambda req: (429, {'Retry-After': '30'}, b'')) as server:
+            with self.assertRaises(github_scraper.DeadlineExceeded):
+                github_scraper.request_with_retry('GET', f"{server.url}/a", deadline=time.monotonic() + 2)
+        self.assertEqual(server.hits('/a'), 1)
+
+
+def rate_headers(remaining, reset_in=60, limit=5000):
+    return {'X-RateLimit-Limit': str(limit), 'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset': str(int(time.time() + reset_in))}
+
+
+class GitHubClientTest(ScraperTestCase):
+    def client(self, server):
+        return github_scraper.GitHubClient(token='test-token', api_url=server.url)
+
+    def test_default_branch_is_resolved_once(self):
+        def handler(req):
+            self.assertEqual(req.headers.get('Authorization'), 'Bearer test-token')
+            return 200, rate_headers(4999), json.dumps({'default_branch': 'develop'}).encode()
+
+        with LocalServer(handler) as server:
+            client = self.client(server)
+            self.assertEqual(client.default_branch('User', 'Repo'), 'develop')
+            self.assertEqual(client.default_branch('user', 'repo'), 'develop')
+
+        self.assertEqual(server.requests, ['/repos/User/Repo'])
+        self.assertEqual(client.rate_limit_status()['remaining'], 4999)
+
+    def test_default_branch_missing_repo(self):
+        with LocalServer(lambda req: (404, rate_headers(4998), b'{}')) as server:
+            self.assertIsNone(self.client(server).default_branch('u', 'missing'))
+        self.assertEqual(len(server.requests), 1)
+
+    def test_rate_limit_403_waits_for_reset(self):
+        def handler(req):
+            if server.hits('/repos/u/r') == 1:
+                return 403, rate_headers(0, reset_in=2), b'{"message": "API rate limit exceeded"}'
+            return 200, rate_headers(4999), b'{"default_branch": "main"}'
+
+        with LocalServer(handler) as server:
+            started = time.monotonic()
+            branch = self.client(server).default_branch('u', 'r')
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(branch, 'main')
+        self.assertEqual(server.hits('/repos/u/r'), 2)
+        self.assertGreaterEqual(elapsed, 0.9)
+
+    def test_rate_limit_recorded_from_retried_responses(self):
+        def handler(req):
+            if server.hits('/repos/u/r') == 1:
+                return 429, {'Retry-After': '1', **rate_headers(4321)}, b''
+            return 200, {}, b'{"default_branch": "main"}'
+
+        with LocalServer(handler) as server:
+            client = self.client(server)
+            response = client.get('/repos/u/r')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(server.hits('/repos/u/r'), 2)
+        self.assertEqual(client.rate_limit_status()['remaining'], 4321)
+
+    def test_single_retry_layer(self):
+        with LocalServer(lambda req: (429, {'Retry-After': '0'}, b'')) as server:
+            response = self.client(server).get('/repos/u/r')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(server.hits('/repos/u/r'), github_scraper.MAX_RETRIES + 1)
+
+    def test_long_reset_fails_fast(self):
+        with LocalServer(lambda req: (403, rate_headers(0, reset_in=3600), b'')) as server:
+            with self.assertRaises(github_scraper.RateLimitExceeded):
+                self.client(server).get('/repos/u/r')
+        self.assertEqual(server.hits('/repos/u/r'), 1)
+
+
+class ScrapeRepoFilesTest(ScraperTestCase):
+    FILES = {
+        'main.py': b'def main():\n    return 1\n',
+        'gen.py': b'# @generated by protoc\nVALUE = 1\n',
+    }
+
+    def handler(self, req):
+        if req.path == '/repos/u/r':
+            return 200, {}, b'{"default_branch": "main"}'
+        if req.path.startswith('/repos/u/r/git/trees/main'):
+            tree = [{'path': path, 'type': 'blob', 'sha': f'sha-{path}', 'size': len(data)}
+                    for path, data in self.FILES.items()]
+            return 200, {}, json.dumps({'tree': tree}).encode()
+        path = req.path[len('/u/r/main/'):]
+        if req.path.startswith('/u/r/main/') and path in self.FILES:
+            return 200, {}, self.FILES[path]
+        return 404, {}, b''
+
+    def scrape(self, ingest_filter):
+        return sorted(github_scraper.scrape_repo_files('https://github.com/u/r', self.tmp.name,
+                                                       ingest_filter=ingest_filter))
+
+    def run_scrapes(self, *filters):
+        with LocalServer(self.handler) as server, \
+                mock.patch.object(github_scraper, 'GITHUB_RAW_URL', server.url), \
+                mock.patch.object(github_scraper, '_client', github_scraper.GitHubClient(api_url=server.url)):
+            results = [self.scrape(ingest_filter) for ingest_filter in filters]
+        return server, results
+
+    def test_skip_reused_with_same_filter(self):
+        server, results = self.run_scrapes(IngestFilter(), IngestFilter())
+        self.assertEqual(results, [['u_r_main.py'], ['u_r_main.py']])
+        self.assertEqual(server.hits('/u/r/main/gen.py'), 1)
+
+    def test_skip_not_reused_after_filter_change(self):
+        server, results = self.run_scrapes(IngestFilter(), IngestFilter(check_content=False))
+        self.assertEqual(results, [['u_r_main.py'], ['u_r_gen.py', 'u_r_main.py']])
+        self.assertEqual(server.hits('/u/r/main/gen.py'), 2)
+
+    def test_kept_files_rechecked_after_filter_change(self):
+        first, second = IngestFilter(check_content=False), IngestFilter()
+        _, results = self.run_scrapes(first, second)
+        self.assertEqual(results, [['u_r_gen.py', 'u_r_main.py'], ['u_r_main.py']])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, 'u_r_gen.py')))
+        self.assertEqual([entry['path'] for entry in second.report()['files']], ['gen.py'])
+
+
+if __name__ == '__main__':
+    unittest.main()
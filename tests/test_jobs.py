@@ -0,0 +1,133 @@
+"""
+Pengujian JobStore/JobRunner dan stream NDJSON job: hasil hanya disimpan sekali, retensi,
+heartbeat, serta job yatim atau hilang yang mengakhiri stream dengan event error.
+
+Jalankan dari root repo:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jobs
+from jobs import JobStore, JobRunner
+
+
+def fake_analysis(progress, on_result, **params):
+    progress(phase='comparing', pairs_done=0, pairs_total=3)
+    gh_rows = [{"comparison": "mh_vs_gh", "source_file": f"a{i}.py", "compared_file": "b.py", "score": 90.0 - i}
+               for i in range(2)]
+    mh_rows = [{"comparison": "mh_vs_mh", "source_file": "a0.py", "compared_file": "a1.py", "score": 55.0}]
+    for row in gh_rows + mh_rows:
+        on_result(row)
+    return {"mh_vs_gh_results": gh_rows, "mh_vs_mh_results": mh_rows, "collusion_clusters": [{"files": ["a0.py"]}]}
+
+
+class JobTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = JobStore(os.path.join(self.tmp.name, 'jobs.sqlite3'))
+
+    def run_job(self, runner, params=None):
+        job_id = runner.submit(params or {})
+        runner.shutdown()
+        return job_id
+
+    def backdate(self, job_id, seconds):
+        self.store._conn.execute("UPDATE jobs SET updated_at = updated_at - ? WHERE id = ?", (seconds, job_id))
+        self.store._conn.commit()
+
+
+class JobStoreTest(JobTestCase):
+    def test_rows_stored_once_and_result_rebuilt(self):
+        job_id = self.run_job(JobRunner(self.store, fake_analysis))
+
+        _, summary, _, _ = self.store.get_summary(job_id)
+        summary = json.loads(summary)
+        self.assertEqual(summary['mh_vs_gh_results'], 2)
+        self.assertEqual(summary['mh_vs_mh_results'], 1)
+
+        status, result, _, _ = self.store.get_result(job_id)
+        self.assertEqual(status, 'done')
+        self.assertEqual(json.loads(result), fake_analysis(lambda **f: None, lambda row: None))
+
+    def test_prune_removes_old_finished_jobs(self):
+        old_job = self.run_job(JobRunner(self.store, fake_analysis))
+        self.backdate(old_job, 3600)
+        queued = self.store.create({})
+        self.backdate(queued, 3600)
+
+        runner = JobRunner(self.store, fake_analysis, retention=60)
+        new_job = self.run_job(runner)
+
+        self.assertIsNone(self.store.get(old_job))
+        self.assertEqual(self.store.get_results(old_job), [])
+        self.assertIsNotNone(self.store.get(queued))
+        self.assertEqual(self.store.get(new_job)['status'], 'done')
+
+    def test_fail_if_stale(self):
+        job_id = self.store.create({})
+        self.assertFalse(self.store.fail_if_stale(job_id, max_age=60))
+        self.backdate(job_id, 120)
+        self.assertTrue(self.store.fail_if_stale(job_id, max_age=60))
+        status, _, error, error_status = self.store.get_summary(job_id)
+        self.assertEqual((status, error, error_status), ('error', jobs.STALE_ERROR, 500))
+
+    def test_heartbeat_keeps_running_job_fresh(self):
+        release = threading.Event()
+
+        def slow_analysis(progress, on_result, **params):
+            release.wait(5)
+            return {"mh_vs_gh_results": []}
+
+        runner = JobRunner(self.store, slow_analysis, heartbeat_interval=0.05)
+        job_id = runner.submit({})
+        time.sleep(0.2)
+        self.backdate(job_id, 120)
+        time.sleep(0.2)
+        self.assertFalse(self.store.fail_if_stale(job_id, max_age=60))
+        release.set()
+        runner.shutdown()
+        self.assertEqual(self.store.get(job_id)['status'], 'done')
+
+
+class StreamJobEventsTest(JobTestCase):
+    def setUp(self):
+        super().setUp()
+        import app as app_module
+        self.app_module = app_module
+        patcher = mock.patch.object(app_module, 'job_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def events(self, job_id):
+        return [json.loads(line) for line in self.app_module.stream_job_events(job_id)]
+
+    def test_done_event_with_summary(self):
+        job_id = self.run_job(JobRunner(self.store, fake_analysis))
+        events = self.events(job_id)
+        self.assertEqual([e['type'] for e in events], ['result'] * 3 + ['progress', 'done'])
+        self.assertEqual(events[-1]['total'], 3)
+        self.assertEqual(events[-1]['summary'], {"collusion_clusters": [{"files": ["a0.py"]}]})
+
+    def test_orphaned_job_ends_with_error(self):
+        job_id = self.store.create({})
+        self.store.update(job_id, status='running')
+        self.backdate(job_id, jobs.STALE_AFTER + 1)
+        events = self.events(job_id)
+        self.assertEqual(events[-1], {"type": "error", "error": jobs.STALE_ERROR, "status": 500})
+
+    def test_missing_job_ends_with_error(self):
+        self.assertEqual(self.events('tidak-ada'), [{"type": "error", "error": "Job not found.", "status": 404}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Pengujian languages: pemilihan lexer berdasarkan ekstensi, fallback GENERIC, kompatibilitas
+keluarga bahasa, dan compare_corpus_by_language untuk keluarga tanpa referensi.
+
+Jalankan dari root repo:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from languages import (GENERIC, LANGUAGES, SUPPORTED_EXTENSIONS, compatible, compatible_pair_count, get_language,
+                       language_for_path, partition_by_family)
+from parallel_engine import compare_corpus_by_language
+from similarity_checker import compute_fingerprint
+
+CODE = {
+    'python': b'def total(items):\n    s = 0\n    for x in items:\n        s += x\n    return s\n',
+    'javascript': b'function total(items) {\n  let s = 0;\n  for (const x of items) { s += x; }\n  return s;\n}\n',
+    'c': b'int total(int *items, int n) {\n  int s = 0;\n  for (int i = 0; i < n; i++) s += items[i];\n  return s;\n}\n',
+}
+
+
+def fingerprint(path, language):
+    return compute_fingerprint(path, k=3, w=4, data=CODE[language])
+
+
+class LanguageForPathTest(unittest.TestCase):
+    def test_dispatch_by_extension(self):
+        expected = {
+            'a.py': 'python', 'pkg/b.pyw': 'python',
+            'c.js': 'javascript', 'd.mjs': 'javascript', 'e.jsx': 'javascript',
+            'f.ts': 'typescript', 'g.tsx': 'typescript',
+            'Main.java': 'java',
+            'h.c': 'c', 'h.h': 'c',
+            'i.cpp': 'cpp', 'i.hpp': 'cpp', 'j.cc': 'cpp',
+            # Ekstensi tidak peka huruf besar/kecil
+            'K.PY': 'python', 'L.Java': 'java',
+        }
+        for path, name in expected.items():
+            with self.subTest(path=path):
+                self.assertIs(language_for_path(path), get_language(name))
+
+    def test_every_supported_extension_has_a_lexer(self):
+        for language in LANGUAGES:
+            for ext in language.extensions:
+                with self.subTest(ext=ext):
+                    self.assertIn(ext, SUPPORTED_EXTENSIONS)
+                    self.assertIs(language_for_path('x' + ext), language)
+
+    def test_unknown_extension_falls_back_to_generic(self):
+        for path in ('notes.txt', 'script.rb', 'Makefile', 'archive.tar.gz', '.py/README'):
+            with self.subTest(path=path):
+                self.assertIs(language_for_path(path), GENERIC)
+
+
+class FamilyTest(unittest.TestCase):
+    def test_compatible(self):
+        cases = {
+            ('a.py', 'b.py'): True,
+            ('a.js', 'b.ts'): True,
+            ('a.c', 'b.cpp'): True,
+            ('a.h', 'b.hpp'): True,
+            ('a.txt', 'b.md'): True,
+            ('a.py', 'b.js'): False,
+            ('a.java', 'b.c'): False,
+            ('a.py', 'b.txt'): False,
+        }
+        for (a, b), expected in cases.items():
+            with self.subTest(a=a, b=b):
+                self.assertIs(compatible(a, b), expected)
+                self.assertIs(compatible(b, a), expected)
+
+    def test_partition_by_family_keeps_first_seen_order(self):
+        items = ['b.js', 'a.py', 'c.ts', 'd.txt', 'e.py', 'f.cpp', 'g.c']
+        groups = partition_by_family(items, lambda path: path)
+        self.assertEqual(list(groups), ['javascript', 'python', 'generic', 'c'])
+        self.assertEqual(groups['javascript'], ['b.js', 'c.ts'])
+        self.assertEqual(groups['python'], ['a.py', 'e.py'])
+        self.assertEqual(groups['c'], ['f.cpp', 'g.c'])
+        self.assertEqual(groups['generic'], ['d.txt'])
+
+    def test_compatible_pair_count(self):
+        sources = ['a.py', 'b.js', 'c.c']
+        references = ['x.py', 'y.py', 'z.ts']
+        self.assertEqual(compatible_pair_count(sources, references), 3)
+
+
+class CompareCorpusByLanguageTest(unittest.TestCase):
+    def test_family_without_references_yields_empty_results(self):
+        sources = [(0, fingerprint('s/a.py', 'python')), (1, fingerprint('s/b.c', 'c')),
+                   (2, fingerprint('s/c.js', 'javascript'))]
+        references = [(10, fingerprint('r/x.py', 'python')), (11, fingerprint('r/y.ts', 'javascript')),
+                      (12, fingerprint('r/z.py', 'python'))]
+        results = {source_id: (matches, count)
+                   for source_id, matches, count in compare_corpus_by_language(sources, references)}
+
+        self.assertEqual(set(results), {0, 1, 2})
+        self.assertEqual(results[1], ([], 0))
+        matches, count = results[0]
+        self.assertEqual(count, 2)
+        self.assertEqual({match['file_id'] for match in matches}, {10, 12})
+        matches, count = results[2]
+        self.assertEqual(count, 1)
+        self.assertEqual([match['file_id'] for match in matches], [11])
+
+    def test_no_references_at_all(self):
+        sources = [(0, fingerprint('a.py', 'python')), (1, fingerprint('b.js', 'javascript'))]
+        self.assertEqual(list(compare_corpus_by_language(sources, [])), [(0, [], 0), (1, [], 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
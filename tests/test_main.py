@@ -0,0 +1,68 @@
+"""
+Pengujian main (CLI batch): collect_code_files harus menerapkan filter path dan filter konten
+yang sama dengan scrape_repo_files, dengan alasan yang sama di laporan file yang dilewati.
+
+Jalankan dari root repo:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import random
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest_filter import IngestFilter
+from main import collect_code_files
+
+NORMAL = b'def total(items):\n    s = 0\n    for x in items:\n        s += x\n    return s\n'
+MINIFIED = b'var a=1;' * 400
+GENERATED = b'// Code generated by protoc. DO NOT EDIT.\nvar x = 1;\n'
+_rng = random.Random(0)
+# Data biner tertanam: baris pendek berindentasi, tapi byte acak
+ENTROPY = b'\n'.join(b'    ' + bytes(_rng.randrange(256) for _ in range(60)).replace(b'\n', b' ') for _ in range(64))
+
+
+class CollectCodeFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for rel, data in {
+            'alice/main.py': NORMAL,
+            'alice/app.js': MINIFIED,
+            'bob/proto_pb.js': GENERATED,
+            'bob/blob.py': ENTROPY,
+            'bob/node_modules/lib.js': NORMAL,
+            'bob/util.py': NORMAL,
+        }.items():
+            path = os.path.join(self.tmp.name, *rel.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+
+    def test_content_filter_applies_to_local_directories(self):
+        ingest_filter = IngestFilter()
+        files = collect_code_files([self.tmp.name], ingest_filter)
+        self.assertEqual([(file_id, group) for file_id, _, group in files],
+                         [('alice/main.py', 'alice'), ('bob/util.py', 'bob')])
+        skipped = {entry['path']: entry['reason'] for entry in ingest_filter.report()['files']}
+        self.assertEqual(skipped, {
+            'alice/app.js': 'minified',
+            'bob/proto_pb.js': 'generated',
+            'bob/blob.py': 'entropy',
+            'bob/node_modules/lib.js': 'path',
+        })
+
+    def test_content_checks_can_be_disabled(self):
+        ingest_filter = IngestFilter(check_content=False)
+        files = collect_code_files([self.tmp.name], ingest_filter)
+        self.assertEqual(len(files), 5)
+        self.assertEqual(ingest_filter.report()['by_reason'], {'path': 1})
+
+    def test_without_filter_every_code_file_is_collected(self):
+        self.assertEqual(len(collect_code_files([self.tmp.name])), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
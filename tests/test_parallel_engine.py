@@ -0,0 +1,111 @@
+"""
+Pengujian parallel_engine: fingerprinting dan perbandingan lewat ProcessPoolExecutor harus
+menghasilkan hasil dan urutan yang identik dengan jalur serial (compare_corpus).
+Ambang PARALLEL_MIN_* diturunkan agar korpus kecil tetap melewati jalur paralel.
+
+Jalankan dari root repo:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parallel_engine
+from fingerprint_index import compare_corpus
+from parallel_engine import compare_corpus_parallel, fingerprint_paths
+
+STATEMENTS = (
+    '{a} = {b} + {c}', '{a} = {b} * 2', 'if {a} > {b}:\n        {c} = {a}', 'for {a} in {b}:\n        {c} += {a}',
+    '{a} = len({b})', 'return {a}', '{a}.append({b})', 'while {a} < {b}:\n        {a} += 1',
+)
+# Kode starter yang sama di setiap file: banyak pasangan berbagi sedikit fingerprint, jadi
+# top_k benar-benar memotong daftar kandidat dan ada skor yang sama (tie)
+HEADER = '''def helper(items):
+    total = 0
+    for item in items:
+        total += item
+    return total
+'''
+
+
+def make_source(rng, names, statements=30):
+    lines = [HEADER, f"def {rng.choice(names)}({rng.choice(names)}, {rng.choice(names)}):"]
+    for _ in range(statements):
+        pick = {key: rng.choice(names) for key in 'abc'}
+        lines.append('    ' + rng.choice(STATEMENTS).format(**pick))
+    return '\n'.join(lines) + '\n'
+
+
+def copy_with_edits(rng, text, names, ratio=0.05):
+    """Salinan `text` dengan sebagian baris pernyataan diganti baris acak."""
+    lines = text.rstrip('\n').split('\n')
+    for i in range(1, len(lines)):
+        if rng.random() < ratio:
+            pick = {key: rng.choice(names) for key in 'abc'}
+            lines[i] = '    ' + rng.choice(STATEMENTS).format(**pick)
+    return '\n'.join(lines) + '\n'
+
+
+class ParallelEngineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        rng = random.Random(7)
+        names = [f'n{i}' for i in range(12)]
+        reference_texts = [make_source(rng, names) for _ in range(40)]
+        source_texts = [copy_with_edits(rng, rng.choice(reference_texts), names) if i % 2 else make_source(rng, names)
+                        for i in range(30)]
+        cls.reference_paths = cls.write(reference_texts, 'ref')
+        cls.source_paths = cls.write(source_texts, 'src')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    @classmethod
+    def write(cls, texts, prefix):
+        paths = []
+        for i, text in enumerate(texts):
+            path = os.path.join(cls.tmp.name, f'{prefix}_{i}.py')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            paths.append(path)
+        return paths
+
+    def setUp(self):
+        for name, value in (('PARALLEL_MIN_PAIRS', 100), ('PARALLEL_MIN_FILES', 8)):
+            patcher = mock.patch.object(parallel_engine, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def corpus(self, workers):
+        references = fingerprint_paths(self.reference_paths, workers=workers)
+        sources = fingerprint_paths(self.source_paths, workers=workers)
+        return (list(zip((os.path.basename(p) for p in self.source_paths), sources)),
+                list(zip((os.path.basename(p) for p in self.reference_paths), references)))
+
+    def test_parallel_fingerprints_match_serial(self):
+        serial = fingerprint_paths(self.reference_paths, workers=1)
+        parallel = fingerprint_paths(self.reference_paths, workers=3)
+        self.assertEqual([fp.pack() for fp in parallel], [fp.pack() for fp in serial])
+
+    def test_parallel_compare_matches_serial(self):
+        sources, references = self.corpus(workers=1)
+        self.assertGreater(len(sources) * len(references), parallel_engine.PARALLEL_MIN_PAIRS)
+        for options in ({}, {'top_k': 3}, {'min_score': 0.2}, {'top_k': 2, 'min_score': 0.1}):
+            with self.subTest(**options):
+                expected = list(compare_corpus(sources, references, **options))
+                self.assertTrue(any(matches for _, matches in expected))
+                # Jalur serial tidak boleh dipakai sebagai fallback di sini
+                with mock.patch.object(parallel_engine, 'compare_corpus', side_effect=AssertionError('serial')):
+                    actual = list(compare_corpus_parallel(sources, references, workers=3, chunk_size=4, **options))
+                self.assertEqual(actual, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,372 @@
+"""
+Pengujian similarity_checker: tokenizer per bahasa (komentar dan string multi-baris), winnowing
+O(n) terhadap implementasi lama O(n*w), pemasangan blok (align_blocks), dan mode hash 'sha1'
+yang skornya harus sama dengan versi sebelum rolling hash dan lexer per bahasa.
+
+Jalankan dari root repo:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import random
+import tempfile
+import unittest
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import similarity_checker
+from languages import get_language
+from similarity_checker import (FileFingerprint, align_blocks, compute_fingerprint, get_similar_blocks,
+                                legacy_tokenize_source, token_string, tokenize_source, winnow, winnow_positions,
+                                winnowing)
+
+SOURCES = {
+    'stats_a.py': '''# Statistik sederhana
+def total(items):
+    result = 0
+    for item in items:
+        if item > 0:  # hanya positif
+            result += item * 2
+    return result
+
+def average(items):
+    count = len(items)
+    label = "rata-rata"
+    return total(items) / count if count else 0
+''',
+    'stats_b.py': '''def jumlah(data):
+    hasil = 0
+    for x in data:
+        if x > 0:
+            hasil += x * 2
+    return hasil
+
+def rerata(data):
+    n = len(data)
+    nama = 'mean'
+    return jumlah(data) / n if n else 0
+
+def median(data):
+    urut = sorted(data)
+    return urut[len(urut) // 2]
+''',
+    'cart_a.js': '''// Keranjang belanja
+function addItem(cart, item) {
+    const key = `${item.id}`;
+    if (!cart[key]) {
+        cart[key] = { qty: 0, price: item.price };
+    }
+    cart[key].qty += 1; // tambah satu
+    return cart;
+}
+
+function cartTotal(cart) {
+    let sum = 0;
+    for (const key in cart) {
+        sum += cart[key].qty * cart[key].price;
+    }
+    return "Total: " + sum;
+}
+''',
+    'cart_b.js': '''function tambah(keranjang, barang) {
+    const kunci = `${barang.id}`;
+    if (!keranjang[kunci]) {
+        keranjang[kunci] = { qty: 0, price: barang.price };
+    }
+    keranjang[kunci].qty += 1;
+    return keranjang;
+}
+
+function hitung(keranjang) {
+    let total = 0;
+    for (const kunci in keranjang) {
+        total += keranjang[kunci].qty * keranjang[kunci].price;
+    }
+    return 'Jumlah: ' + total;
+}
+''',
+    'sort_a.c': '''#include <stdio.h>
+void sort(int *a, int n) {
+    for (int i = 0; i < n; i++)
+        for (int j = 0; j + 1 < n - i; j++)
+            if (a[j] > a[j + 1]) {
+                int t = a[j]; a[j] = a[j + 1]; a[j + 1] = t;
+            }
+}
+int main(void) {
+    int data[] = {5, 3, 1};
+    sort(data, 3);
+    printf("%d\\n", data[0]);
+    return 0;
+}
+''',
+    'sort_b.c': '''#include <stdio.h>\r
+void urut(int *arr, int len) {\r
+    for (int p = 0; p < len; p++)\r
+        for (int q = 0; q + 1 < len - p; q++)\r
+            if (arr[q] > arr[q + 1]) {\r
+                int tmp = arr[q]; arr[q] = arr[q + 1]; arr[q + 1] = tmp;\r
+            }\r
+}\r
+int main(void) {\r
+    int xs[] = {9, 8, 7};\r
+    urut(xs, 3);\r
+    printf("%d\\n", xs[0]);\r
+    return 0;\r
+}\r
+''',
+}
+
+# Skor get_similar_blocks versi awal repo (tokenizer per baris + SHA-1 penuh) untuk SOURCES di atas:
+# (file_a, file_b, k, w) -> skor
+BASELINE_SCORES = {
+    ('stats_a.py', 'stats_b.py', 5, 10): 0.8333333333333334,
+    ('cart_a.js', 'cart_b.js', 5, 10): 1.0,
+    ('sort_a.c', 'sort_b.c', 5, 10): 0.8,
+    ('stats_a.py', 'stats_a.py', 5, 10): 1.0,
+    ('stats_a.py', 'stats_b.py', 3, 6): 0.8,
+    ('cart_a.js', 'cart_b.js', 3, 6): 1.0,
+    ('sort_a.c', 'sort_b.c', 3, 6): 0.7857142857142857,
+    ('stats_a.py', 'stats_a.py', 3, 6): 1.0,
+}
+
+
+class SourceFilesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name, text in SOURCES.items():
+            with open(self.path(name), 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+
+def tokens(text, language):
+    return [(token_string(t), line) for t, line in tokenize_source(text, language=get_language(language))]
+
+
+class TokenizerTest(unittest.TestCase):
+    def test_multiline_block_comment(self):
+        text = "a = 1 /* x\n y\n z */ b = 2\nc"
+        for language in ('javascript', 'java', 'c'):
+            with self.subTest(language=language):
+                self.assertEqual(tokens(text, language),
+                                 [('VAR_0', 1), ('1', 1), ('VAR_1', 3), ('2', 3), ('VAR_2', 4)])
+
+    def test_unterminated_block_comment_runs_to_end(self):
+        self.assertEqual(tokens("int a;\n/* belum ditutup\nint b;\n", 'c'), [('int', 1), ('VAR_0', 1)])
+
+    def test_python_triple_quoted_string(self):
+        text = 'x = """doc\n# bukan komentar\n"""\ny = 1  # komentar\nz = a // b\n'
+        self.assertEqual(tokens(text, 'python'), [
+            ('VAR_0', 1), ('STRING_LITERAL', 1),
+            ('VAR_1', 4), ('1', 4),
+            # '//' di Python adalah operator, bukan komentar
+            ('VAR_2', 5), ('VAR_3', 5), ('VAR_4', 5),
+        ])
+
+    def test_js_template_literal_and_escaped_quote(self):
+        text = 'const s = `a\n${b}\nc`;\nlet t = "q\\"uo//te";\n'
+        self.assertEqual(tokens(text, 'javascript'), [
+            ('const', 1), ('VAR_0', 1), ('STRING_LITERAL', 1),
+            ('let', 4), ('VAR_1', 4), ('STRING_LITERAL', 4),
+        ])
+
+    def test_c_directive_is_not_a_comment(self):
+        self.assertEqual(tokens("#include <stdio.h>\n#define N 3\n", 'c'),
+                         [('#include', 1), ('<stdio.h>', 1), ('#define', 2), ('VAR_0', 2), ('3', 2)])
+
+    def test_legacy_tokenizer_keeps_old_rules(self):
+        # Aturan lama (hash_mode='sha1'): komentar blok tidak dikenali, string hanya satu baris
+        stream = legacy_tokenize_source("a = 1 /* x\n y */ b\n")
+        self.assertEqual([(token_string(t), line) for t, line in stream],
+                         [('VAR_0', 1), ('1', 1), ('VAR_1', 1), ('VAR_2', 2), ('VAR_3', 2)])
+
+
+def reference_winnowing(hashed_k_grams_info, w):
+    """
+    Winnowing versi lama (O(n*w)): minimum paling kanan di setiap jendela, acuan kebenaran.
+    """
+    fingerprints = set()
+    for i in range(len(hashed_k_grams_info) - w + 1):
+        current_window = hashed_k_grams_info[i : i + w]
+        min_idx = -1
+        min_val = float('inf')
+        for j, (hash_val, _, _) in enumerate(current_window):
+            if hash_val <= min_val:
+                min_val = hash_val
+                min_idx = j
+        fingerprints.add(current_window[min_idx])
+    return fingerprints
+
+
+def reference_positions(hashes, w):
+    """
+    Posisi terpilih versi lama, termasuk posisi yang hash/barisnya kembar (tidak digabung oleh set).
+    """
+    positions = set()
+    for i in range(len(hashes) - w + 1):
+        window = hashes[i : i + w]
+        positions.add(i + max(j for j, h in enumerate(window) if h == min(window)))
+    return sorted(positions)
+
+
+def random_case(rng, n, hash_range):
+    hashes = array('Q', (rng.randrange(hash_range) for _ in range(n)))
+    starts = array('I')
+    line = 1
+    for _ in range(n):
+        starts.append(line)
+        if rng.random() < 0.3:
+            line += 1
+    ends = array('I', (s + rng.randrange(3) for s in starts))
+    return hashes, starts, ends
+
+
+class WinnowingTest(unittest.TestCase):
+    def check(self, hashes, starts, ends, w):
+        info = list(zip(hashes, starts, ends))
+        expected = reference_winnowing(info, w)
+        self.assertEqual(list(winnow_positions(hashes, w)), reference_positions(hashes, w))
+        self.assertEqual(winnowing(info, w), expected)
+        fp_hashes, fp_starts, fp_ends, _ = winnow(hashes, starts, ends, w)
+        self.assertEqual(set(zip(fp_hashes, fp_starts, fp_ends)), expected)
+
+    def test_matches_old_winnowing_on_random_cases(self):
+        rng = random.Random(0)
+        for case in range(500):
+            n = rng.randrange(0, 120)
+            w = rng.randrange(1, 20)
+            # Rentang hash kecil -> banyak duplikat, rentang besar -> hampir unik
+            hash_range = rng.choice([2, 5, 50, 1 << 64])
+            with self.subTest(case=case, n=n, w=w, hash_range=hash_range):
+                self.check(*random_case(rng, n, hash_range), w)
+
+    def test_fewer_k_grams_than_window(self):
+        hashes, starts, ends = random_case(random.Random(1), 4, 50)
+        for n in range(5):
+            with self.subTest(n=n):
+                self.assertEqual(len(winnow_positions(hashes[:n], 5)), 0)
+                self.check(hashes[:n], starts[:n], ends[:n], 5)
+
+    def test_all_equal_hashes_pick_rightmost(self):
+        # Setiap jendela memilih posisi paling kanan, jadi semua posisi dari w-1 ikut terpilih
+        hashes = array('Q', [7] * 10)
+        self.assertEqual(list(winnow_positions(hashes, 4)), list(range(3, 10)))
+        self.check(hashes, array('I', range(1, 11)), array('I', range(1, 11)), 4)
+
+    def test_window_of_one_selects_every_position(self):
+        hashes, starts, ends = random_case(random.Random(2), 30, 5)
+        self.assertEqual(list(winnow_positions(hashes, 1)), list(range(30)))
+        self.check(hashes, starts, ends, 1)
+
+
+def synthetic_fingerprint(name, hashes, positions, token_count, k=1, w=4):
+    """
+    FileFingerprint dari hash dan posisi k-gram yang ditentukan langsung; satu token per baris,
+    jadi k-gram di posisi p mencakup baris p+1 .. p+k.
+    """
+    winnowed = (array('Q', hashes), array('I', (p + 1 for p in positions)),
+                array('I', (p + k for p in positions)), array('I', positions))
+    return FileFingerprint(name, None, k, w, frozenset(), 'rolling', None, None, winnowed, token_count)
+
+
+def spans(aligned):
+    return [((p['a']['start'], p['a']['end']), (p['b']['start'], p['b']['end'])) for p in aligned['pairs']]
+
+
+class AlignBlocksTest(SourceFilesTestCase):
+    def test_identical_file_is_one_tile(self):
+        fp = synthetic_fingerprint('a.py', range(100, 110), range(10), token_count=12, k=3)
+        aligned = align_blocks(fp, fp)
+        self.assertEqual(spans(aligned), [((1, 12), (1, 12))])
+        self.assertEqual(aligned['pairs'][0]['tokens'], 12)
+        self.assertEqual(aligned['pairs'][0]['fingerprints'], 10)
+        self.assertEqual((aligned['coverage_a'], aligned['coverage_b']), (1.0, 1.0))
+
+    def test_identical_source_file_with_every_k_gram(self):
+        # w=1 memilih semua k-gram, jadi tile mencakup token pertama sampai terakhir
+        a = compute_fingerprint(self.path('stats_a.py'), k=3, w=1)
+        b = compute_fingerprint(self.path('stats_a.py'), k=3, w=1)
+        aligned = align_blocks(a, b)
+        self.assertEqual(len(aligned['pairs']), 1)
+        self.assertEqual(aligned['pairs'][0]['a'], aligned['pairs'][0]['b'])
+        self.assertEqual((aligned['coverage_a'], aligned['coverage_b']), (1.0, 1.0))
+
+    def test_shifted_copy_stays_on_one_diagonal(self):
+        a = synthetic_fingerprint('a.py', range(1, 9), range(8), token_count=8)
+        b = synthetic_fingerprint('b.py', range(1, 9), range(5, 13), token_count=13)
+        aligned = align_blocks(a, b)
+        self.assertEqual(spans(aligned), [((1, 8), (6, 13))])
+        self.assertEqual(aligned['coverage_a'], 1.0)
+        self.assertEqual(aligned['coverage_b'], 8 / 13)
+
+    def test_reordered_block_gives_two_tiles(self):
+        x, y = [1, 2, 3, 4, 5], [11, 12, 13, 14, 15]
+        a = synthetic_fingerprint('a.py', x + y, range(10), token_count=10)
+        b = synthetic_fingerprint('b.py', y + x, range(10), token_count=10)
+        aligned = align_blocks(a, b)
+        self.assertEqual(spans(aligned), [((1, 5), (6, 10)), ((6, 10), (1, 5))])
+        self.assertEqual([p['tokens'] for p in aligned['pairs']], [5, 5])
+        self.assertEqual((aligned['coverage_a'], aligned['coverage_b']), (1.0, 1.0))
+
+    def test_hash_repeated_in_b_does_not_overlap_in_a(self):
+        a = synthetic_fingerprint('a.py', [1, 2, 3], range(3), token_count=3)
+        b = synthetic_fingerprint('b.py', [1, 2, 3, 1, 2, 3], range(6), token_count=6)
+        aligned = align_blocks(a, b)
+        self.assertEqual(spans(aligned), [((1, 3), (1, 3))])
+        self.assertEqual((aligned['coverage_a'], aligned['coverage_b']), (1.0, 0.5))
+
+        # Rantai yang lebih pendek dan menimpa tile yang sudah dipilih di A juga dilewati
+        b = synthetic_fingerprint('b.py', [2, 9, 1, 2, 3], range(5), token_count=5)
+        self.assertEqual(spans(align_blocks(a, b)), [((1, 3), (3, 5))])
+
+    def test_tiles_cover_whole_k_grams(self):
+        # k=3: k-gram di posisi 0 dan 2 sama-sama memakai token 2, jadi hanya satu tile yang dipilih
+        a = synthetic_fingerprint('a.py', [1, 2], [0, 2], token_count=5, k=3, w=1)
+        b = synthetic_fingerprint('b.py', [1, 2], [0, 10], token_count=13, k=3, w=1)
+        aligned = align_blocks(a, b)
+        self.assertEqual(spans(aligned), [((1, 3), (1, 3))])
+        self.assertEqual(aligned['coverage_a'], 0.6)
+
+    def test_chain_breaks_after_max_gap(self):
+        # Default max_gap = w + k = 5 k-gram
+        for gap, expected in ((5, [((1, 6), (1, 6))]), (6, [((1, 1), (1, 1)), ((7, 7), (7, 7))])):
+            with self.subTest(gap=gap):
+                fp = synthetic_fingerprint('a.py', [1, 2], [0, gap], token_count=gap + 1)
+                aligned = align_blocks(fp, fp)
+                self.assertEqual(spans(aligned), expected)
+                self.assertEqual(sum(p['tokens'] for p in aligned['pairs']), gap + 1 if gap == 5 else 2)
+        fp = synthetic_fingerprint('a.py', [1, 2], [0, 20], token_count=21)
+        self.assertEqual(spans(align_blocks(fp, fp, max_gap=20)), [((1, 21), (1, 21))])
+
+    def test_min_fingerprints(self):
+        x, y = [1, 2, 3], [11, 12]
+        a = synthetic_fingerprint('a.py', x + y, range(5), token_count=5)
+        b = synthetic_fingerprint('b.py', y + x, range(5), token_count=5)
+        aligned = align_blocks(a, b, min_fingerprints=3)
+        self.assertEqual(spans(aligned), [((1, 3), (3, 5))])
+        self.assertEqual(aligned['coverage_a'], 0.6)
+
+
+class Sha1CompatibilityTest(SourceFilesTestCase):
+    def test_scores_match_baseline(self):
+        for (a, b, k, w), expected in BASELINE_SCORES.items():
+            with self.subTest(a=a, b=b, k=k, w=w):
+                score, _, _ = get_similar_blocks(self.path(a), self.path(b), k=k, w=w, hash_mode='sha1')
+                self.assertEqual(score, expected)
+
+    def test_winnowing_uses_full_sha1_values(self):
+        fp = compute_fingerprint(self.path('stats_b.py'), k=3, w=4, hash_mode='sha1')
+        tokens = similarity_checker.legacy_tokenize_source(SOURCES['stats_b.py'])
+        full = similarity_checker.sha1_k_gram_hashes(tokens.ids, 3)
+        positions = similarity_checker.winnow_positions(full, 4)
+        self.assertEqual(list(fp.fp_positions), list(positions))
+        self.assertEqual(list(fp.fp_hashes), [full[p] >> 96 for p in positions])
+
+
+if __name__ == '__main__':
+    unittest.main()